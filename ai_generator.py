@@ -1,188 +1,541 @@
-import openai
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
 from config import Config
+from generation_cache import create_generation_cache
+from hashtag_index import HashtagIndex
+from rate_limiter import create_rate_limiter, estimate_tokens
+from response_parser import (
+    HASHTAG_RE, StreamingResponseParser, enforce_platform_limits, parse_multi_response, parse_response
+)
+from prompt_templates import TemplateEngine
+from metrics import (
+    GENERATIONS, OPENAI_ERRORS, OPENAI_REQUEST_SECONDS, PROMPT_BUILD_SECONDS,
+    RESPONSE_PARSE_SECONDS, log_event, record_usage
+)
 import json
 
+SYSTEM_PROMPT = "You are a social media content creator expert. Generate engaging, platform-appropriate social media posts."
+
+def event_generation_data(event):
+    """Convert an events row into the dict AIGenerator expects"""
+    return {
+        'title': event['title'],
+        'date': event['date'].strftime('%Y-%m-%d') if event['date'] else '',
+        'location': event['location'] or '',
+        'type': event['type'] or '',
+        'description': event['description'] or ''
+    }
+
+def generation_fingerprint(event_data, platform, tone, template_version):
+    """SHA-256 of everything a post is generated from
+    
+    Two requests with the same fingerprint would produce an equivalent
+    post: same event fields, platform, tone, prompt templates
+    (template_version, see TemplateEngine.version) and model with its
+    sampling parameters (or the template fallback when no API key is
+    configured).
+    """
+    if Config.OPENAI_API_KEY:
+        generator = [Config.OPENAI_MODEL, Config.OPENAI_TEMPERATURE, Config.OPENAI_MAX_TOKENS]
+    else:
+        generator = 'fallback'
+    payload = json.dumps([event_data, platform, tone, template_version, generator],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 class AIGenerator:
-    def __init__(self):
+    def __init__(self, db=None, hashtag_index=None):
         if not Config.OPENAI_API_KEY:
             print("Warning: OPENAI_API_KEY not set. Using fallback generator.")
+        
+        # Long-lived clients so HTTP keep-alive and TLS sessions are reused
+        # across generations. Both are built on first use.
+        self._client = None
+        self._async_client = None
+        self._loop = None
+        self._loop_thread = None
+        self._lock = threading.Lock()
+        
+        self.cache = create_generation_cache()
+        self.templates = TemplateEngine()
+        # Every OpenAI call waits its turn here instead of bursting into 429s;
+        # db is only used when the buckets are shared across processes
+        self.rate_limiter = create_rate_limiter(db)
+        # Hashtags learned from past posts top up the model's and replace
+        # the fixed defaults; needs the database the posts are saved in.
+        # The app passes its own so the snapshot can load before this exists.
+        if hashtag_index is None and db is not None and Config.HASHTAG_INDEX_ENABLED:
+            hashtag_index = HashtagIndex(db)
+        self.hashtag_index = hashtag_index
     
-    def generate_post(self, event_data, platform, tone):
+    def generate_post(self, event_data, platform, tone, use_cache=True, strict=False):
+        """Generate a post; use_cache=False forces a fresh completion (regenerate)
+        
+        With strict=True a failed OpenAI call raises instead of returning
+        the template fallback, so the caller (the job queue) can retry it.
+        """
         if Config.OPENAI_API_KEY:
-            return self._generate_with_openai(event_data, platform, tone)
+            return self._generate_with_openai(event_data, platform, tone, use_cache, strict)
         else:
             return self._generate_fallback(event_data, platform, tone)
     
-    def _generate_with_openai(self, event_data, platform, tone):
+    def generate_posts(self, event_data, platforms, tone, use_cache=True):
+        """Generate posts for several platforms from a single completion
+        
+        Returns {platform: result} in the order given. Platforms that the
+        combined response leaves out or gets wrong are generated one at a
+        time with generate_post.
+        """
+        platforms = list(dict.fromkeys(platforms))
+        if len(platforms) == 1 or not Config.OPENAI_API_KEY:
+            return {
+                platform: self.generate_post(event_data, platform, tone, use_cache)
+                for platform in platforms
+            }
+        
+        results = self._generate_multi_with_openai(event_data, platforms, tone, use_cache)
+        missing = [platform for platform in platforms if platform not in results]
+        if missing:
+            log_event('multi_platform_incomplete', missing=missing)
+        for platform in missing:
+            results[platform] = self.generate_post(event_data, platform, tone, use_cache)
+        return {platform: results[platform] for platform in platforms}
+    
+    async def agenerate_post(self, event_data, platform, tone, use_cache=True):
+        """Async variant of generate_post, run on the generator's event loop"""
+        if Config.OPENAI_API_KEY:
+            return await self._agenerate_with_openai(event_data, platform, tone, use_cache)
+        else:
+            return self._generate_fallback(event_data, platform, tone)
+    
+    def stream_post(self, event_data, platform, tone, use_cache=True):
+        """Generate a post incrementally
+        
+        Yields ('delta', section, text) tuples as text arrives, where section
+        is 'content' or 'hashtags', and finally ('done', result) with the
+        same dict generate_post returns. If the model fails part-way the
+        generator yields ('reset',) and streams the template fallback instead.
+        """
+        if Config.OPENAI_API_KEY:
+            yield from self._stream_with_openai(event_data, platform, tone, use_cache)
+        else:
+            yield from self._stream_result(self._generate_fallback(event_data, platform, tone))
+    
+    def fingerprint(self, event_data, platform, tone):
+        """generation_fingerprint() with this generator's current templates"""
+        return generation_fingerprint(event_data, platform, tone, self.templates.version())
+    
+    def cache_stats(self):
+        """Hit/miss counters of the generation cache, or None when disabled"""
+        return self.cache.stats() if self.cache else None
+    
+    def rate_limit_stats(self):
+        """Queue and wait counters of the OpenAI rate limiter, or None when disabled"""
+        return self.rate_limiter.stats() if self.rate_limiter else None
+    
+    def hashtag_index_stats(self):
+        """Size and age of the learned hashtag snapshot, or None when disabled"""
+        return self.hashtag_index.stats() if self.hashtag_index else None
+    
+    def submit_batch(self, jobs, concurrency):
+        """Schedule (event_data, platform, tone) jobs on the shared event loop
+        
+        At most `concurrency` generations are in flight at once. Returns one
+        concurrent.futures.Future per job, in the same order, so callers can
+        consume results with as_completed() without a thread per request.
+        """
+        loop = self._ensure_loop()
+        semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(concurrency), loop).result()
+        return [
+            asyncio.run_coroutine_threadsafe(self._bounded_generate(semaphore, *job), loop)
+            for job in jobs
+        ]
+    
+    def close(self):
+        """Close the HTTP clients and stop the background event loop"""
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        
+        if client is not None:
+            client.close()
+        if loop is not None:
+            if async_client is not None:
+                asyncio.run_coroutine_threadsafe(async_client.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+    
+    @property
+    def client(self):
+        """Shared synchronous OpenAI client"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    # Imported here, on the first LLM call: the openai package
+                    # takes longer to import than the rest of the app together
+                    import httpx
+                    import openai
+                    self._client = openai.OpenAI(
+                        **self._client_options(),
+                        http_client=httpx.Client(
+                            limits=self._connection_limits(),
+                            timeout=self._timeout(),
+                            follow_redirects=True
+                        )
+                    )
+        return self._client
+    
+    @property
+    def async_client(self):
+        """Shared AsyncOpenAI client, bound to the generator's event loop"""
+        if self._async_client is None:
+            import httpx
+            import openai
+            self._async_client = openai.AsyncOpenAI(
+                **self._client_options(),
+                http_client=httpx.AsyncClient(
+                    limits=self._connection_limits(),
+                    timeout=self._timeout(),
+                    follow_redirects=True
+                )
+            )
+        return self._async_client
+    
+    def _client_options(self):
+        # The SDK retries 408/409/429/5xx with exponential backoff and
+        # honours Retry-After, so retries only need a budget here.
+        return {
+            'api_key': Config.OPENAI_API_KEY,
+            'base_url': Config.OPENAI_BASE_URL,
+            'timeout': self._timeout(),
+            'max_retries': Config.OPENAI_MAX_RETRIES
+        }
+    
+    def _timeout(self):
+        import httpx
+        return httpx.Timeout(Config.OPENAI_TIMEOUT, connect=Config.OPENAI_CONNECT_TIMEOUT)
+    
+    def _connection_limits(self):
+        import httpx
+        return httpx.Limits(
+            max_connections=Config.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE
+        )
+    
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='ai-generator-loop',
+                    daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+    
+    @staticmethod
+    async def _make_semaphore(concurrency):
+        return asyncio.Semaphore(concurrency)
+    
+    async def _bounded_generate(self, semaphore, event_data, platform, tone):
+        async with semaphore:
+            return await self.agenerate_post(event_data, platform, tone)
+    
+    def _chat_request(self, prompt, max_tokens=None):
+        """Keyword arguments for chat.completions.create"""
+        return {
+            'model': Config.OPENAI_MODEL,
+            'messages': [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'temperature': Config.OPENAI_TEMPERATURE,
+            'max_tokens': max_tokens or Config.OPENAI_MAX_TOKENS
+        }
+    
+    def _complete(self, chat_request, mode='sync'):
+        """Call the chat completions API, recording latency and token usage"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimate_tokens(chat_request), mode)
+        started = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(**chat_request)
+        except Exception as e:
+            OPENAI_REQUEST_SECONDS.labels(mode, 'error').observe(time.perf_counter() - started)
+            self._check_rate_limited(e)
+            raise
+        OPENAI_REQUEST_SECONDS.labels(mode, 'ok').observe(time.perf_counter() - started)
+        record_usage(response)
+        return response
+    
+    async def _acomplete(self, chat_request):
+        """Async variant of _complete"""
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire(estimate_tokens(chat_request))
+        started = time.perf_counter()
+        try:
+            response = await self.async_client.chat.completions.create(**chat_request)
+        except Exception as e:
+            OPENAI_REQUEST_SECONDS.labels('async', 'error').observe(time.perf_counter() - started)
+            self._check_rate_limited(e)
+            raise
+        OPENAI_REQUEST_SECONDS.labels('async', 'ok').observe(time.perf_counter() - started)
+        record_usage(response)
+        return response
+    
+    def _check_rate_limited(self, e):
+        """Make every caller back off when the API still answered 429
+        
+        The SDK has already retried by then, so the limits are set higher
+        than the account allows or another client shares the key.
+        """
+        # Only called after a request was attempted, so this is a lookup
+        import openai
+        if self.rate_limiter and isinstance(e, openai.RateLimitError):
+            try:
+                retry_after = float(e.response.headers.get('retry-after'))
+            except (TypeError, ValueError):
+                retry_after = None
+            self.rate_limiter.throttle(retry_after)
+    
+    def _result_from_response(self, response, event_data, platform):
+        result = response.choices[0].message.content
+        
+        with RESPONSE_PARSE_SECONDS.time():
+            content, hashtags = self._parse_response(result, event_data, platform)
+        
+        return {
+            'content': content,
+            'hashtags': hashtags
+        }
+    
+    def _cache_lookup(self, chat_request, use_cache):
+        """Return (cache_key, cached_result); the key is None when caching is off"""
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(chat_request)
+        return key, self.cache.get(key) if use_cache else None
+    
+    def _generate_with_openai(self, event_data, platform, tone, use_cache=True, strict=False):
         """Generate post using OpenAI API"""
         try:
-            # Create client with only api_key parameter
-            # This avoids any proxy-related issues
-            client_kwargs = {'api_key': Config.OPENAI_API_KEY}
-            client = openai.OpenAI(**client_kwargs)
-            
             prompt = self._build_prompt(event_data, platform, tone)
+            chat_request = self._chat_request(prompt)
+            key, cached = self._cache_lookup(chat_request, use_cache)
+            if cached:
+                GENERATIONS.labels(platform, 'cache').inc()
+                return cached
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a social media content creator expert. Generate engaging, platform-appropriate social media posts."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6,
-                max_tokens=250
-            )
+            response = self._complete(chat_request)
+            result = self._result_from_response(response, event_data, platform)
+            GENERATIONS.labels(platform, 'openai').inc()
             
-            result = response.choices[0].message.content
+            # Fallback output is never cached, only real completions
+            if key:
+                self.cache.set(key, result)
+            return result
+        except Exception as e:
+            self._report_openai_error(e)
+            if strict:
+                raise
+            return self._generate_fallback(event_data, platform, tone)
+    
+    async def _agenerate_with_openai(self, event_data, platform, tone, use_cache=True):
+        """Generate post using the async OpenAI client"""
+        try:
+            prompt = self._build_prompt(event_data, platform, tone)
+            chat_request = self._chat_request(prompt)
+            key, cached = self._cache_lookup(chat_request, use_cache)
+            if cached:
+                GENERATIONS.labels(platform, 'cache').inc()
+                return cached
             
-            content, hashtags = self._parse_response(result, platform)
+            response = await self._acomplete(chat_request)
+            result = self._result_from_response(response, event_data, platform)
+            GENERATIONS.labels(platform, 'openai').inc()
             
-            return {
-                'content': content,
-                'hashtags': hashtags
-            }
-        except TypeError as e:
-            # Handle version compatibility issues
-            if 'proxies' in str(e) or 'unexpected keyword argument' in str(e):
-                print(f"OpenAI library version compatibility issue: {e}")
-                print("Falling back to template-based generator. Consider updating openai library: pip install --upgrade openai")
-            else:
-                print(f"Error generating with OpenAI: {e}")
-            return self._generate_fallback(event_data, platform, tone)
+            if key:
+                self.cache.set(key, result)
+            return result
         except Exception as e:
-            print(f"Error generating with OpenAI: {e}")
+            self._report_openai_error(e)
             return self._generate_fallback(event_data, platform, tone)
     
-    def _build_prompt(self, event_data, platform, tone):
-        """Build prompt for AI generation"""
-        platform_guidelines = {
-            'linkedin': 'Professional tone, business-focused, 1300 characters max, include relevant industry hashtags',
-            'instagram': 'Visual and engaging, use emojis, 2200 characters max, include trending hashtags (5-10)',
-            'facebook': 'Conversational and community-focused, 5000 characters max, include relevant hashtags',
-            'twitter': 'Concise and engaging, 280 characters max, use 1-3 relevant hashtags'
-        }
+    def _generate_multi_with_openai(self, event_data, platforms, tone, use_cache=True):
+        """Generate every platform with one OpenAI request
         
-        tone_guidelines = {
-            'formal': 'Use formal language, professional terminology',
-            'professional': 'Use professional but approachable language',
-            'promotional': 'Use persuasive language, highlight benefits and value',
-            'friendly': 'Use casual, warm, and approachable language'
-        }
+        Returns the results that validated. If the request itself fails,
+        every platform gets the template fallback, as generate_post would.
+        """
+        try:
+            with PROMPT_BUILD_SECONDS.time():
+                prompt = self.templates.render_multi_prompt(event_data, platforms, tone)
+            chat_request = self._chat_request(prompt, max_tokens=Config.OPENAI_MAX_TOKENS * len(platforms))
+            key, cached = self._cache_lookup(chat_request, use_cache)
+            if cached:
+                for platform in cached:
+                    GENERATIONS.labels(platform, 'cache').inc()
+                return dict(cached)
+            
+            response = self._complete(chat_request, mode='multi')
+            text = response.choices[0].message.content or ''
+        except Exception as e:
+            self._report_openai_error(e)
+            return {platform: self._generate_fallback(event_data, platform, tone) for platform in platforms}
         
-        prompt = f"""Generate a {tone} social media post for {platform}.
-
-Event Details:
-- Title: {event_data.get('title', 'N/A')}
-- Date: {event_data.get('date', 'N/A')}
-- Location: {event_data.get('location', 'N/A')}
-- Type: {event_data.get('type', 'N/A')}
-- Description: {event_data.get('description', 'N/A')}
-
-Platform Guidelines: {platform_guidelines.get(platform, '')}
-Tone Guidelines: {tone_guidelines.get(tone, '')}
-
-Please generate:
-1. A compelling caption/post content
-2. Relevant hashtags (separated by spaces, starting with #)
-
-Format your response as:
-CONTENT:
-[your post content here]
-
-HASHTAGS:
-[hashtags here, each starting with #]
-"""
-        return prompt
+        with RESPONSE_PARSE_SECONDS.time():
+            results = {
+                platform: self._finalize_parsed(content, hashtags, content, event_data, platform)
+                for platform, (content, hashtags) in parse_multi_response(text, platforms).items()
+            }
+        for platform in results:
+            GENERATIONS.labels(platform, 'openai').inc()
+        # Partial answers are completed per platform, so only cache full ones
+        if key and len(results) == len(platforms):
+            self.cache.set(key, results)
+        return results
     
-    def _parse_response(self, response_text, platform):
-        """Parse AI response to extract content and hashtags"""
+    def _stream_with_openai(self, event_data, platform, tone, use_cache=True):
+        """Stream a post from the OpenAI streaming API"""
+        started = False
+        request_started = None
         try:
-            lines = response_text.split('\n')
-            content_lines = []
-            hashtags = []
-            current_section = None
+            prompt = self._build_prompt(event_data, platform, tone)
+            chat_request = self._chat_request(prompt)
+            key, cached = self._cache_lookup(chat_request, use_cache)
+            if cached:
+                GENERATIONS.labels(platform, 'cache').inc()
+                yield from self._stream_result(cached)
+                return
             
-            for line in lines:
-                line = line.strip()
-                if 'CONTENT:' in line.upper():
-                    current_section = 'content'
-                    continue
-                elif 'HASHTAGS:' in line.upper():
-                    current_section = 'hashtags'
-                    continue
-                
-                if current_section == 'content' and line:
-                    content_lines.append(line)
-                elif current_section == 'hashtags' and line:
-                    # Extract hashtags
-                    words = line.split()
-                    for word in words:
-                        if word.startswith('#'):
-                            hashtags.append(word)
+            parser = StreamingResponseParser()
+            if self.rate_limiter:
+                self.rate_limiter.acquire(estimate_tokens(chat_request), 'stream')
+            request_started = time.perf_counter()
+            stream = self.client.chat.completions.create(
+                **chat_request, stream=True, stream_options={'include_usage': True}
+            )
+            try:
+                for chunk in stream:
+                    # The last chunk has no choices, only the token usage
+                    record_usage(chunk)
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    for section, delta in parser.feed(text):
+                        started = True
+                        yield ('delta', section, delta)
+            finally:
+                # Also on GeneratorExit when the client disconnects, so the
+                # HTTP connection isn't left streaming into nothing
+                stream.close()
             
-            content = '\n'.join(content_lines).strip()
-            hashtags_str = ' '.join(hashtags) if hashtags else self._generate_default_hashtags(platform)
+            OPENAI_REQUEST_SECONDS.labels('stream', 'ok').observe(time.perf_counter() - request_started)
+            request_started = None
             
+            with RESPONSE_PARSE_SECONDS.time():
+                content, hashtags, raw = parser.finish()
+                result = self._finalize_parsed(content, hashtags, raw, event_data, platform)
+            GENERATIONS.labels(platform, 'openai').inc()
+            if key:
+                self.cache.set(key, result)
+            yield ('done', result)
+        except Exception as e:
+            if request_started is not None:
+                OPENAI_REQUEST_SECONDS.labels('stream', 'error').observe(time.perf_counter() - request_started)
+                self._check_rate_limited(e)
+            self._report_openai_error(e)
+            if started:
+                yield ('reset',)
+            yield from self._stream_result(self._generate_fallback(event_data, platform, tone))
+    
+    def _stream_result(self, result):
+        """Replay a finished result as word-sized deltas"""
+        for word in re.findall(r'\S+\s*|\s+', result['content']):
+            yield ('delta', 'content', word)
+        yield ('delta', 'hashtags', result['hashtags'])
+        yield ('done', result)
+    
+    def _finalize_parsed(self, content, hashtags, raw, event_data, platform):
+        """Apply hashtag suggestions and platform limits to parsed output"""
+        if not content:
             # If parsing failed, use the whole response as content
-            if not content:
-                content = response_text.strip()
-                hashtags_str = self._generate_default_hashtags(platform)
-            
-            return content, hashtags_str
+            content = raw.strip()
+            hashtags = None
+        content, hashtags_str = enforce_platform_limits(
+            content, self._suggest_hashtags(event_data, platform, hashtags), platform
+        )
+        return {
+            'content': content,
+            'hashtags': hashtags_str
+        }
+    
+    def _report_openai_error(self, e):
+        OPENAI_ERRORS.labels(type(e).__name__).inc()
+        if isinstance(e, TypeError) and ('proxies' in str(e) or 'unexpected keyword argument' in str(e)):
+            # Handle version compatibility issues
+            log_event(
+                'openai_error', level=logging.WARNING, error=str(e), error_type='compatibility',
+                hint='Falling back to template-based generator. Consider updating openai library: pip install --upgrade openai'
+            )
+        else:
+            log_event('openai_error', level=logging.WARNING, error=str(e), error_type=type(e).__name__)
+    
+    def _build_prompt(self, event_data, platform, tone):
+        """Build prompt for AI generation"""
+        with PROMPT_BUILD_SECONDS.time():
+            return self.templates.render_prompt(event_data, platform, tone)
+    
+    def _parse_response(self, response_text, event_data, platform):
+        """Parse AI response to extract content and hashtags"""
+        try:
+            content, hashtags, raw = parse_response(response_text)
+            result = self._finalize_parsed(content, hashtags, raw, event_data, platform)
+            return result['content'], result['hashtags']
         except Exception as e:
-            print(f"Error parsing response: {e}")
-            return response_text.strip(), self._generate_default_hashtags(platform)
+            log_event('parse_error', level=logging.WARNING, error=str(e), platform=platform)
+            return (response_text or '').strip(), self.templates.default_hashtags(platform)
     
     def _generate_fallback(self, event_data, platform, tone):
         """Fallback generator when AI API is not available"""
-        title = event_data.get('title', 'Event')
-        date = event_data.get('date', '')
-        location = event_data.get('location', '')
-        event_type = event_data.get('type', '')
-        description = event_data.get('description', '')
-        
-        # Platform-specific templates
-        if platform == 'twitter':
-            content = f"🎉 {title}\n\n📅 {date}"
-            if location:
-                content += f"\n📍 {location}"
-            content += f"\n\n{description[:200]}"
-        elif platform == 'linkedin':
-            content = f"We're excited to announce: {title}\n\n"
-            content += f"📅 Date: {date}\n"
-            if location:
-                content += f"📍 Location: {location}\n"
-            content += f"\n{description}\n\nJoin us for this {event_type} event!"
-        elif platform == 'instagram':
-            content = f"✨ {title} ✨\n\n"
-            content += f"📅 {date}\n"
-            if location:
-                content += f"📍 {location}\n"
-            content += f"\n{description}\n\nDon't miss out! 🎉"
-        else:  # facebook
-            content = f"Join us for {title}!\n\n"
-            content += f"📅 Date: {date}\n"
-            if location:
-                content += f"📍 Location: {location}\n"
-            content += f"\n{description}\n\nWe hope to see you there!"
-        
-        hashtags = self._generate_default_hashtags(platform)
-        
+        GENERATIONS.labels(platform, 'fallback').inc()
+        content, hashtags = enforce_platform_limits(
+            self.templates.render_fallback(event_data, platform),
+            self._suggest_hashtags(event_data, platform),
+            platform
+        )
         return {
             'content': content,
             'hashtags': hashtags
         }
     
-    def _generate_default_hashtags(self, platform):
-        """Generate default hashtags based on platform"""
-        base_hashtags = ['#Event', '#Community', '#Networking']
+    def _suggest_hashtags(self, event_data, platform, tags=None):
+        """Hashtags for a post: the model's, topped up from the hashtag index
         
-        if platform == 'instagram':
-            return ' '.join(base_hashtags + ['#EventPlanning', '#SocialEvent', '#JoinUs'])
-        elif platform == 'linkedin':
-            return ' '.join(base_hashtags + ['#ProfessionalDevelopment', '#BusinessEvent'])
-        elif platform == 'twitter':
-            return ' '.join(base_hashtags[:2])  # Shorter for Twitter
-        else:
-            return ' '.join(base_hashtags)
-
+        A post gets at least as many hashtags as the platform's default set.
+        Without tags from the model (fallback posts, or HASHTAGS_IN_PROMPT
+        off) learned tags come first and the defaults fill the rest.
+        """
+        if isinstance(tags, str):
+            tags = ['#' + tag for tag in HASHTAG_RE.findall(tags)]
+        tags = list(tags or [])
+        defaults = ['#' + tag for tag in HASHTAG_RE.findall(self.templates.default_hashtags(platform))]
+        count = max(len(defaults), len(tags))
+        
+        suggested = tags
+        if self.hashtag_index and len(tags) < count:
+            suggested = self.hashtag_index.suggest(platform, event_data.get('type'), tags, count)
+        if not tags:
+            taken = {tag.casefold() for tag in suggested}
+            suggested = (suggested + [tag for tag in defaults if tag.casefold() not in taken])[:count]
+        return suggested
@@ -1,16 +1,143 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context, g
 from flask_cors import CORS
 from database import Database
-from ai_generator import AIGenerator
-from datetime import datetime
-import mysql.connector
+from ai_generator import AIGenerator, event_generation_data
+from hashtag_index import HashtagIndex
+from config import Config
+from job_queue import JobQueue, JobWorkerPool, JOB_STATUSES
+from pagination import parse_limit, parse_fields, encode_cursor, decode_cursor
+from repositories import EventRepository, PostRepository, VersionRepository, EVENT_FIELDS, POST_COLUMNS
+from http_cache import ResponseCache, conditional_json
+from search import SearchRepository, parse_terms
+from serialization import FastJSONProvider, NDJSON_MIMETYPE, compress_response, ndjson_chunks, wants_ndjson
+import bulk_io
+from metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS, configure_logging, log_event
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+import threading
+import time
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
+configure_logging()
 
-# Initialize database and AI generator
+# Services are built per process, but open no connections and start no
+# threads until they are used (job workers start with start_services()).
+# The AIGenerator itself is built by the first request that needs it, and
+# the openai and MySQL driver packages are imported on first use, so a new
+# process is ready to serve quickly; only the hashtag snapshot starts
+# loading in the background at startup. The schema is created by
+# setup_database.py, not on import.
 db = Database()
-ai_generator = AIGenerator()
+db.init_app(app)
+events_repo = EventRepository(db)
+posts_repo = PostRepository(db)
+versions_repo = VersionRepository(db)
+search_repo = SearchRepository(db)
+response_cache = ResponseCache(Config.RESPONSE_CACHE_MAX_ENTRIES)
+hashtag_index = HashtagIndex(db) if Config.HASHTAG_INDEX_ENABLED else None
+_ai_generator = None
+_ai_generator_lock = threading.Lock()
+
+def get_ai_generator():
+    """This process's AIGenerator, built on first use"""
+    global _ai_generator
+    if _ai_generator is None:
+        with _ai_generator_lock:
+            if _ai_generator is None:
+                _ai_generator = AIGenerator(db, hashtag_index)
+    return _ai_generator
+
+def generator_stats(name):
+    """Stats getter for the metrics registry; None until the generator exists"""
+    return lambda: getattr(_ai_generator, name)() if _ai_generator is not None else None
+
+job_queue = JobQueue(db)
+job_workers = JobWorkerPool(job_queue, get_ai_generator)
+
+REGISTRY.register_stats('db_pool', db.pool_stats, 'Connection pool state')
+REGISTRY.register_stats('generation_cache', generator_stats('cache_stats'), 'Generation cache state')
+REGISTRY.register_stats('openai_rate_limiter', generator_stats('rate_limit_stats'), 'OpenAI rate limiter queue')
+REGISTRY.register_stats('hashtag_index', hashtag_index.stats if hashtag_index else lambda: None,
+                        'Learned hashtag snapshot')
+REGISTRY.register_stats('response_cache', response_cache.stats, 'Cached list responses')
+REGISTRY.register_stats('job_workers', job_workers.stats, 'Background job workers')
+
+_services_started = False
+_services_lock = threading.Lock()
+
+def start_services():
+    """Start this process's background job workers and hashtag snapshot load (idempotent)
+    
+    gunicorn calls this when a worker process boots; any other server
+    gets it on the first request.
+    """
+    global _services_started
+    if _services_started:
+        return
+    with _services_lock:
+        if not _services_started:
+            job_workers.start()
+            if hashtag_index:
+                hashtag_index.warm()
+            _services_started = True
+
+def shutdown(timeout=None):
+    """Drain running jobs, then release the LLM clients and pooled connections
+    
+    Jobs still running after `timeout` seconds keep their lease and are
+    re-queued by another worker once it expires.
+    """
+    job_workers.stop(timeout)
+    if _ai_generator is not None:
+        _ai_generator.close()
+    db.close()
+
+@app.before_request
+def ensure_services():
+    if not _services_started:
+        start_services()
+
+# ==================== Instrumentation ====================
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    """Per-route latency histogram and a structured access log line
+    
+    Streaming responses are measured up to the first byte.
+    """
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_REQUEST_SECONDS.labels(request.method, route, str(response.status_code)).observe(elapsed)
+    if Config.LOG_REQUESTS:
+        log_event(
+            'request',
+            method=request.method,
+            route=route,
+            path=request.path,
+            status=response.status_code,
+            duration_ms=round(elapsed * 1000, 3)
+        )
+    return response
+
+# Registered after record_request so it runs first and is timed with the request
+app.after_request(compress_response)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics"""
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
 
 # ==================== Routes ====================
 
@@ -21,26 +148,47 @@ def index():
 
 # ==================== Event Management APIs ====================
 
+def parse_date_arg(name):
+    """Read an optional YYYY-MM-DD query parameter"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Invalid {name}: expected YYYY-MM-DD')
+
 @app.route('/api/events', methods=['GET'])
 def get_events():
-    """Get all events"""
+    """Get events, newest first, one keyset page at a time
+    
+    Query parameters: limit, cursor (next_cursor from the previous page),
+    fields (comma-separated projection; id and date are always included),
+    date_from and date_to (inclusive, YYYY-MM-DD). Supports conditional
+    GETs (ETag / Last-Modified). With ?format=ndjson (or Accept:
+    application/x-ndjson) every matching event after the cursor is
+    streamed instead, one JSON object per line.
+    """
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM events ORDER BY date DESC")
-        events = cursor.fetchall()
-        cursor.close()
-        
-        # Convert date objects to strings
-        for event in events:
-            if event['date']:
-                event['date'] = event['date'].strftime('%Y-%m-%d')
-            if event['created_at']:
-                event['created_at'] = event['created_at'].isoformat()
-            if event['updated_at']:
-                event['updated_at'] = event['updated_at'].isoformat()
-        
-        return jsonify({'success': True, 'events': events}), 200
+        limit = parse_limit(request.args)
+        fields = parse_fields(request.args, EVENT_FIELDS, always=('id', 'date'))
+        date_from = parse_date_arg('date_from')
+        date_to = parse_date_arg('date_to')
+        after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if wants_ndjson():
+        return ndjson_listing(lambda conn: events_repo.iter_list(
+            conn, Config.EXPORT_BATCH_SIZE, fields, date_from, date_to, after
+        ))
+    
+    def build():
+        events, next_cursor = events_repo.list(limit, fields, date_from, date_to, after)
+        return {'success': True, 'events': events, 'next_cursor': next_cursor}
+    
+    try:
+        return conditional_json(response_cache, versions_repo.get(('events',)), build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -55,48 +203,69 @@ def create_event():
             if field not in data:
                 return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO events (title, date, location, type, description)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (
-            data['title'],
-            data['date'],
-            data.get('location', ''),
-            data.get('type', ''),
-            data.get('description', '')
-        ))
-        
-        event_id = cursor.lastrowid
-        conn.commit()
-        cursor.close()
+        event_id = events_repo.create(data)
         
         return jsonify({'success': True, 'event_id': event_id}), 201
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/events/import', methods=['POST'])
+def import_events():
+    """Import events from a CSV or JSON Lines request body
+    
+    The body is parsed as it is read, so uploads of any size use constant
+    memory. ?format=csv|jsonl overrides the Content-Type. CSV needs a
+    header row with title and date (location, type and description are
+    optional). Valid rows are imported even if others fail; the response
+    lists the failed rows.
+    """
+    fmt = request.args.get('format') or bulk_io.detect_format(mimetype=request.mimetype)
+    if fmt not in bulk_io.FORMATS:
+        return jsonify({'success': False, 'error': f"Invalid format. Must be one of: {', '.join(bulk_io.FORMATS)}"}), 400
+    
+    try:
+        stream = io.TextIOWrapper(io.BufferedReader(request.stream), encoding='utf-8-sig', newline='')
+        summary = bulk_io.import_events(db, stream, fmt)
+        return jsonify({'success': True, **summary}), 200
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'success': False, 'error': f'Could not read upload: {e}'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def ndjson_listing(batches):
+    """Stream the row batches of `batches(conn)` as newline-delimited JSON
+    
+    Rows are written as they are fetched, on a connection held until the
+    last one is sent, so listings of any size use constant memory.
+    """
+    def chunks():
+        with db.connection() as conn:
+            yield from ndjson_chunks(batches(conn))
+    return Response(stream_with_context(chunks()), mimetype=NDJSON_MIMETYPE)
+
+def export_response(chunks, name, fmt):
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={name}.{fmt}'
+    })
+
+@app.route('/api/events/export', methods=['GET'])
+def export_events():
+    """Download every event as CSV or JSON Lines (?format=csv|jsonl)"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in bulk_io.FORMATS:
+        return jsonify({'success': False, 'error': f"Invalid format. Must be one of: {', '.join(bulk_io.FORMATS)}"}), 400
+    return export_response(bulk_io.export_events(db, fmt), 'events', fmt)
+
 @app.route('/api/events/<int:event_id>', methods=['GET'])
 def get_event(event_id):
     """Get a specific event"""
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM events WHERE id = %s", (event_id,))
-        event = cursor.fetchone()
-        cursor.close()
+        event = events_repo.get(event_id)
         
         if not event:
             return jsonify({'success': False, 'error': 'Event not found'}), 404
         
-        if event['date']:
-            event['date'] = event['date'].strftime('%Y-%m-%d')
-        if event['created_at']:
-            event['created_at'] = event['created_at'].isoformat()
-        if event['updated_at']:
-            event['updated_at'] = event['updated_at'].isoformat()
-        
         return jsonify({'success': True, 'event': event}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -106,24 +275,7 @@ def update_event(event_id):
     """Update an event"""
     try:
         data = request.json
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE events 
-            SET title = %s, date = %s, location = %s, type = %s, description = %s
-            WHERE id = %s
-        """, (
-            data.get('title'),
-            data.get('date'),
-            data.get('location', ''),
-            data.get('type', ''),
-            data.get('description', ''),
-            event_id
-        ))
-        
-        conn.commit()
-        cursor.close()
+        events_repo.update(event_id, data)
         
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -133,11 +285,7 @@ def update_event(event_id):
 def delete_event(event_id):
     """Delete an event"""
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM events WHERE id = %s", (event_id,))
-        conn.commit()
-        cursor.close()
+        events_repo.delete(event_id)
         
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -145,107 +293,426 @@ def delete_event(event_id):
 
 # ==================== Post Generation APIs ====================
 
+def sse(event, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def force_new_draft(data):
+    """Whether a generate request must not return an existing identical draft
+    
+    "force" defaults to "regenerate": asking for a fresh generation never
+    hands back the draft it is meant to replace.
+    """
+    return bool(data.get('force', data.get('regenerate', False)))
+
+def draft_payload(draft):
+    """Response fields for a stored draft returned instead of a new post"""
+    return {
+        'post_id': draft['id'],
+        'content': draft['content'],
+        'hashtags': draft['hashtags'],
+        'reused': True
+    }
+
+def find_platform_drafts(event_id, platforms, tone):
+    """{platform: stored draft} for the platforms that already have an identical draft"""
+    event = events_repo.get(event_id)
+    if not event:
+        # Left to the job, which dead-letters it
+        return {}
+    event_data = event_generation_data(event)
+    generator = get_ai_generator()
+    fingerprints = {platform: generator.fingerprint(event_data, platform, tone) for platform in platforms}
+    drafts = posts_repo.find_drafts(event_id, list(fingerprints.values()))
+    return {platform: drafts[fingerprint] for platform, fingerprint in fingerprints.items() if fingerprint in drafts}
+
 @app.route('/api/generate-post', methods=['POST'])
 def generate_post():
-    """Generate a social media post"""
+    """Generate a social media post
+    
+    With "async": true the request is queued for the background workers
+    and a job id is returned immediately (poll GET /api/jobs/<id>);
+    platforms that already have an identical draft are not queued.
+    With "platforms": [...] instead of "platform", one completion produces
+    a post for every listed platform and all of them are saved together.
+    If a draft was already generated from the same event data, platform
+    and tone it is returned ("reused": true) instead of a new one, unless
+    "force" (or "regenerate") is set.
+    """
     try:
         data = request.json
-        required_fields = ['event_id', 'platform', 'tone']
+        required_fields = ['event_id', 'tone']
         
         for field in required_fields:
             if field not in data:
                 return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
         
+        platforms = data.get('platforms')
+        if platforms is not None:
+            valid = isinstance(platforms, list) and platforms and all(isinstance(p, str) and p for p in platforms)
+            if not valid:
+                return jsonify({'success': False, 'error': 'platforms must be a non-empty list of platform names'}), 400
+        elif 'platform' not in data:
+            return jsonify({'success': False, 'error': 'Missing required field: platform'}), 400
+        
+        if data.get('async'):
+            try:
+                priority = int(data.get('priority', 0))
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'priority must be an integer'}), 400
+            
+            requested = list(dict.fromkeys(platforms)) if platforms else [data['platform']]
+            drafts = {} if force_new_draft(data) else find_platform_drafts(data['event_id'], requested, data['tone'])
+            
+            # Queued jobs are generated one platform at a time
+            queued = [platform for platform in requested if platform not in drafts]
+            job_ids = [
+                job_queue.enqueue(
+                    data['event_id'],
+                    platform,
+                    data['tone'],
+                    priority=priority,
+                    use_cache=not data.get('regenerate', False)
+                )
+                for platform in queued
+            ]
+            if not platforms:
+                if drafts:
+                    return jsonify({'success': True, **draft_payload(drafts[data['platform']])}), 200
+                return jsonify({'success': True, 'job_id': job_ids[0], 'status': 'queued'}), 202
+            posts = [{'platform': platform, **draft_payload(draft)} for platform, draft in drafts.items()]
+            if not queued:
+                return jsonify({'success': True, 'posts': posts}), 200
+            return jsonify({
+                'success': True,
+                'job_ids': job_ids,
+                'platforms': queued,
+                'posts': posts,
+                'status': 'queued'
+            }), 202
+        
         # Get event data
-        conn = db.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM events WHERE id = %s", (data['event_id'],))
-        event = cursor.fetchone()
-        cursor.close()
+        event = events_repo.get(data['event_id'])
         
         if not event:
             return jsonify({'success': False, 'error': 'Event not found'}), 404
         
-        # Convert event date to string
-        event_data = {
-            'title': event['title'],
-            'date': event['date'].strftime('%Y-%m-%d') if event['date'] else '',
-            'location': event['location'] or '',
-            'type': event['type'] or '',
-            'description': event['description'] or ''
-        }
-        
-        # Generate post
-        result = ai_generator.generate_post(
-            event_data,
-            data['platform'],
-            data['tone']
-        )
+        event_data = event_generation_data(event)
+        force = force_new_draft(data)
+        
+        if platforms:
+            generator = get_ai_generator()
+            fingerprints = {
+                platform: generator.fingerprint(event_data, platform, data['tone'])
+                for platform in platforms
+            }
+            drafts = {} if force else posts_repo.find_drafts(data['event_id'], list(fingerprints.values()))
+            
+            # Only platforms without an identical draft are generated
+            missing = [platform for platform in fingerprints if fingerprints[platform] not in drafts]
+            results = {}
+            post_ids = {}
+            if missing:
+                results = generator.generate_posts(
+                    event_data,
+                    missing,
+                    data['tone'],
+                    use_cache=not data.get('regenerate', False)
+                )
+                post_ids = posts_repo.create_for_platforms(data['event_id'], data['tone'], results, fingerprints)
+            
+            posts = []
+            for platform, fingerprint in fingerprints.items():
+                if platform in results:
+                    posts.append({
+                        'post_id': post_ids[platform],
+                        'platform': platform,
+                        'content': results[platform]['content'],
+                        'hashtags': results[platform]['hashtags'],
+                        'reused': False
+                    })
+                else:
+                    posts.append({'platform': platform, **draft_payload(drafts[fingerprint])})
+            return jsonify({'success': True, 'posts': posts}), 200
         
-        # Save generated post to database
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO generated_posts (event_id, platform, tone, content, hashtags, status)
-            VALUES (%s, %s, %s, %s, %s, 'draft')
-        """, (
-            data['event_id'],
+        fingerprint = get_ai_generator().fingerprint(event_data, data['platform'], data['tone'])
+        if not force:
+            draft = posts_repo.find_draft(data['event_id'], fingerprint)
+            if draft:
+                return jsonify({'success': True, **draft_payload(draft)}), 200
+        
+        # Generate post (explicit regenerations skip the generation cache)
+        result = get_ai_generator().generate_post(
+            event_data,
             data['platform'],
             data['tone'],
-            result['content'],
-            result['hashtags']
-        ))
+            use_cache=not data.get('regenerate', False)
+        )
         
-        post_id = cursor.lastrowid
-        conn.commit()
-        cursor.close()
+        post_id = posts_repo.create(data['event_id'], data['platform'], data['tone'], result, fingerprint)
         
         return jsonify({
             'success': True,
             'post_id': post_id,
             'content': result['content'],
-            'hashtags': result['hashtags']
+            'hashtags': result['hashtags'],
+            'reused': False
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/generate-post/stream', methods=['POST'])
+def generate_post_stream():
+    """Generate a social media post, streaming it as Server-Sent Events
+    
+    Emits `delta` events ({section, text}) while the post is generated, a
+    `reset` event if the model failed part-way and the template fallback
+    takes over, then a single `done` event with the saved post, or an
+    `error` event. An existing identical draft is sent as the `done` event
+    right away unless "force" (or "regenerate") is set.
+    """
+    try:
+        data = request.json
+        required_fields = ['event_id', 'platform', 'tone']
+        
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
+        
+        event = events_repo.get(data['event_id'])
+        
+        if not event:
+            return jsonify({'success': False, 'error': 'Event not found'}), 404
+        
+        event_data = event_generation_data(event)
+        fingerprint = get_ai_generator().fingerprint(event_data, data['platform'], data['tone'])
+        draft = None if force_new_draft(data) else posts_repo.find_draft(data['event_id'], fingerprint)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    def stream():
+        if draft:
+            yield sse('done', {'success': True, **draft_payload(draft)})
+            return
+        messages = get_ai_generator().stream_post(event_data, data['platform'], data['tone'],
+                                                  use_cache=not data.get('regenerate', False))
+        try:
+            for message in messages:
+                if message[0] == 'delta':
+                    yield sse('delta', {'section': message[1], 'text': message[2]})
+                elif message[0] == 'reset':
+                    yield sse('reset', {})
+                else:
+                    result = message[1]
+                    post_id = posts_repo.create(data['event_id'], data['platform'], data['tone'], result,
+                                                fingerprint)
+                    yield sse('done', {
+                        'success': True,
+                        'post_id': post_id,
+                        'content': result['content'],
+                        'hashtags': result['hashtags'],
+                        'reused': False
+                    })
+        except Exception as e:
+            yield sse('error', {'success': False, 'error': str(e)})
+        finally:
+            # A client that disconnected closes this generator; stop the
+            # generation (and its upstream stream) with it
+            messages.close()
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/generate-posts/batch', methods=['POST'])
+def generate_posts_batch():
+    """Generate posts for every event x platform x tone combination
+
+    Results are streamed back as newline-delimited JSON, one line per
+    combination as soon as it finishes, followed by a summary line once
+    all generated posts have been saved.
+    """
+    try:
+        data = request.json
+        required_fields = ['event_ids', 'platforms', 'tones']
+        
+        for field in required_fields:
+            if not data.get(field) or not isinstance(data[field], list):
+                return jsonify({'success': False, 'error': f'Missing or empty list field: {field}'}), 400
+        
+        event_ids = list(dict.fromkeys(int(event_id) for event_id in data['event_ids']))
+        platforms = list(dict.fromkeys(data['platforms']))
+        tones = list(dict.fromkeys(data['tones']))
+        
+        total = len(event_ids) * len(platforms) * len(tones)
+        if total > Config.BATCH_MAX_ITEMS:
+            return jsonify({
+                'success': False,
+                'error': f'Batch too large: {total} posts requested, maximum is {Config.BATCH_MAX_ITEMS}'
+            }), 400
+        
+        concurrency = max(1, min(int(data.get('concurrency', Config.BATCH_MAX_CONCURRENCY)),
+                                 Config.BATCH_MAX_CONCURRENCY))
+        
+        # Load every requested event with a single query
+        events = {event['id']: event_generation_data(event) for event in events_repo.get_many(event_ids)}
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid batch request: {e}'}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    def stream():
+        rows = []
+        failed = 0
+        
+        for event_id in event_ids:
+            if event_id not in events:
+                for platform in platforms:
+                    for tone in tones:
+                        failed += 1
+                        yield json.dumps({
+                            'success': False,
+                            'event_id': event_id,
+                            'platform': platform,
+                            'tone': tone,
+                            'error': 'Event not found'
+                        }) + '\n'
+        
+        combinations = [
+            (event_id, platform, tone)
+            for event_id in event_ids if event_id in events
+            for platform in platforms
+            for tone in tones
+        ]
+        # Generations run on AIGenerator's event loop, so in-flight LLM
+        # calls don't each hold a thread
+        futures = dict(zip(
+            get_ai_generator().submit_batch(
+                [(events[event_id], platform, tone) for event_id, platform, tone in combinations],
+                concurrency
+            ),
+            combinations
+        ))
+        try:
+            for future in as_completed(futures):
+                event_id, platform, tone = futures[future]
+                item = {'event_id': event_id, 'platform': platform, 'tone': tone}
+                try:
+                    result = future.result()
+                    rows.append((event_id, platform, tone, result['content'], result['hashtags'],
+                                 get_ai_generator().fingerprint(events[event_id], platform, tone)))
+                    item.update(success=True, content=result['content'], hashtags=result['hashtags'])
+                except Exception as e:
+                    failed += 1
+                    item.update(success=False, error=str(e))
+                yield json.dumps(item) + '\n'
+        finally:
+            # Stop queued generations if the client goes away mid-stream
+            for future in futures:
+                future.cancel()
+        
+        summary = {'done': True, 'total': total, 'succeeded': len(rows), 'failed': failed, 'saved': 0}
+        try:
+            # Save all generated posts with a single bulk insert
+            summary['saved'] = posts_repo.create_many(rows)
+        except Exception as e:
+            summary['error'] = str(e)
+        yield json.dumps(summary) + '\n'
+    
+    return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
+
 @app.route('/api/posts', methods=['GET'])
 def get_posts():
-    """Get all generated posts, optionally filtered by event_id"""
+    """Get generated posts, newest first, one keyset page at a time
+    
+    Query parameters: limit, cursor, fields (id and created_at are always
+    included), event_id, status, platform, date_from and date_to
+    (inclusive, YYYY-MM-DD, matched against created_at). Supports
+    conditional GETs (ETag / Last-Modified), and NDJSON streaming like
+    get_events().
+    """
+    try:
+        limit = parse_limit(request.args)
+        fields = parse_fields(request.args, POST_COLUMNS, always=('id', 'created_at'))
+        date_from = parse_date_arg('date_from')
+        date_to = parse_date_arg('date_to')
+        after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    filters = {
+        'event_id': request.args.get('event_id', type=int),
+        'status': request.args.get('status'),
+        'platform': request.args.get('platform'),
+        'created_from': date_from,
+        'created_before': date_to + timedelta(days=1) if date_to else None,
+        'after': after
+    }
+    if wants_ndjson():
+        return ndjson_listing(lambda conn: posts_repo.iter_list(conn, Config.EXPORT_BATCH_SIZE, fields, **filters))
+    
+    def build():
+        posts, next_cursor = posts_repo.list(limit, fields, **filters)
+        return {'success': True, 'posts': posts, 'next_cursor': next_cursor}
+    
     try:
-        event_id = request.args.get('event_id', type=int)
-        conn = db.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        if event_id:
-            cursor.execute("""
-                SELECT gp.*, e.title as event_title 
-                FROM generated_posts gp
-                JOIN events e ON gp.event_id = e.id
-                WHERE gp.event_id = %s
-                ORDER BY gp.created_at DESC
-            """, (event_id,))
-        else:
-            cursor.execute("""
-                SELECT gp.*, e.title as event_title 
-                FROM generated_posts gp
-                JOIN events e ON gp.event_id = e.id
-                ORDER BY gp.created_at DESC
-            """)
-        
-        posts = cursor.fetchall()
-        cursor.close()
-        
-        # Convert datetime objects to strings
-        for post in posts:
-            if post['created_at']:
-                post['created_at'] = post['created_at'].isoformat()
-            if post['updated_at']:
-                post['updated_at'] = post['updated_at'].isoformat()
-        
-        return jsonify({'success': True, 'posts': posts}), 200
+        # Event edits also bump generated_posts, which covers event_title
+        return conditional_json(response_cache, versions_repo.get(('generated_posts',)), build)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_content():
+    """Full-text search over event titles/descriptions and post content/hashtags
+    
+    Query parameters: q, type (all, events or posts), limit, cursor
+    (next_cursor from the previous page), and event_id / status to search
+    only posts. Results are ranked by relevance and carry `highlights`:
+    HTML snippets with the matched words in <mark>.
+    """
+    try:
+        terms = parse_terms(request.args.get('q'))
+        if not terms:
+            raise ValueError('Query parameter q is required')
+        kind = request.args.get('type', 'all')
+        if kind not in ('all', 'events', 'posts'):
+            raise ValueError('Invalid type. Must be one of: all, events, posts')
+        limit = parse_limit(request.args)
+        offset = decode_cursor(request.args['cursor'], 1)[0] if request.args.get('cursor') else 0
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError('Invalid cursor')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def build():
+        # Deep pages cost a query of offset + limit rows per table
+        page_limit = max(0, min(limit, Config.SEARCH_MAX_RESULTS - offset))
+        results, has_more = search_repo.search(
+            terms,
+            kinds=('events', 'posts') if kind == 'all' else (kind,),
+            offset=offset,
+            limit=page_limit,
+            event_id=request.args.get('event_id', type=int),
+            status=request.args.get('status')
+        ) if page_limit else ([], False)
+        
+        next_cursor = encode_cursor([offset + page_limit]) if has_more else None
+        return {'success': True, 'query': ' '.join(terms), 'results': results, 'next_cursor': next_cursor}
+    
+    try:
+        return conditional_json(response_cache, versions_repo.get(('events', 'generated_posts')), build)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/posts/export', methods=['GET'])
+def export_posts():
+    """Download generated posts as CSV or JSON Lines (?format=csv|jsonl, optional event_id)"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in bulk_io.FORMATS:
+        return jsonify({'success': False, 'error': f"Invalid format. Must be one of: {', '.join(bulk_io.FORMATS)}"}), 400
+    return export_response(bulk_io.export_posts(db, fmt, request.args.get('event_id', type=int)), 'posts', fmt)
+
 @app.route('/api/posts/<int:post_id>', methods=['PUT'])
 def update_post_status(post_id):
     """Update post status (draft/approved/posted)"""
@@ -256,11 +723,7 @@ def update_post_status(post_id):
         if status not in ['draft', 'approved', 'posted']:
             return jsonify({'success': False, 'error': 'Invalid status. Must be: draft, approved, or posted'}), 400
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE generated_posts SET status = %s WHERE id = %s", (status, post_id))
-        conn.commit()
-        cursor.close()
+        posts_repo.update_status(post_id, status)
         
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -270,16 +733,70 @@ def update_post_status(post_id):
 def delete_post(post_id):
     """Delete a generated post"""
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM generated_posts WHERE id = %s", (post_id,))
-        conn.commit()
-        cursor.close()
+        posts_repo.delete(post_id)
         
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# ==================== Job APIs ====================
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status of a queued generation (and its post once done)"""
+    try:
+        job = job_queue.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """List jobs by status (default: dead, i.e. the dead-letter queue)"""
+    try:
+        status = request.args.get('status', 'dead')
+        if status not in JOB_STATUSES:
+            return jsonify({'success': False, 'error': f"Invalid status. Must be one of: {', '.join(JOB_STATUSES)}"}), 400
+        jobs = job_queue.list(status, parse_limit(request.args))
+        return jsonify({'success': True, 'jobs': jobs}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """Re-queue a dead-lettered job"""
+    try:
+        if not job_queue.retry(job_id):
+            return jsonify({'success': False, 'error': 'Job not found or not dead'}), 404
+        return jsonify({'success': True}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# ==================== Monitoring APIs ====================
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get runtime statistics (connection pool, generation cache, rate limiter, hashtag index and job queue)"""
+    try:
+        jobs = dict(job_workers.stats(), counts=job_queue.counts())
+    except Exception as e:
+        jobs = {'error': str(e)}
+    return jsonify({
+        'success': True,
+        'db_pool': db.pool_stats(),
+        'generation_cache': generator_stats('cache_stats')(),
+        'rate_limiter': generator_stats('rate_limit_stats')(),
+        'hashtag_index': hashtag_index.stats() if hashtag_index else None,
+        'jobs': jobs
+    }), 200
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    db.initialize_database()
+    try:
+        app.run(debug=Config.DEBUG, host='0.0.0.0', port=5000)
+    finally:
+        shutdown(timeout=5)
 
@@ -0,0 +1,63 @@
+"""
+Fallback-mode microbenchmark
+Measures prompt builds/sec and template (no API key) posts/sec through
+AIGenerator across every platform/tone combination.
+
+Usage:
+    python benchmarks/bench_fallback.py --iterations 200000
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+Config.OPENAI_API_KEY = ''
+
+from ai_generator import AIGenerator
+from prompt_templates import PLATFORM_GUIDELINES, TONE_GUIDELINES
+
+EVENTS = [
+    {
+        'title': 'AI Summit 2026',
+        'date': '2026-05-14',
+        'location': 'Berlin, Germany',
+        'type': 'Conference',
+        'description': 'Two days of talks and workshops on applied machine learning. ' * 4
+    },
+    {
+        'title': 'Community Meetup',
+        'date': '2026-06-02',
+        'location': '',
+        'type': 'Meetup',
+        'description': 'An informal evening with the local developer community.'
+    },
+]
+
+
+def run(label, func, iterations, combos):
+    started = time.perf_counter()
+    for _, (event, platform, tone) in zip(range(iterations), itertools.cycle(combos)):
+        func(event, platform, tone)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {iterations / elapsed:>12,.0f} /sec   ({elapsed * 1e6 / iterations:.2f} us each)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    generator = AIGenerator()
+    combos = list(itertools.product(EVENTS, PLATFORM_GUIDELINES, TONE_GUIDELINES))
+
+    # Warm up
+    for event, platform, tone in combos:
+        generator.generate_post(event, platform, tone)
+
+    run('prompt build', generator._build_prompt, args.iterations, combos)
+    run('fallback post', generator.generate_post, args.iterations, combos)
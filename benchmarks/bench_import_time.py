@@ -0,0 +1,156 @@
+"""
+Cold start benchmark: import time of the app and its first request
+Imports app.py in fresh interpreters under `python -X importtime`, then
+serves one GET /api/events in the same process. Reports the median import
+and first-request times and which packages the import time goes to. It
+also checks that the packages meant to load on first use (openai, httpx,
+the MySQL driver) are not imported with the app. A run can be stored as a
+baseline, and later runs are compared with it.
+
+Usage:
+    python benchmarks/bench_import_time.py --save-baseline
+    python benchmarks/bench_import_time.py              # compare with the baseline
+    python benchmarks/bench_import_time.py --runs 10 --top 20
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'results', 'import_time_baseline.json')
+
+# Imported by the first LLM call or MySQL connection, never by `import app`
+LAZY_MODULES = ('openai', 'httpx', 'mysql.connector')
+
+# A run regresses when the median is this much slower than the baseline
+MAX_SLOWDOWN = 0.20
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/api/events?limit=10')
+served = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - started,
+    'first_request_seconds': served - imported,
+    'status': response.status_code,
+    'lazy_loaded': [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def child_env(sqlite_path):
+    env = dict(os.environ)
+    env.update({
+        'DB_BACKEND': 'sqlite',
+        'SQLITE_PATH': sqlite_path,
+        'JOB_WORKERS': '0',
+        'LOG_REQUESTS': 'False',
+        'OPENAI_API_KEY': '',
+        'PYTHONDONTWRITEBYTECODE': '',
+    })
+    return env
+
+
+def run_once(env):
+    """One cold import; returns (result dict, {package: self seconds})"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    packages = {}
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            package = match.group(4).split('.')[0]
+            packages[package] = packages.get(package, 0.0) + int(match.group(1)) / 1e6
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    return result, packages
+
+
+def measure(runs):
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite_path = os.path.join(directory, 'import_time.sqlite3')
+        env = child_env(sqlite_path)
+        subprocess.run([sys.executable, 'setup_database.py'], cwd=ROOT, env=env, capture_output=True, check=True)
+        # Warm the bytecode cache so every measured run reads .pyc files
+        run_once(env)
+        samples = [run_once(env) for _ in range(runs)]
+
+    packages = {}
+    for _, run_packages in samples:
+        for package, seconds in run_packages.items():
+            packages.setdefault(package, []).append(seconds)
+    return {
+        'import_seconds': statistics.median(result['import_seconds'] for result, _ in samples),
+        'first_request_seconds': statistics.median(result['first_request_seconds'] for result, _ in samples),
+        'statuses': sorted({result['status'] for result, _ in samples}),
+        'lazy_loaded': sorted({name for result, _ in samples for name in result['lazy_loaded']}),
+        'packages': {package: statistics.median(values) for package, values in packages.items()},
+    }
+
+
+def compare(results, baseline):
+    """List of human-readable regressions against a baseline"""
+    regressions = []
+    for key in ('import_seconds', 'first_request_seconds'):
+        previous = baseline.get(key)
+        if previous and results[key] > previous * (1 + MAX_SLOWDOWN):
+            regressions.append(f"{key}: {results[key] * 1000:.0f} ms vs {previous * 1000:.0f} ms")
+    return regressions
+
+
+def print_results(results, top):
+    print(f"import app        {results['import_seconds'] * 1000:8.1f} ms (median)")
+    print(f"first request     {results['first_request_seconds'] * 1000:8.1f} ms (median, "
+          f"status {'/'.join(map(str, results['statuses']))})")
+    print(f"\nTop {top} packages by import time (self time, summed over modules):")
+    ranked = sorted(results['packages'].items(), key=lambda item: -item[1])[:top]
+    for package, seconds in ranked:
+        print(f"  {package:<28} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to measure')
+    parser.add_argument('--top', type=int, default=15, help='Packages to list')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    print_results(results, args.top)
+
+    failed = False
+    if results['lazy_loaded']:
+        print(f"\nImported eagerly but meant to load on first use: {', '.join(results['lazy_loaded'])}")
+        failed = True
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif not os.path.exists(args.baseline):
+        print('\nNo baseline yet; run with --save-baseline to store one')
+    else:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            print('\nRegressions:')
+            for regression in regressions:
+                print(f"  {regression}")
+            failed = True
+        else:
+            print('\nNo regressions against the baseline')
+
+    sys.exit(1 if failed else 0)
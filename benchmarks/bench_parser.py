@@ -0,0 +1,74 @@
+"""
+Response parser benchmark
+Measures responses/sec for the previous line-split parser and for the
+single-pass parser with platform limits. The parser's invariants are
+checked by tests/test_response_parser.py.
+
+Usage:
+    python benchmarks/bench_parser.py --iterations 50000
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_parser import PLATFORM_LIMITS, enforce_platform_limits, parse_response
+
+RESPONSES = [
+    "CONTENT:\nJoin us for an unforgettable event! Connect with peers, learn from experts "
+    "and leave inspired.\n\nHASHTAGS:\n#Event #Community #Networking\n",
+    "Here is your post:\n\ncontent:\n✨ AI Summit 2026 ✨\n\n📅 May 14\n📍 Berlin\n\n"
+    + "Two days of talks and workshops on applied machine learning. " * 8
+    + "\n\nHashtags: #AI #MachineLearning #ai #Berlin, #Tech! #Summit2026 #Event #Community\n",
+    "CONTENT:\n" + "👩‍💻 Builders wanted. " * 30 + "\nHASHTAGS:\n#Dev #Build\n",
+]
+
+
+def legacy_parse(response_text):
+    """The line-split parser this module replaced, for comparison"""
+    lines = response_text.split('\n')
+    content_lines = []
+    hashtags = []
+    current_section = None
+    for line in lines:
+        line = line.strip()
+        if 'CONTENT:' in line.upper():
+            current_section = 'content'
+            continue
+        elif 'HASHTAGS:' in line.upper():
+            current_section = 'hashtags'
+            continue
+        if current_section == 'content' and line:
+            content_lines.append(line)
+        elif current_section == 'hashtags' and line:
+            for word in line.split():
+                if word.startswith('#'):
+                    hashtags.append(word)
+    return '\n'.join(content_lines).strip(), ' '.join(hashtags)
+
+
+def single_pass(response_text, platform):
+    content, hashtags, _ = parse_response(response_text)
+    return enforce_platform_limits(content, hashtags, platform)
+
+
+def run(label, func, iterations):
+    combos = list(itertools.product(RESPONSES, PLATFORM_LIMITS))
+    started = time.perf_counter()
+    for _, (response, platform) in zip(range(iterations), itertools.cycle(combos)):
+        func(response, platform)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {iterations / elapsed:>12,.0f} /sec   ({elapsed * 1e6 / iterations:.2f} us each)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50000)
+    args = parser.parse_args()
+
+    run('line-split (previous)', lambda response, platform: legacy_parse(response), args.iterations)
+    run('single pass', lambda response, platform: parse_response(response), args.iterations)
+    run('single pass + limits', single_pass, args.iterations)
@@ -0,0 +1,165 @@
+"""
+Query plan benchmark for the listing queries
+Builds a scratch database at schema version 1 (no secondary indexes),
+seeds it, then prints EXPLAIN output and latencies for the hot queries
+before and after migrating to the latest schema version.
+
+Usage:
+    python benchmarks/bench_query_plans.py --events 2000 --posts 200000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from config import Config
+from migrations import run_migrations
+
+PLATFORMS = ['linkedin', 'instagram', 'facebook', 'twitter']
+TONES = ['formal', 'professional', 'promotional', 'friendly']
+STATUSES = ['draft', 'draft', 'draft', 'approved', 'posted']
+
+QUERIES = {
+    'events page': (
+        "SELECT * FROM events ORDER BY date DESC, id DESC LIMIT 51",
+        ()
+    ),
+    'posts page': (
+        """SELECT gp.*, e.title AS event_title FROM generated_posts gp
+           JOIN events e ON gp.event_id = e.id
+           ORDER BY gp.created_at DESC, gp.id DESC LIMIT 51""",
+        ()
+    ),
+    'posts by event': (
+        """SELECT gp.*, e.title AS event_title FROM generated_posts gp
+           JOIN events e ON gp.event_id = e.id
+           WHERE gp.event_id = %s
+           ORDER BY gp.created_at DESC, gp.id DESC LIMIT 51""",
+        ('event_id',)
+    ),
+    'posts by status': (
+        """SELECT gp.id, gp.status, gp.created_at FROM generated_posts gp
+           WHERE gp.status = %s
+           ORDER BY gp.created_at DESC, gp.id DESC LIMIT 51""",
+        ('status',)
+    ),
+}
+
+
+def seed(conn, events, posts, chunk=5000):
+    cursor = conn.cursor()
+    start = date(2024, 1, 1)
+    rows = [
+        (f'Event {i}', start + timedelta(days=random.randint(0, 900)), 'Somewhere', 'Conference', 'Description ' * 20)
+        for i in range(events)
+    ]
+    for i in range(0, len(rows), chunk):
+        cursor.executemany(
+            "INSERT INTO events (title, date, location, type, description) VALUES (%s, %s, %s, %s, %s)",
+            rows[i:i + chunk]
+        )
+    conn.commit()
+
+    cursor.execute("SELECT MIN(id), MAX(id) FROM events")
+    low, high = cursor.fetchone()
+    now = datetime.now()
+    for i in range(0, posts, chunk):
+        cursor.executemany("""
+            INSERT INTO generated_posts (event_id, platform, tone, content, hashtags, status, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [
+            (random.randint(low, high), random.choice(PLATFORMS), random.choice(TONES),
+             'Generated content ' * 15, '#Event #Community', random.choice(STATUSES),
+             now - timedelta(seconds=random.randint(0, 86400 * 365)))
+            for _ in range(min(chunk, posts - i))
+        ])
+        conn.commit()
+    cursor.close()
+    return low, high
+
+
+def measure(conn, repeat, event_range):
+    cursor = conn.cursor()
+    for table in ('events', 'generated_posts'):
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+
+    results = {}
+    for name, (sql, param_names) in QUERIES.items():
+        def params():
+            values = {'event_id': random.randint(*event_range), 'status': 'approved'}
+            return tuple(values[p] for p in param_names)
+
+        cursor.execute("EXPLAIN " + sql, params())
+        columns = [column[0] for column in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql, params())
+            cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[name] = {
+            'plan': plan,
+            'median_ms': statistics.median(timings),
+            'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        }
+    cursor.close()
+    return results
+
+
+def print_results(label, results):
+    print(f"\n=== {label} ===")
+    for name, result in results.items():
+        print(f"\n{name}: median {result['median_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms")
+        for step in result['plan']:
+            print(f"  table={step.get('table')} type={step.get('type')} key={step.get('key')} "
+                  f"rows={step.get('rows')} extra={step.get('Extra')}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--database', default=f'{Config.DB_NAME}_bench')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch database afterwards')
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(host=Config.DB_HOST, user=Config.DB_USER, password=Config.DB_PASSWORD)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {args.database}")
+    cursor.execute(f"CREATE DATABASE {args.database}")
+    cursor.close()
+    conn.database = args.database
+
+    try:
+        run_migrations(conn, target_version=1)
+        print(f"Seeding {args.events} events and {args.posts} posts...")
+        event_range = seed(conn, args.events, args.posts)
+
+        before = measure(conn, args.repeat, event_range)
+        run_migrations(conn)
+        after = measure(conn, args.repeat, event_range)
+
+        print_results('Before (schema version 1)', before)
+        print_results('After (latest schema)', after)
+
+        print("\n=== Summary (median ms) ===")
+        for name in QUERIES:
+            b, a = before[name]['median_ms'], after[name]['median_ms']
+            print(f"{name:<16} {b:>10.2f} -> {a:>8.2f}  ({b / a if a else float('inf'):.1f}x)")
+    finally:
+        if not args.keep:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {args.database}")
+            cursor.close()
+        conn.close()
@@ -0,0 +1,140 @@
+"""
+Rate limiter check against a rate-limited fake OpenAI server
+Starts tools/fake_openai_server.py with an RPM limit and fires a burst of
+generations at it from several worker processes, first without the
+client-side limiter, then with per-process (memory) buckets, then with
+buckets shared through the database. Reports 429s, template fallbacks,
+queue waits and how closely requests were served in arrival order.
+
+Usage:
+    python benchmarks/bench_rate_limit.py
+    python benchmarks/bench_rate_limit.py --requests 300 --processes 3 --rpm 600
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from tools.fake_openai_server import REPLY, start_server
+
+# The fake server enforces the limit over this many seconds, like the
+# API's sub-minute windows
+RATE_WINDOW = 10
+
+# Posts from the fake API contain this; template fallbacks don't
+FAKE_CONTENT = REPLY.split('CONTENT:', 1)[1].split('!', 1)[0].strip()
+
+
+def configure(base_url, backend, rpm, max_wait, sqlite_path):
+    Config.OPENAI_API_KEY = 'test'
+    Config.OPENAI_BASE_URL = base_url
+    Config.OPENAI_MAX_RETRIES = 0  # surface every 429 instead of retrying it
+    Config.GENERATION_CACHE_BACKEND = 'none'
+    Config.OPENAI_RATE_LIMIT_BACKEND = backend
+    Config.OPENAI_RPM_LIMIT = rpm
+    Config.OPENAI_TPM_LIMIT = 0
+    Config.OPENAI_RATE_LIMIT_MAX_WAIT = max_wait
+    Config.DB_BACKEND = 'sqlite'
+    Config.SQLITE_PATH = sqlite_path
+
+
+def worker(args, backend, requests, start_at, results):
+    """Run `requests` generations on threads, all released at start_at"""
+    configure(args.base_url, backend, args.rpm, args.max_wait, args.sqlite_path)
+    from ai_generator import AIGenerator
+    from database import Database
+
+    db = Database() if backend == 'database' else None
+    generator = AIGenerator(db)
+    outcomes = []
+    lock = threading.Lock()
+
+    def generate(index):
+        event = {'title': f'Event {os.getpid()}-{index}', 'date': '2026-05-14', 'location': 'Berlin',
+                 'type': 'Conference', 'description': 'Talks and workshops.'}
+        time.sleep(max(0.0, start_at - time.time()) + index * 0.001)
+        submitted = time.time()
+        result = generator.generate_post(event, 'linkedin', 'professional')
+        with lock:
+            outcomes.append((submitted, time.time(), FAKE_CONTENT in result['content']))
+
+    threads = [threading.Thread(target=generate, args=(index,)) for index in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((outcomes, generator.rate_limit_stats()))
+    generator.close()
+    if db:
+        db.close()
+
+
+def run(args, backend, server):
+    with server.lock:
+        server.accepted.clear()
+        server.rate_limited = 0
+
+    per_process = args.requests // args.processes
+    start_at = time.time() + 1.5
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(args, backend, per_process, start_at, results))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    outcomes = sorted(outcome for process_outcomes, _ in collected for outcome in process_outcomes)
+    waits = [finished - submitted for submitted, finished, _ in outcomes]
+    ai_posts = sum(1 for _, _, from_api in outcomes if from_api)
+    finish_order = sorted(range(len(outcomes)), key=lambda index: outcomes[index][1])
+    # Largest number of later arrivals that finished before a request
+    overtaken = max((position - index for position, index in enumerate(finish_order)), default=0)
+
+    waits.sort()
+    print(f"{backend:<10} {len(outcomes):>5} requests  {server.rate_limited:>4} x 429  "
+          f"{len(outcomes) - ai_posts:>4} fallbacks  "
+          f"wait p50 {statistics.median(waits):6.2f}s  p95 {waits[int(len(waits) * 0.95) - 1]:6.2f}s  "
+          f"max overtaken {overtaken}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='Generations across all processes')
+    parser.add_argument('--processes', type=int, default=2, help='Worker processes sharing the API key')
+    parser.add_argument('--rpm', type=int, default=600, help="The fake account's requests per minute")
+    parser.add_argument('--headroom', type=float, default=0.85,
+                        help='Client limit as a fraction of the account limit')
+    parser.add_argument('--max-wait', type=float, default=60.0)
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency, rpm_limit=args.rpm, rate_window=RATE_WINDOW)
+    host, port = server.server_address[:2]
+    args.base_url = f'http://{host}:{port}/v1'
+    account_rpm = args.rpm
+    args.rpm = int(account_rpm * args.headroom)
+
+    with tempfile.TemporaryDirectory() as directory:
+        args.sqlite_path = os.path.join(directory, 'rate_limit.sqlite3')
+        configure(args.base_url, 'database', args.rpm, args.max_wait, args.sqlite_path)
+        from database import Database
+        setup = Database()
+        setup.initialize_database()
+        setup.close()
+
+        print(f"Account limit {account_rpm} RPM (enforced per {RATE_WINDOW}s), client limit {args.rpm} RPM, "
+              f"{args.processes} processes")
+        for backend in ('none', 'memory', 'database'):
+            run(args, backend, server)
+    server.shutdown()
@@ -0,0 +1,97 @@
+"""
+List serialization benchmark
+Encodes synthetic post listing pages the way get_posts did before (a
+Python loop converting every datetime column, then Flask's stdlib
+encoder) and with serialization.FastJSONProvider, checks both produce the
+same JSON, and reports pages/sec plus the size and cost of gzip and
+brotli for the resulting bodies.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --rows 500 --iterations 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import serialization
+from serialization import FastJSONProvider, compress
+
+
+def make_rows(count):
+    created = datetime(2026, 5, 14, 9, 30)
+    return [{
+        'id': count - i,
+        'event_id': 1 + i % 40,
+        'event_title': f'AI Summit {i % 40} — Berlin',
+        'platform': ('linkedin', 'twitter', 'instagram', 'facebook')[i % 4],
+        'tone': 'professional',
+        'content': '✨ Two days of talks and workshops on applied machine learning. ' * (2 + i % 5),
+        'hashtags': '#AI #MachineLearning #Berlin #Summit2026',
+        'status': ('draft', 'approved', 'posted')[i % 3],
+        'created_at': created - timedelta(minutes=i),
+        'updated_at': created - timedelta(minutes=i) + timedelta(seconds=30),
+    } for i in range(count)]
+
+
+def legacy_body(app, rows):
+    """What get_posts returned before: converted rows, stdlib jsonify"""
+    posts = [dict(row) for row in rows]
+    for post in posts:
+        if post['created_at']:
+            post['created_at'] = post['created_at'].isoformat()
+        if post.get('updated_at'):
+            post['updated_at'] = post['updated_at'].isoformat()
+    return app.json.response({'success': True, 'posts': posts, 'next_cursor': None}).get_data()
+
+
+def fast_body(app, rows):
+    return app.json.response({'success': True, 'posts': rows, 'next_cursor': None}).get_data()
+
+
+def rate(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+    return iterations / (time.perf_counter() - started), result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200, help='Posts per page')
+    parser.add_argument('--iterations', type=int, default=300, help='Pages encoded per measurement')
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    legacy_app = Flask('legacy')
+    legacy_app.json = DefaultJSONProvider(legacy_app)
+    fast_app = Flask('fast')
+    fast_app.json = FastJSONProvider(fast_app)
+
+    with legacy_app.app_context():
+        legacy_rate, legacy = rate(lambda: legacy_body(legacy_app, rows), args.iterations)
+    with fast_app.app_context():
+        fast_rate, fast = rate(lambda: fast_body(fast_app, rows), args.iterations)
+    if json.loads(legacy) != json.loads(fast):
+        sys.exit('FastJSONProvider output differs from the legacy encoding')
+
+    print(f"{args.rows} posts per page, encoder: {'orjson' if serialization.orjson else 'stdlib json'}")
+    print(f"  legacy loop + jsonify   {legacy_rate:10.0f} pages/s   {len(legacy):8d} bytes")
+    print(f"  FastJSONProvider        {fast_rate:10.0f} pages/s   {len(fast):8d} bytes   "
+          f"({fast_rate / legacy_rate:.1f}x)")
+
+    print('\nCompression of the FastJSONProvider body:')
+    for encoding in serialization.ENCODINGS:
+        encode_rate, encoded = rate(lambda: compress(fast, encoding), args.iterations)
+        print(f"  {encoding:<6} {len(encoded):8d} bytes ({len(encoded) / len(fast):6.1%})   "
+              f"{1000 / encode_rate:7.3f} ms per page")
+    if 'br' not in serialization.ENCODINGS:
+        print('  br     (brotli package not installed)')
@@ -0,0 +1,315 @@
+"""
+HTTP load test for the API
+Unless --url is given, starts the app against the bundled fake OpenAI
+server, seeds a few events, then drives a weighted mix of /api/events,
+/api/posts and /api/generate-post requests from concurrent clients.
+Reports p50/p95/p99 latency, requests/sec and error rate per endpoint,
+and compares the run with a stored baseline to flag regressions.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 16 --duration 30 --save-baseline
+    python benchmarks/load_test.py --concurrency 16 --duration 30      # compare with the baseline
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --mix events=1,generate=1
+"""
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.fake_openai_server import start_server
+
+PLATFORMS = ['linkedin', 'instagram', 'facebook', 'twitter']
+TONES = ['formal', 'professional', 'promotional', 'friendly']
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'results', 'load_test_baseline.json')
+
+# A run regresses when it is this much worse than the baseline
+LATENCY_TOLERANCE = 0.20
+THROUGHPUT_TOLERANCE = 0.15
+ERROR_RATE_TOLERANCE = 0.01
+
+
+def scenario_events(client, state, rng):
+    return client.get('/api/events', params={'limit': 20})
+
+
+def scenario_posts(client, state, rng):
+    params = {'limit': 20}
+    if rng.random() < 0.5:
+        params['event_id'] = rng.choice(state['event_ids'])
+    return client.get('/api/posts', params=params)
+
+
+def scenario_generate(client, state, rng):
+    return client.post('/api/generate-post', json={
+        'event_id': rng.choice(state['event_ids']),
+        'platform': rng.choice(PLATFORMS),
+        'tone': rng.choice(TONES),
+        'regenerate': rng.random() < state['regenerate_ratio']
+    })
+
+
+SCENARIOS = {
+    'events': scenario_events,
+    'posts': scenario_posts,
+    'generate': scenario_generate,
+}
+
+
+def parse_mix(text):
+    """"events=5,posts=4,generate=1" -> {'events': 5, ...}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port, env):
+    """Run app.py's Flask app on a local port, without the reloader"""
+    code = (
+        "import app; "
+        "app.db.initialize_database(); "
+        f"app.app.run(host='127.0.0.1', port={port}, threaded=True, debug=False, use_reloader=False)"
+    )
+    # The server's access log goes to a file: an unread pipe fills up and
+    # blocks the request threads writing to it
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=log
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"App exited during startup:\n{log.read().decode(errors='replace')}")
+        try:
+            httpx.get(url + '/api/events', params={'limit': 1}, timeout=1)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('App did not start within 30 seconds')
+
+
+def seed_events(url, count):
+    """Make sure at least `count` events exist and return their ids"""
+    with httpx.Client(base_url=url, timeout=30) as client:
+        events = client.get('/api/events', params={'limit': count, 'fields': 'id'}).json().get('events', [])
+        ids = [event['id'] for event in events]
+        for i in range(len(ids), count):
+            response = client.post('/api/events', json={
+                'title': f'Load test event {i}',
+                'date': f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}',
+                'location': 'Berlin',
+                'type': 'Conference',
+                'description': 'Talks and workshops on applied machine learning. ' * 3
+            })
+            response.raise_for_status()
+            ids.append(response.json()['event_id'])
+    return ids
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    """Latency percentiles (ms), throughput and error rate for (latency, ok) samples"""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def run_load(url, mix, concurrency, duration, max_requests, state, seed):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        local = {name: [] for name in names}
+        with httpx.Client(base_url=url, timeout=60) as client:
+            while time.monotonic() < deadline:
+                if max_requests:
+                    with lock:
+                        if issued[0] >= max_requests:
+                            break
+                        issued[0] += 1
+                name = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = SCENARIOS[name](client, state, rng)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                local[name].append((time.perf_counter() - started, ok))
+        with lock:
+            for name in names:
+                samples[name].extend(local[name])
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    results = {name: summarize(samples[name], elapsed) for name in names}
+    results['total'] = summarize([sample for name in names for sample in samples[name]], elapsed)
+    return results
+
+
+def compare(results, baseline):
+    """List of human-readable regressions against a baseline result set"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not current['requests']:
+            continue
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if previous[key] and current[key] > previous[key] * (1 + LATENCY_TOLERANCE):
+                regressions.append(f"{name} {key}: {previous[key]} -> {current[key]}")
+        if previous['rps'] and current['rps'] < previous['rps'] * (1 - THROUGHPUT_TOLERANCE):
+            regressions.append(f"{name} rps: {previous['rps']} -> {current['rps']}")
+        if current['error_rate'] > previous['error_rate'] + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{name} error_rate: {previous['error_rate']} -> {current['error_rate']}")
+    return regressions
+
+
+def print_results(results):
+    print(f"{'endpoint':<10} {'requests':>9} {'rps':>9} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results.items():
+        print(
+            f"{name:<10} {row['requests']:>9} {row['rps']:>9.1f} {row['error_rate']:>8.2%} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Test an already running app instead of starting one')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('events=5,posts=4,generate=1'),
+                        help='Weighted scenarios, e.g. events=5,posts=4,generate=1')
+    parser.add_argument('--events', type=int, default=20, help='Events to seed before the run')
+    parser.add_argument('--regenerate-ratio', type=float, default=0.5,
+                        help='Share of generations that bypass the generation cache')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='Fake LLM latency in seconds')
+    parser.add_argument('--llm-jitter', type=float, default=0.1)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra environment for the started app, e.g. --env DB_POOL_SIZE=20')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    args = parser.parse_args()
+
+    process = None
+    llm = None
+    try:
+        url = args.url
+        if not url:
+            llm = start_server(latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate)
+            env = {
+                'OPENAI_API_KEY': 'load-test',
+                'OPENAI_BASE_URL': f'http://127.0.0.1:{llm.server_address[1]}/v1',
+                'LOG_REQUESTS': 'False',
+                'JOB_WORKERS': '0',
+                # The fake LLM has no rate limit; pass --env to load-test the limiter
+                'OPENAI_RATE_LIMIT_BACKEND': 'none',
+            }
+            env.update(item.split('=', 1) for item in args.env)
+            process, url = start_app(free_port(), env)
+
+        state = {
+            'event_ids': seed_events(url, args.events),
+            'regenerate_ratio': args.regenerate_ratio,
+        }
+        results = run_load(url, args.mix, args.concurrency, args.duration, args.requests, state, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+        if llm is not None:
+            llm.shutdown()
+
+    print_results(results)
+
+    config = {
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'mix': args.mix,
+        'llm_latency': args.llm_latency,
+        'llm_error_rate': args.llm_error_rate,
+    }
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'results': results}, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline yet; run with --save-baseline to store one')
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print(f"Warning: baseline was recorded with different settings: {baseline.get('config')}")
+    regressions = compare(results, baseline['results'])
+    if regressions:
+        print('REGRESSION against baseline:')
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print('No regressions against baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
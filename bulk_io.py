@@ -0,0 +1,232 @@
+"""
+Bulk import and export of events and posts
+Imports parse CSV or JSON Lines incrementally from any text stream (an
+upload or a file), validate each row and insert valid rows with
+executemany in chunked transactions, collecting per-row errors instead
+of failing the whole file. Exports stream rows from the database in
+batches, so memory use does not grow with the table.
+
+Usage:
+    python bulk_io.py import events.csv
+    python bulk_io.py import events.jsonl --batch-size 1000
+    python bulk_io.py export events --format jsonl -o events.jsonl
+    python bulk_io.py export posts --event-id 12 -o posts.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from config import Config
+from database import Database
+from repositories import EVENT_FIELDS, POST_COLUMNS, EventRepository, PostRepository
+
+FORMATS = ('csv', 'jsonl')
+
+# Import columns: (name, required, max length)
+EVENT_IMPORT_COLUMNS = (
+    ('title', True, 255),
+    ('date', True, None),
+    ('location', False, 255),
+    ('type', False, 100),
+    ('description', False, None),
+)
+
+POST_EXPORT_FIELDS = tuple(field for field in POST_COLUMNS if field != 'event_title')
+
+
+def detect_format(filename=None, mimetype=None):
+    """Guess csv or jsonl from a file name or a Content-Type"""
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson', '.json')) or 'json' in (mimetype or ''):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_records(stream, fmt):
+    """Yield (line, record, error) for each row of a CSV or JSONL text stream
+
+    record is a dict, or None when the row could not be parsed (error
+    says why). Rows are read one at a time.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            if None in record:
+                yield reader.line_num, None, 'Too many columns'
+            else:
+                yield reader.line_num, record, None
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            yield line, None, f'Invalid JSON: {e}'
+            continue
+        if isinstance(record, dict):
+            yield line, record, None
+        else:
+            yield line, None, 'Expected a JSON object'
+
+
+def validate_event(record):
+    """(title, date, location, type, description) for an import row, or ValueError"""
+    values = []
+    for name, required, max_length in EVENT_IMPORT_COLUMNS:
+        value = record.get(name)
+        value = '' if value is None else str(value).strip()
+        if required and not value:
+            raise ValueError(f'Missing required field: {name}')
+        if max_length and len(value) > max_length:
+            raise ValueError(f'{name} is longer than {max_length} characters')
+        values.append(value)
+
+    try:
+        values[1] = datetime.strptime(values[1], '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Invalid date {values[1]!r}: expected YYYY-MM-DD')
+    return tuple(values)
+
+
+def import_events(db, stream, fmt, batch_size=None, max_errors=None):
+    """Import events from a CSV/JSONL text stream
+
+    Valid rows are inserted batch_size at a time, each batch in its own
+    transaction; a batch the database rejects is reported and skipped.
+    Returns a summary with the first max_errors per-row errors.
+    """
+    batch_size = batch_size or Config.IMPORT_BATCH_SIZE
+    max_errors = Config.IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    repo = EventRepository(db)
+    summary = {'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    def report(error, rows=1):
+        summary['failed'] += rows
+        if len(summary['errors']) < max_errors:
+            summary['errors'].append(error)
+        else:
+            summary['errors_truncated'] = True
+
+    def flush(conn, batch, lines):
+        try:
+            summary['imported'] += repo.insert_batch(conn, batch)
+        except Exception as e:
+            report({'lines': [lines[0], lines[-1]], 'error': str(e)}, rows=len(batch))
+
+    with db.connection() as conn:
+        batch = []
+        lines = []
+        for line, record, error in read_records(stream, fmt):
+            if error is None:
+                try:
+                    batch.append(validate_event(record))
+                    lines.append(line)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                report({'line': line, 'error': error})
+            if len(batch) >= batch_size:
+                flush(conn, batch, lines)
+                batch, lines = [], []
+        if batch:
+            flush(conn, batch, lines)
+    return summary
+
+
+def _plain(value):
+    # datetime is a subclass of date
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _export(db, fields, batches, fmt):
+    """Serialize row batches from `batches(conn)` as CSV or JSONL chunks"""
+    with db.connection() as conn:
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            for rows in batches(conn):
+                writer.writerows([_plain(row[field]) for field in fields] for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in batches(conn):
+                yield ''.join(
+                    json.dumps({field: _plain(row[field]) for field in fields}, ensure_ascii=False) + '\n'
+                    for row in rows
+                )
+
+
+def export_events(db, fmt, batch_size=None):
+    """Yield every event as CSV or JSONL text chunks"""
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    repo = EventRepository(db)
+    return _export(db, EVENT_FIELDS, lambda conn: repo.iter_all(conn, batch_size), fmt)
+
+
+def export_posts(db, fmt, event_id=None, batch_size=None):
+    """Yield every post (optionally of one event) as CSV or JSONL text chunks"""
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    repo = PostRepository(db)
+    return _export(db, POST_EXPORT_FIELDS, lambda conn: repo.iter_all(conn, batch_size, event_id), fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help='Import events from a CSV or JSONL file')
+    importer.add_argument('path', help="File to import ('-' for stdin)")
+    importer.add_argument('--format', choices=FORMATS, help='Default: from the file extension')
+    importer.add_argument('--batch-size', type=int, default=Config.IMPORT_BATCH_SIZE)
+
+    exporter = commands.add_parser('export', help='Export events or posts')
+    exporter.add_argument('table', choices=('events', 'posts'))
+    exporter.add_argument('--format', choices=FORMATS, default='csv')
+    exporter.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    exporter.add_argument('--event-id', type=int, help='Only posts of this event')
+    exporter.add_argument('--batch-size', type=int, default=Config.EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    # Keep startup messages out of an export written to stdout
+    with redirect_stdout(sys.stderr):
+        db = Database()
+
+    if args.command == 'import':
+        fmt = args.format or detect_format(args.path)
+        if args.path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            stream = open(args.path, encoding='utf-8-sig', newline='')
+        with stream:
+            summary = import_events(db, stream, fmt, args.batch_size, max_errors=sys.maxsize)
+        for error in summary['errors']:
+            where = f"line {error['line']}" if 'line' in error else f"lines {error['lines'][0]}-{error['lines'][1]}"
+            print(f"{where}: {error['error']}", file=sys.stderr)
+        print(f"Imported {summary['imported']} events, {summary['failed']} rows failed", file=sys.stderr)
+        return 1 if summary['failed'] else 0
+
+    if args.table == 'events':
+        chunks = export_events(db, args.format, args.batch_size)
+    else:
+        chunks = export_posts(db, args.format, args.event_id, args.batch_size)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Collapse duplicate draft posts
+Drafts of the same event are duplicates when they share a generation
+fingerprint (same event data, platform, tone and model), or, for drafts
+saved before fingerprints existed, the same platform, tone, content and
+hashtags. The newest draft of each group is kept; approved and posted
+posts are never touched. Drafts are scanned in one streaming pass and
+duplicates deleted in batches, each in its own transaction.
+
+Usage:
+    python compact_posts.py --dry-run
+    python compact_posts.py --batch-size 500
+"""
+import argparse
+import hashlib
+import json
+import sys
+from config import Config
+from database import Database
+from repositories import PostRepository
+
+
+def duplicate_key(draft):
+    """What a draft is compared on to find its duplicates"""
+    if draft['fingerprint']:
+        return draft['fingerprint']
+    text = json.dumps([draft['platform'], draft['tone'], draft['content'], draft['hashtags']], ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+def find_duplicates(batches):
+    """Yield (duplicate_id, kept_id) from drafts grouped by event, newest first
+
+    Only one event's keys are held in memory at a time.
+    """
+    event_id = None
+    kept = {}
+    for rows in batches:
+        for draft in rows:
+            if draft['event_id'] != event_id:
+                event_id = draft['event_id']
+                kept = {}
+            key = duplicate_key(draft)
+            if key in kept:
+                yield draft['id'], kept[key]
+            else:
+                kept[key] = draft['id']
+
+
+def compact_posts(db, batch_size=None, dry_run=False):
+    """Delete every draft that has a newer duplicate; returns a summary"""
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    repo = PostRepository(db)
+    summary = {'duplicates': 0, 'deleted': 0}
+
+    with db.connection() as conn:
+        # Collect first: a MySQL connection can't write while an
+        # unbuffered result is still being read
+        duplicates = dict(find_duplicates(repo.iter_drafts(conn, batch_size)))
+        summary['duplicates'] = len(duplicates)
+        if dry_run:
+            return summary
+
+        pending = list(duplicates.items())
+        for start in range(0, len(pending), batch_size):
+            summary['deleted'] += repo.merge_drafts(conn, dict(pending[start:start + batch_size]))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true', help='Only count the duplicate drafts')
+    parser.add_argument('--batch-size', type=int, default=Config.EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = Database()
+    summary = compact_posts(db, args.batch_size, args.dry_run)
+    if args.dry_run:
+        print(f"{summary['duplicates']} duplicate drafts would be deleted")
+    else:
+        print(f"Deleted {summary['deleted']} duplicate drafts")
+    db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,14 +4,102 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    # Database Configuration
+    # Database Configuration (backend: mysql or sqlite)
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'social_media_generator.sqlite3')
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_USER = os.getenv('DB_USER', 'root')
     DB_PASSWORD = os.getenv('DB_PASSWORD', '')
     DB_NAME = os.getenv('DB_NAME', 'social_media_generator')
     
+    # Connection Pool Configuration
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+    DB_POOL_PING_INTERVAL = int(os.getenv('DB_POOL_PING_INTERVAL', '30'))
+    
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '') or None
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.6'))
+    OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', '250'))
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+    OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+    OPENAI_MAX_KEEPALIVE = int(os.getenv('OPENAI_MAX_KEEPALIVE', '10'))
+    
+    # OpenAI Rate Limits (per minute, 0 disables; backend: memory, database or none)
+    OPENAI_RPM_LIMIT = int(os.getenv('OPENAI_RPM_LIMIT', '3500'))
+    OPENAI_TPM_LIMIT = int(os.getenv('OPENAI_TPM_LIMIT', '90000'))
+    OPENAI_RATE_LIMIT_MAX_WAIT = float(os.getenv('OPENAI_RATE_LIMIT_MAX_WAIT', '30'))
+    OPENAI_RATE_LIMIT_BACKEND = os.getenv('OPENAI_RATE_LIMIT_BACKEND', 'memory')
+    
+    # Prompt Template Configuration (directory of *.json overrides, reload check interval in seconds)
+    PROMPT_TEMPLATE_DIR = os.getenv('PROMPT_TEMPLATE_DIR', '')
+    PROMPT_TEMPLATE_RELOAD_INTERVAL = float(os.getenv('PROMPT_TEMPLATE_RELOAD_INTERVAL', '2'))
+    
+    # Learned Hashtags (suggestions ranked from past posts, reloaded every
+    # REFRESH_INTERVAL seconds; tags need MIN_USES posts to be suggested and
+    # approved/posted uses count POSITIVE_WEIGHT extra; with
+    # HASHTAGS_IN_PROMPT=False the model is not asked for hashtags at all)
+    HASHTAG_INDEX_ENABLED = os.getenv('HASHTAG_INDEX_ENABLED', 'True') == 'True'
+    HASHTAG_INDEX_REFRESH_INTERVAL = float(os.getenv('HASHTAG_INDEX_REFRESH_INTERVAL', '60'))
+    HASHTAG_INDEX_MIN_USES = int(os.getenv('HASHTAG_INDEX_MIN_USES', '2'))
+    HASHTAG_INDEX_POSITIVE_WEIGHT = int(os.getenv('HASHTAG_INDEX_POSITIVE_WEIGHT', '3'))
+    HASHTAGS_IN_PROMPT = os.getenv('HASHTAGS_IN_PROMPT', 'True') == 'True'
+    
+    # Generation Cache Configuration (backend: memory, sqlite or none)
+    GENERATION_CACHE_BACKEND = os.getenv('GENERATION_CACHE_BACKEND', 'memory')
+    GENERATION_CACHE_MAX_ENTRIES = int(os.getenv('GENERATION_CACHE_MAX_ENTRIES', '1000'))
+    GENERATION_CACHE_TTL = int(os.getenv('GENERATION_CACHE_TTL', '86400'))
+    GENERATION_CACHE_PATH = os.getenv('GENERATION_CACHE_PATH', 'generation_cache.sqlite3')
+    
+    # Batch Generation Configuration
+    BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '4'))
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '500'))
+    
+    # Background Job Configuration (JOB_WORKERS=0 disables in-process workers)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', '5'))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '300'))
+    
+    # Pagination Configuration
+    PAGE_DEFAULT_LIMIT = int(os.getenv('PAGE_DEFAULT_LIMIT', '50'))
+    PAGE_MAX_LIMIT = int(os.getenv('PAGE_MAX_LIMIT', '500'))
+    
+    # Full-text Search (deepest result /api/search pages through)
+    SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '500'))
+    
+    # Bulk Import/Export Configuration (rows per insert transaction / per fetch,
+    # per-row errors returned by the import endpoint)
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '100'))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))
+    
+    # HTTP Caching (serialized list responses kept per process; 0 disables)
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+    
+    # Response Compression (gzip, or brotli when installed, for clients that
+    # accept it; smaller buffered bodies are sent as they are)
+    RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'True') == 'True'
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+    RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+    RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+    
+    # Observability Configuration (one JSON log line per request)
+    LOG_REQUESTS = os.getenv('LOG_REQUESTS', 'True') == 'True'
+    
+    # Production Server Configuration (gunicorn.conf.py; connections per
+    # process are capped by DB_POOL_SIZE, so keep WEB_THREADS at or below it)
+    WEB_BIND = os.getenv('WEB_BIND', '0.0.0.0:5000')
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '2'))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '8'))
+    WEB_TIMEOUT = int(os.getenv('WEB_TIMEOUT', '120'))
+    WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', '60'))
     
     # Flask Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -1,72 +1,380 @@
-import mysql.connector
-from mysql.connector import Error
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+
+from flask import g, has_app_context
 from config import Config
+from metrics import DB_CONNECT_SECONDS, DB_POOL_WAIT_SECONDS, DB_QUERY_SECONDS
+from migrations import run_migrations
+import sqlite_backend
 
-class Database:
-    def __init__(self):
-        self.initialize_database()
+BACKENDS = ('mysql', 'sqlite')
 
-    def initialize_database(self):
-        """Create database and tables once"""
+ER_BAD_DB_ERROR = 1049  # unknown database
+
+
+class PoolExhausted(Exception):
+    """No connection became free within the pool timeout, on either backend"""
+
+
+def driver_errors():
+    """Driver errors that mean a connection is unusable, for either backend
+
+    mysql.connector is only imported with the first MySQL connection;
+    until then none of its errors can be raised.
+    """
+    mysql = sys.modules.get('mysql.connector')
+    return (mysql.Error, sqlite3.Error) if mysql else (sqlite3.Error,)
+
+
+def connect_mysql(**kwargs):
+    """mysql.connector.connect, importing the driver on first use"""
+    import mysql.connector
+    return mysql.connector.connect(**kwargs)
+
+# SQL verbs reported as the operation label; anything else is 'OTHER'
+QUERY_OPERATIONS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'}
+
+
+def query_operation(query):
+    """Leading SQL verb of a statement, for metric labels"""
+    head = query.lstrip()[:8].split(None, 1)
+    verb = head[0].upper() if head else ''
+    return verb if verb in QUERY_OPERATIONS else 'OTHER'
+
+
+class TimedCursor:
+    """Cursor wrapper that records execute() latency by SQL verb"""
+
+    __slots__ = ('_cursor',)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            DB_QUERY_SECONDS.labels(query_operation(operation)).observe(time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            DB_QUERY_SECONDS.labels(query_operation(operation)).observe(time.perf_counter() - started)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TimedConnection:
+    """Connection wrapper whose cursors are TimedCursors"""
+
+    __slots__ = ('_conn',)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ConnectionPool:
+    """Bounded pool of reusable database connections
+
+    `connect` is a no-argument callable that opens a new driver connection.
+    """
+
+    def __init__(self, size, timeout, recycle, ping_interval, connect):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self.connect = connect
+
+        self._cond = threading.Condition()
+        self._idle = deque()   # (connection, returned_at)
+        self._born = {}        # id(connection) -> created_at
+        self._created = 0
+        self._in_use = 0
+        self._waiting = 0
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def acquire(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    conn, returned_at = None, None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolExhausted(
+                        f"Connection pool exhausted ({self.size} in use) "
+                        f"after waiting {self.timeout}s"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            waited = time.monotonic() - start
+            DB_POOL_WAIT_SECONDS.observe(waited)
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        # Connecting and pinging happen outside the lock so one slow
+        # handshake does not stall every other checkout.
+        try:
+            if conn is None:
+                return self._connect()
+            return self._ensure_healthy(conn, returned_at)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding it if it is broken"""
+        healthy = True
         try:
-            conn = mysql.connector.connect(
+            if conn.in_transaction:
+                conn.rollback()
+        except driver_errors():
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._born.pop(id(conn), None)
+                self._created -= 1
+            self._cond.notify()
+
+        if not healthy:
+            self._close_quietly(conn)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            for conn, _ in idle:
+                self._born.pop(id(conn), None)
+            self._created -= len(idle)
+
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """Snapshot of pool usage for sizing"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'reconnects': self._reconnects,
+                'avg_wait_ms': round(self._total_wait / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+            }
+
+    def _connect(self):
+        with DB_CONNECT_SECONDS.time():
+            conn = TimedConnection(self.connect())
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+        return conn
+
+    def _ensure_healthy(self, conn, returned_at):
+        now = time.monotonic()
+        born = self._born.get(id(conn), now)
+
+        if self.recycle and now - born > self.recycle:
+            self._discard(conn)
+            return self._connect()
+
+        if now - returned_at > self.ping_interval:
+            try:
+                conn.ping(reconnect=True, attempts=1, delay=0)
+            except driver_errors():
+                self._discard(conn)
+                with self._cond:
+                    self._reconnects += 1
+                return self._connect()
+
+        return conn
+
+    def _discard(self, conn):
+        with self._cond:
+            self._born.pop(id(conn), None)
+        self._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except driver_errors():
+            pass
+
+
+class Database:
+    """Connection pool for the configured backend
+
+    Constructing one opens no connections and touches no schema; run
+    initialize_database() (setup_database.py) once per deployment.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = (backend or Config.DB_BACKEND).lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown DB_BACKEND: {self.backend}")
+
+        if self.backend == 'sqlite':
+            connect = partial(sqlite_backend.connect, Config.SQLITE_PATH, timeout=Config.DB_POOL_TIMEOUT)
+        else:
+            connect = partial(
+                connect_mysql,
                 host=Config.DB_HOST,
                 user=Config.DB_USER,
-                password=Config.DB_PASSWORD
+                password=Config.DB_PASSWORD,
+                database=Config.DB_NAME
             )
 
-            cursor = conn.cursor()
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {Config.DB_NAME}")
-            conn.database = Config.DB_NAME
-
-            # Events table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS events (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    title VARCHAR(255) NOT NULL,
-                    date DATE NOT NULL,
-                    location VARCHAR(255),
-                    type VARCHAR(100),
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        self.pool = ConnectionPool(
+            size=Config.DB_POOL_SIZE,
+            timeout=Config.DB_POOL_TIMEOUT,
+            recycle=Config.DB_POOL_RECYCLE,
+            ping_interval=Config.DB_POOL_PING_INTERVAL,
+            connect=connect
+        )
+
+    def init_app(self, app):
+        """Return request connections to the pool when the app context ends"""
+        app.teardown_appcontext(self._teardown)
+
+    def initialize_database(self):
+        """Create the database and bring its schema up to date
+
+        Returns True on success. A database that is already at the latest
+        version costs one query, with no DDL.
+        """
+        if self.backend == 'sqlite':
+            try:
+                conn = sqlite_backend.connect(Config.SQLITE_PATH)
+                run_migrations(conn, backend='sqlite')
+                conn.close()
+                print("Database initialized successfully")
+                return True
+            except sqlite3.Error as e:
+                print("Database initialization error:", e)
+                return False
+
+        from mysql.connector import Error
+        try:
+            try:
+                conn = connect_mysql(
+                    host=Config.DB_HOST,
+                    user=Config.DB_USER,
+                    password=Config.DB_PASSWORD,
+                    database=Config.DB_NAME
                 )
-            """)
-
-            # Generated posts table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS generated_posts (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    event_id INT NOT NULL,
-                    platform VARCHAR(50) NOT NULL,
-                    tone VARCHAR(50) NOT NULL,
-                    content TEXT NOT NULL,
-                    hashtags TEXT,
-                    status VARCHAR(20) DEFAULT 'draft',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+            except Error as e:
+                if e.errno != ER_BAD_DB_ERROR:
+                    raise
+                conn = connect_mysql(
+                    host=Config.DB_HOST,
+                    user=Config.DB_USER,
+                    password=Config.DB_PASSWORD
                 )
-            """)
+                cursor = conn.cursor()
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {Config.DB_NAME}")
+                cursor.close()
+                conn.database = Config.DB_NAME
 
-            conn.commit()
-            cursor.close()
+            run_migrations(conn)
             conn.close()
 
             print("Database initialized successfully")
+            return True
 
         except Error as e:
             print("Database initialization error:", e)
+            return False
 
     def get_connection(self):
-        """Always return a fresh connection"""
+        """Return a pooled connection
+
+        Inside a Flask app context the same connection is reused for the
+        whole request and returned to the pool on teardown. Outside of one,
+        the caller owns the connection and must hand it back with
+        release_connection() (or use the connection() context manager).
+        """
         try:
-            return mysql.connector.connect(
-                host=Config.DB_HOST,
-                user=Config.DB_USER,
-                password=Config.DB_PASSWORD,
-                database=Config.DB_NAME
-            )
-        except Error as e:
+            if has_app_context():
+                if 'db_conn' not in g:
+                    g.db_conn = self.pool.acquire()
+                return g.db_conn
+            return self.pool.acquire()
+        except (PoolExhausted, *driver_errors()) as e:
             print("Connection error:", e)
-            return None
\ No newline at end of file
+            raise
+
+    def release_connection(self, conn):
+        """Hand a connection obtained outside a request back to the pool"""
+        self.pool.release(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with-block"""
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    def pool_stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.pool.close()
+
+    def _teardown(self, exc):
+        conn = g.pop('db_conn', None)
+        if conn is not None:
+            self.pool.release(conn)
@@ -0,0 +1,185 @@
+"""
+Content-addressed cache for generated posts
+Entries are keyed by a hash of the exact chat request sent to the model
+(prompt plus model parameters), so identical event/platform/tone requests
+are answered without another API round-trip.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """On-disk LRU cache, shareable between worker processes on one host"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self.evictions = 0
+
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS generation_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_generation_cache_access ON generation_cache (last_access)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at FROM generation_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if row[1] <= now:
+            conn.execute("DELETE FROM generation_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            return None
+
+        conn.execute("UPDATE generation_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, expires_at):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO generation_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), expires_at, time.time())
+        )
+        cursor = conn.execute("""
+            DELETE FROM generation_cache WHERE key IN (
+                SELECT key FROM generation_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        self.evictions += max(cursor.rowcount, 0)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM generation_cache")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM generation_cache").fetchone()[0]
+
+
+class GenerationCache:
+    """TTL cache in front of the LLM with hit/miss accounting"""
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(chat_request):
+        """Hash of the full chat request: messages, model and sampling parameters"""
+        payload = json.dumps(chat_request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return dict(value)
+
+    def set(self, key, value):
+        self.backend.set(key, dict(value), time.time() + self.ttl)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'max_entries': self.backend.max_entries,
+            'ttl_seconds': self.ttl,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.backend.evictions
+        }
+
+
+def create_generation_cache():
+    """Build the cache selected by Config.GENERATION_CACHE_BACKEND, or None"""
+    backend = Config.GENERATION_CACHE_BACKEND.lower()
+
+    if backend in ('', 'none', 'off'):
+        return None
+    if backend == 'memory':
+        return GenerationCache(MemoryCacheBackend(Config.GENERATION_CACHE_MAX_ENTRIES),
+                               Config.GENERATION_CACHE_TTL)
+    if backend == 'sqlite':
+        directory = os.path.dirname(os.path.abspath(Config.GENERATION_CACHE_PATH))
+        os.makedirs(directory, exist_ok=True)
+        return GenerationCache(SQLiteCacheBackend(Config.GENERATION_CACHE_PATH,
+                                                  Config.GENERATION_CACHE_MAX_ENTRIES),
+                               Config.GENERATION_CACHE_TTL)
+
+    raise ValueError(f"Unknown GENERATION_CACHE_BACKEND: {Config.GENERATION_CACHE_BACKEND}")
@@ -0,0 +1,34 @@
+"""
+gunicorn settings for production
+    gunicorn -c gunicorn.conf.py wsgi:app
+Each worker process imports the app itself (no preload), so connection
+pools, LLM clients and job worker threads are never shared across a
+fork. On SIGTERM a worker stops accepting requests, finishes the ones in
+flight (including streamed generations) and then drains its background
+jobs, all within WEB_GRACEFUL_TIMEOUT seconds.
+"""
+from config import Config
+
+bind = Config.WEB_BIND
+workers = Config.WEB_WORKERS
+# Generations spend most of their time waiting on the LLM, so each
+# process serves requests from a thread pool
+worker_class = 'gthread'
+threads = Config.WEB_THREADS
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_GRACEFUL_TIMEOUT
+keepalive = 5
+preload_app = False
+accesslog = None
+
+
+def post_worker_init(worker):
+    import app
+    app.start_services()
+
+
+def worker_exit(server, worker):
+    import app
+    # In-flight requests are already done; what is left of the grace
+    # period goes to running jobs
+    app.shutdown(timeout=Config.WEB_GRACEFUL_TIMEOUT / 2)
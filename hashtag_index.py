@@ -0,0 +1,358 @@
+"""
+Learned hashtag suggestions
+Counts how often each hashtag is used per platform and event type, and
+which hashtags appear together on a platform. Approved and posted posts
+also count as positive signal. The counts are updated in the same
+transaction as every post insert, status change and delete, so they are
+never recounted from scratch; each pair of tags is stored once and all
+rows of a write go out as one multi-row upsert. HashtagIndex keeps a
+ranked snapshot of them in memory, loaded and refreshed in the
+background, so fallback posts and model output get suggestions without a
+query.
+
+Counting posts saved before the index existed (or repairing drift):
+    python hashtag_index.py
+"""
+import argparse
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+from config import Config
+from database import Database
+from metrics import log_event
+from response_parser import normalize_hashtags
+
+POSITIVE_STATUSES = ('approved', 'posted')
+
+# Counts under this event type cover every type of the platform
+ANY_TYPE = ''
+
+# Ranked tags kept per (platform, event type) and per (platform, tag)
+TOP_TAGS = 20
+TOP_RELATED = 10
+
+# Only the first tags of a post are paired, so a post adds at most
+# MAX_PAIRED_TAGS * (MAX_PAIRED_TAGS - 1) / 2 pair rows
+MAX_PAIRED_TAGS = 10
+
+MAX_TAG_LENGTH = 100
+
+# Rows per multi-row upsert statement (6 parameters each)
+UPSERT_BATCH_ROWS = 500
+
+# What suggest() works from until the first snapshot has loaded
+EMPTY_SNAPSHOT = ({}, {})
+
+BACKEND_SQL = {
+    'mysql': {
+        'upsert_counts': """
+            INSERT INTO hashtag_counts (platform, event_type, tag, label, uses, positive)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE uses = uses + VALUES(uses), positive = positive + VALUES(positive),
+                                    label = VALUES(label)
+        """,
+        'upsert_pairs': """
+            INSERT INTO hashtag_pairs (platform, tag, related, uses, positive)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE uses = uses + VALUES(uses), positive = positive + VALUES(positive)
+        """,
+    },
+    'sqlite': {
+        'upsert_counts': """
+            INSERT INTO hashtag_counts (platform, event_type, tag, label, uses, positive)
+            VALUES {values}
+            ON CONFLICT (platform, event_type, tag) DO UPDATE SET
+                uses = uses + excluded.uses, positive = positive + excluded.positive, label = excluded.label
+        """,
+        'upsert_pairs': """
+            INSERT INTO hashtag_pairs (platform, tag, related, uses, positive)
+            VALUES {values}
+            ON CONFLICT (platform, tag, related) DO UPDATE SET
+                uses = uses + excluded.uses, positive = positive + excluded.positive
+        """,
+    },
+}
+
+# (platform, event type, status, hashtags) of posts: what the index counts
+INDEXED_POSTS = """
+    SELECT gp.platform, e.type, gp.status, gp.hashtags
+    FROM generated_posts gp
+    JOIN events e ON gp.event_id = e.id
+    WHERE {where}
+"""
+
+
+def type_key(event_type):
+    """Event types are matched case-insensitively"""
+    return (event_type or '').strip().lower()[:MAX_TAG_LENGTH]
+
+
+def post_tags(hashtags, platform):
+    """[(key, label)] of a post's hashtags, e.g. ('#ai', '#AI')"""
+    return [(tag.casefold(), tag) for tag in normalize_hashtags(hashtags or '', platform)
+            if len(tag) <= MAX_TAG_LENGTH]
+
+
+def indexed_posts(cursor, where, params):
+    """Index entries of the posts matching `where`, read in the caller's transaction"""
+    cursor.execute(INDEXED_POSTS.format(where=where), params)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def new_drafts(cursor, rows):
+    """Index entries of drafts saved from (event_id, platform, hashtags) rows"""
+    event_ids = sorted({row[0] for row in rows})
+    placeholders = ', '.join(['%s'] * len(event_ids))
+    cursor.execute(f"SELECT id, type FROM events WHERE id IN ({placeholders})", event_ids)
+    types = dict(cursor.fetchall())
+    return [(platform, types.get(event_id), 'draft', hashtags) for event_id, platform, hashtags in rows]
+
+
+def count_posts(posts, sign, counts, pairs, labels):
+    """Add the (uses, positive) deltas of index entries to counts and pairs
+
+    sign is 1 for saved posts and -1 for deleted ones.
+    """
+    for platform, event_type, status, hashtags in posts:
+        tags = post_tags(hashtags, platform)
+        positive = sign if status in POSITIVE_STATUSES else 0
+        contexts = {ANY_TYPE, type_key(event_type)}
+        for key, label in tags:
+            labels.setdefault((platform, key), label)
+            for context in contexts:
+                uses, positives = counts.get((platform, context, key), (0, 0))
+                counts[platform, context, key] = (uses + sign, positives + positive)
+        # Pairs are symmetric, so each is stored once with tag < related
+        paired = sorted(key for key, _ in tags[:MAX_PAIRED_TAGS])
+        for key, related in itertools.combinations(paired, 2):
+            uses, positives = pairs.get((platform, key, related), (0, 0))
+            pairs[platform, key, related] = (uses + sign, positives + positive)
+
+
+def upsert(cursor, sql, rows):
+    """Add rows' counts with one multi-row statement per UPSERT_BATCH_ROWS rows"""
+    for start in range(0, len(rows), UPSERT_BATCH_ROWS):
+        batch = rows[start:start + UPSERT_BATCH_ROWS]
+        placeholders = '(' + ', '.join(['%s'] * len(batch[0])) + ')'
+        cursor.execute(sql.format(values=', '.join([placeholders] * len(batch))),
+                       [value for row in batch for value in row])
+
+
+def record_hashtags(cursor, backend, added=(), removed=()):
+    """Update the counts for saved (added) and deleted (removed) posts
+
+    Runs in the caller's transaction. A status change is the post removed
+    with its old status and added with the new one; deltas that cancel
+    out write nothing.
+    """
+    counts, pairs, labels = {}, {}, {}
+    count_posts(added, 1, counts, pairs, labels)
+    count_posts(removed, -1, counts, pairs, labels)
+    counts = {key: delta for key, delta in counts.items() if delta != (0, 0)}
+    pairs = {key: delta for key, delta in pairs.items() if delta != (0, 0)}
+
+    sql = BACKEND_SQL[backend]
+    # Sorted so concurrent transactions lock rows in the same order
+    upsert(cursor, sql['upsert_counts'], [
+        (platform, context, key, labels[platform, key], uses, positive)
+        for (platform, context, key), (uses, positive) in sorted(counts.items())
+    ])
+    upsert(cursor, sql['upsert_pairs'], [
+        (platform, key, related, uses, positive)
+        for (platform, key, related), (uses, positive) in sorted(pairs.items())
+    ])
+
+    # Forget hashtags that are no longer used
+    unused = sorted(key for key, (uses, _) in counts.items() if uses < 0)
+    if unused:
+        cursor.executemany(
+            "DELETE FROM hashtag_counts WHERE platform = %s AND event_type = %s AND tag = %s AND uses <= 0", unused
+        )
+    unused = sorted(key for key, (uses, _) in pairs.items() if uses < 0)
+    if unused:
+        cursor.executemany(
+            "DELETE FROM hashtag_pairs WHERE platform = %s AND tag = %s AND related = %s AND uses <= 0", unused
+        )
+
+
+class HashtagIndex:
+    """Ranked hashtag suggestions, answered from an in-memory snapshot
+
+    The snapshot is loaded on a background thread, started by warm() at
+    startup or by the first lookup, and reloaded every refresh_interval
+    seconds while lookups keep using the previous one. Until the first
+    load finishes lookups learn nothing, so posts get the static default
+    hashtags instead of waiting on the database.
+    """
+
+    def __init__(self, db, refresh_interval=None, min_uses=None, positive_weight=None):
+        self.db = db
+        self.refresh_interval = Config.HASHTAG_INDEX_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.min_uses = Config.HASHTAG_INDEX_MIN_USES if min_uses is None else min_uses
+        self.positive_weight = Config.HASHTAG_INDEX_POSITIVE_WEIGHT if positive_weight is None else positive_weight
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._loaded_at = None
+        self._next_refresh = 0
+        self._refreshing = False
+
+    def suggest(self, platform, event_type, tags=(), limit=5):
+        """Up to `limit` hashtags: `tags` first, then learned ones
+
+        Learned tags are those used most often together with `tags` on
+        the platform, then the platform's top tags for the event type,
+        then for any event type. Approved and posted uses weigh more.
+        """
+        ranked, related = self._current()
+        chosen = {}
+        for tag in tags:
+            chosen.setdefault(tag.casefold(), tag)
+        if len(chosen) >= limit:
+            return list(chosen.values())
+
+        scores = {}
+        for key in list(chosen):
+            for other, label, score in related.get((platform, key), ()):
+                total, _ = scores.get(other, (0, label))
+                scores[other] = (total + score, label)
+        candidates = [(key, label) for key, (_, label) in sorted(scores.items(), key=lambda item: -item[1][0])]
+        candidates += ranked.get((platform, type_key(event_type)), ())
+        candidates += ranked.get((platform, ANY_TYPE), ())
+
+        for key, label in candidates:
+            if len(chosen) >= limit:
+                break
+            chosen.setdefault(key, label)
+        return list(chosen.values())
+
+    def stats(self):
+        ranked, related = self._snapshot or ({}, {})
+        return {
+            'ready': self._snapshot is not None,
+            'contexts': len(ranked),
+            'tags_with_pairs': len(related),
+            'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+        }
+
+    def warm(self):
+        """Start loading the snapshot in the background unless a load is running"""
+        with self._lock:
+            start = not self._refreshing and time.monotonic() >= self._next_refresh
+            self._refreshing = self._refreshing or start
+        if start:
+            threading.Thread(target=self._refresh, name='hashtag-index-refresh', daemon=True).start()
+
+    def _current(self):
+        snapshot = self._snapshot
+        if snapshot is None or (self.refresh_interval >= 0 and time.monotonic() >= self._next_refresh):
+            self.warm()
+        return snapshot or EMPTY_SNAPSHOT
+
+    def _refresh(self):
+        try:
+            self._snapshot = self._load()
+            self._loaded_at = time.monotonic()
+        except Exception as e:
+            # e.g. migration 8 not applied yet: suggest nothing until it is
+            log_event('hashtag_index_error', level=logging.WARNING, error=str(e))
+            if self._snapshot is None:
+                self._snapshot = EMPTY_SNAPSHOT
+        finally:
+            self._next_refresh = time.monotonic() + max(self.refresh_interval, 0)
+            self._refreshing = False
+
+    def _load(self):
+        """({(platform, event_type): [(key, label)]}, {(platform, key): [(key, label, score)]})"""
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT platform, event_type, tag, label, uses, positive FROM hashtag_counts WHERE uses >= %s",
+                (self.min_uses,)
+            )
+            contexts = {}
+            labels = {}
+            for platform, context, key, label, uses, positive in cursor.fetchall():
+                contexts.setdefault((platform, context), []).append((uses + self.positive_weight * positive, key))
+                labels[platform, key] = label
+            cursor.execute(
+                "SELECT platform, tag, related, uses, positive FROM hashtag_pairs WHERE uses >= %s",
+                (self.min_uses,)
+            )
+            pairs = {}
+            for platform, key, other, uses, positive in cursor.fetchall():
+                score = uses + self.positive_weight * positive
+                # Stored once per pair; related in both directions
+                if (platform, other) in labels:
+                    pairs.setdefault((platform, key), []).append((score, other))
+                if (platform, key) in labels:
+                    pairs.setdefault((platform, other), []).append((score, key))
+            cursor.close()
+
+        ranked = {
+            (platform, context): [(key, labels[platform, key]) for _, key in heapq.nlargest(TOP_TAGS, entries)]
+            for (platform, context), entries in contexts.items()
+        }
+        related = {
+            (platform, key): [(other, labels[platform, other], score)
+                              for score, other in heapq.nlargest(TOP_RELATED, entries)]
+            for (platform, key), entries in pairs.items()
+        }
+        return ranked, related
+
+
+def rebuild(db, batch_size=None):
+    """Recount every post into empty index tables; returns the number of posts"""
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    counts, pairs, labels = {}, {}, {}
+    total = 0
+
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(INDEXED_POSTS.format(where='1 = 1'))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                count_posts([tuple(row) for row in rows], 1, counts, pairs, labels)
+                total += len(rows)
+
+            # Written after the read: a MySQL connection can't write while
+            # an unbuffered result is still being read
+            sql = BACKEND_SQL[db.backend]
+            cursor.execute("DELETE FROM hashtag_counts")
+            cursor.execute("DELETE FROM hashtag_pairs")
+            upsert(cursor, sql['upsert_counts'], [
+                (platform, context, key, labels[platform, key], uses, positive)
+                for (platform, context, key), (uses, positive) in counts.items()
+            ])
+            upsert(cursor, sql['upsert_pairs'], [
+                (platform, key, related, uses, positive)
+                for (platform, key, related), (uses, positive) in pairs.items()
+            ])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=Config.EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = Database()
+    total = rebuild(db, args.batch_size)
+    print(f"Indexed the hashtags of {total} posts")
+    db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Conditional GETs for the list endpoints
+Every write bumps a per-table version (repositories.touch_tables). A
+listing's ETag combines the versions of the tables it reads with its
+query string, so a GET reads those versions (one primary-key lookup),
+answers If-None-Match / If-Modified-Since with 304 when nothing changed,
+and otherwise serves the JSON body cached in-process under that ETag.
+The list query itself only runs after a write, and a body is compressed
+once per Content-Encoding and then served from the cache too.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+from werkzeug.http import is_resource_modified
+
+from config import Config
+from serialization import compress, preferred_encoding
+
+
+class ResponseCache:
+    """LRU of serialized response bodies, each valid for one ETag"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (etag, body, {encoding: encoded body})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, etag, body):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (etag, body, {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def encoded(self, key, etag, body, encoding):
+        """body compressed with `encoding`, compressed at most once per entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != etag:
+            return compress(body, encoding)
+        variants = entry[2]
+        data = variants.get(encoding)
+        if data is None:
+            # Two threads may both compress; either result is correct
+            data = variants[encoding] = compress(body, encoding)
+        return data
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'not_modified': self.not_modified
+        }
+
+
+def make_etag(key, versions):
+    """Versions of the source tables plus a digest of the request key"""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=6).hexdigest()
+    return '-'.join(str(versions[table][0]) for table in sorted(versions)) + '-' + digest
+
+
+def conditional_json(cache, versions, build):
+    """Answer the current GET from `versions` without calling build() if possible
+
+    `versions` is {table: (version, modified_at)} for every table the
+    response reads; build() returns the JSON payload and only runs on a
+    cache miss.
+    """
+    key = request.path + '?' + urlencode(sorted(request.args.items(multi=True)))
+    etag = make_etag(key, versions)
+    last_modified = datetime.fromtimestamp(int(max(modified for _, modified in versions.values())), timezone.utc)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        cache.record_not_modified()
+        response = Response(status=304)
+    else:
+        body = cache.get(key, etag)
+        if body is None:
+            body = current_app.json.response(build()).get_data()
+            cache.set(key, etag, body)
+        response = Response(body, mimetype=current_app.json.mimetype)
+        encoding = preferred_encoding() if len(body) >= Config.RESPONSE_COMPRESSION_MIN_BYTES else None
+        if encoding:
+            response.set_data(cache.encoded(key, etag, body, encoding))
+            response.content_encoding = encoding
+
+    # Weak, since the same ETag names the plain and compressed bodies;
+    # no-cache: browsers keep the body but revalidate it on every use
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
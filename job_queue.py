@@ -0,0 +1,339 @@
+"""
+Durable background queue for post generation
+Jobs live in the generation_jobs table, so they survive restarts and can
+be picked up by any worker process. Each process runs a small pool of
+worker threads that claim jobs by priority, generate the post and write
+it to generated_posts. Failed jobs are retried with exponential backoff,
+then moved to the 'dead' status (the dead-letter queue).
+"""
+import logging
+import threading
+import time
+import uuid
+from config import Config
+from ai_generator import event_generation_data
+from metrics import log_event
+from hashtag_index import new_drafts, record_hashtags
+from repositories import INSERT_POST, touch_tables
+
+JOB_STATUSES = ('queued', 'running', 'done', 'dead')
+
+# The statements whose syntax differs between the MySQL and SQLite backends
+BACKEND_SQL = {
+    # UPDATE ... ORDER BY ... LIMIT 1 works on MySQL 5.7 as well as 8.0
+    'mysql': {
+        'claim': """
+            UPDATE generation_jobs
+            SET status = 'running', claimed_by = %s, attempts = attempts + 1, started_at = NOW()
+            WHERE status = 'queued' AND available_at <= NOW()
+            ORDER BY priority DESC, id
+            LIMIT 1
+        """,
+        'seconds_from_now': "NOW() + INTERVAL %s SECOND",
+        'seconds_ago': "NOW() - INTERVAL %s SECOND",
+    },
+    # SQLite runs one writer at a time, so the subquery and the update
+    # cannot interleave with another worker's claim
+    'sqlite': {
+        'claim': """
+            UPDATE generation_jobs
+            SET status = 'running', claimed_by = %s, attempts = attempts + 1, started_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM generation_jobs
+                WHERE status = 'queued' AND available_at <= CURRENT_TIMESTAMP
+                ORDER BY priority DESC, id
+                LIMIT 1
+            )
+        """,
+        'seconds_from_now': "datetime('now', '+' || %s || ' seconds')",
+        'seconds_ago': "datetime('now', '-' || %s || ' seconds')",
+    },
+}
+
+
+class PermanentJobError(Exception):
+    """A failure that retrying cannot fix (e.g. the event was deleted)"""
+
+
+class JobQueue:
+    """Enqueue, claim and settle generation jobs"""
+
+    def __init__(self, db):
+        self.db = db
+        self.sql = BACKEND_SQL[db.backend]
+        self._wakeup = threading.Event()
+
+    def enqueue(self, event_id, platform, tone, priority=0, use_cache=True, max_attempts=None):
+        """Add a job and return its id; higher priority runs first"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO generation_jobs (event_id, platform, tone, use_cache, priority, max_attempts)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (event_id, platform, tone, int(use_cache), priority, max_attempts or Config.JOB_MAX_ATTEMPTS))
+        job_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+
+        # Let idle workers in this process start immediately instead of
+        # waiting for their next poll
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Job row joined with its generated post, or None"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT j.id, j.event_id, j.platform, j.tone, j.priority, j.status, j.attempts,
+                   j.max_attempts, j.post_id, j.last_error, j.created_at, j.updated_at,
+                   gp.content, gp.hashtags
+            FROM generation_jobs j
+            LEFT JOIN generated_posts gp ON gp.id = j.post_id
+            WHERE j.id = %s
+        """, (job_id,))
+        job = cursor.fetchone()
+        cursor.close()
+        return job
+
+    def list(self, status, limit=100):
+        conn = self.db.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, event_id, platform, tone, priority, status, attempts, max_attempts,
+                   post_id, last_error, created_at, updated_at
+            FROM generation_jobs
+            WHERE status = %s
+            ORDER BY id DESC
+            LIMIT %s
+        """, (status, limit))
+        jobs = cursor.fetchall()
+        cursor.close()
+        return jobs
+
+    def retry(self, job_id):
+        """Move a dead job back to the queue with a fresh attempt budget"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE generation_jobs
+            SET status = 'queued', attempts = 0, available_at = CURRENT_TIMESTAMP, claimed_by = NULL, last_error = NULL
+            WHERE id = %s AND status = 'dead'
+        """, (job_id,))
+        retried = cursor.rowcount == 1
+        conn.commit()
+        cursor.close()
+        if retried:
+            self._wakeup.set()
+        return retried
+
+    def counts(self):
+        """Number of jobs per status"""
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT status, COUNT(*) FROM generation_jobs GROUP BY status")
+            counts = dict.fromkeys(JOB_STATUSES, 0)
+            counts.update(dict(cursor.fetchall()))
+            cursor.close()
+        return counts
+
+    def claim(self, conn):
+        """Atomically take the highest-priority runnable job, or None
+
+        The claim is a single UPDATE, so it never hands the same job to
+        two workers. The job's claimed_by is the claim token that
+        complete() and fail() check the worker still holds.
+        """
+        token = uuid.uuid4().hex
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(self.sql['claim'], (token,))
+        conn.commit()
+        if cursor.rowcount != 1:
+            cursor.close()
+            return None
+
+        cursor.execute("SELECT * FROM generation_jobs WHERE claimed_by = %s", (token,))
+        job = cursor.fetchone()
+        cursor.close()
+        return job
+
+    def complete(self, conn, job, result, fingerprint=None):
+        """Save the generated post and mark the job done in one transaction
+
+        Returns the post id, or None without saving anything when the
+        worker no longer owns the job (its lease expired and the job was
+        re-queued or claimed by another worker).
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE generation_jobs SET status = 'done', last_error = NULL
+            WHERE id = %s AND claimed_by = %s AND status = 'running'
+        """, (job['id'], job['claimed_by']))
+        if cursor.rowcount != 1:
+            conn.rollback()
+            cursor.close()
+            return None
+
+        cursor.execute(INSERT_POST, (job['event_id'], job['platform'], job['tone'],
+                                     result['content'], result['hashtags'], fingerprint))
+        post_id = cursor.lastrowid
+        record_hashtags(cursor, self.db.backend,
+                        added=new_drafts(cursor, [(job['event_id'], job['platform'], result['hashtags'])]))
+        touch_tables(cursor, 'generated_posts')
+        cursor.execute("UPDATE generation_jobs SET post_id = %s WHERE id = %s", (post_id, job['id']))
+        conn.commit()
+        cursor.close()
+        return post_id
+
+    def fail(self, conn, job, error, permanent=False):
+        """Schedule a retry with exponential backoff, or dead-letter the job
+
+        Returns False, changing nothing, when the worker no longer owns
+        the job.
+        """
+        conn.rollback()
+        cursor = conn.cursor()
+        if permanent or job['attempts'] >= job['max_attempts']:
+            cursor.execute("""
+                UPDATE generation_jobs SET status = 'dead', last_error = %s
+                WHERE id = %s AND claimed_by = %s AND status = 'running'
+            """, (str(error), job['id'], job['claimed_by']))
+        else:
+            delay = Config.JOB_RETRY_BACKOFF * (2 ** (job['attempts'] - 1))
+            cursor.execute(f"""
+                UPDATE generation_jobs
+                SET status = 'queued', last_error = %s, claimed_by = NULL,
+                    available_at = {self.sql['seconds_from_now']}
+                WHERE id = %s AND claimed_by = %s AND status = 'running'
+            """, (str(error), int(delay), job['id'], job['claimed_by']))
+        owned = cursor.rowcount == 1
+        conn.commit()
+        cursor.close()
+        return owned
+
+    def requeue_stale(self, conn):
+        """Recover jobs whose worker died mid-run (lease expired)"""
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            UPDATE generation_jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,
+                last_error = 'Worker lease expired', claimed_by = NULL
+            WHERE status = 'running' AND started_at < {self.sql['seconds_ago']}
+        """, (Config.JOB_LEASE_SECONDS,))
+        recovered = cursor.rowcount
+        conn.commit()
+        cursor.close()
+        return recovered
+
+    def wait_for_work(self, timeout):
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def wake_all(self):
+        self._wakeup.set()
+
+
+class JobWorkerPool:
+    """Threads that drain the job queue; the thread count caps concurrency
+
+    get_generator returns the AIGenerator, so an idle pool never builds one.
+    """
+
+    def __init__(self, queue, get_generator, workers=None, poll_interval=None):
+        self.queue = queue
+        self.get_generator = get_generator
+        self.workers = Config.JOB_WORKERS if workers is None else workers
+        self.poll_interval = poll_interval or Config.JOB_POLL_INTERVAL
+        self._stopping = threading.Event()
+        self._threads = []
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Stop claiming new jobs and wait for running ones to finish"""
+        self._stopping.set()
+        self.queue.wake_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+
+    def stats(self):
+        with self._lock:
+            busy = self._busy
+        return {'workers': len(self._threads), 'busy': busy}
+
+    def _run(self):
+        last_reap = 0
+        while not self._stopping.is_set():
+            try:
+                # Only held while claiming: request handlers need the pool
+                # slots more than a worker waiting on the model does
+                with self.queue.db.connection() as conn:
+                    if time.monotonic() - last_reap > Config.JOB_LEASE_SECONDS / 2:
+                        self.queue.requeue_stale(conn)
+                        last_reap = time.monotonic()
+                    job = self.queue.claim(conn)
+
+                if job is not None:
+                    self._process(job)
+                    continue
+            except Exception as e:
+                log_event('job_worker_error', level=logging.ERROR, error=str(e))
+
+            self.queue.wait_for_work(self.poll_interval)
+
+    def _process(self, job):
+        """Generate the job's post; a connection is only checked out around the queries
+
+        OpenAI errors raise (strict mode) instead of producing the
+        template fallback, so they are retried with backoff and end up in
+        the dead-letter queue like any other failure.
+        """
+        with self._lock:
+            self._busy += 1
+        try:
+            with self.queue.db.connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute("SELECT * FROM events WHERE id = %s", (job['event_id'],))
+                event = cursor.fetchone()
+                cursor.close()
+            if not event:
+                raise PermanentJobError('Event not found')
+
+            event_data = event_generation_data(event)
+            generator = self.get_generator()
+            result = generator.generate_post(
+                event_data,
+                job['platform'],
+                job['tone'],
+                use_cache=bool(job['use_cache']),
+                strict=True
+            )
+            fingerprint = generator.fingerprint(event_data, job['platform'], job['tone'])
+            with self.queue.db.connection() as conn:
+                post_id = self.queue.complete(conn, job, result, fingerprint)
+            if post_id is None:
+                log_event('job_lease_lost', level=logging.WARNING, job_id=job['id'])
+        except PermanentJobError as e:
+            self._fail(job, e, permanent=True)
+        except Exception as e:
+            log_event(
+                'job_failed', level=logging.WARNING, job_id=job['id'],
+                attempt=job['attempts'], max_attempts=job['max_attempts'], error=str(e)
+            )
+            self._fail(job, e)
+        finally:
+            with self._lock:
+                self._busy -= 1
+
+    def _fail(self, job, error, permanent=False):
+        with self.queue.db.connection() as conn:
+            if not self.queue.fail(conn, job, error, permanent):
+                log_event('job_lease_lost', level=logging.WARNING, job_id=job['id'])
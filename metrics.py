@@ -0,0 +1,283 @@
+"""
+Lightweight metrics and structured logging
+Counters and histograms kept in process memory and exported in the
+Prometheus text format at /metrics. Recording a value is a dict lookup,
+a bisect and an add under a per-metric lock, so instrumentation stays
+on in production. Stats that already exist elsewhere (pool, cache, job
+workers) are read as gauges when /metrics is scraped.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from config import Config
+
+# Seconds; covers sub-millisecond queries up to slow LLM completions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    """Context manager that observes the elapsed time into a histogram"""
+
+    __slots__ = ('_child', '_started')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._started)
+        return False
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            self._unlabelled = self.labels()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in sorted(children):
+            lines.extend(child.samples(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, values):
+        return [f'{name}_total{_format_labels(labelnames, values)} {_format_value(self.value)}']
+
+
+class Counter(_Metric):
+    """Monotonic count; exported with a _total suffix"""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild(self._lock)
+
+    def inc(self, amount=1):
+        self._unlabelled.inc(amount)
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_buckets', '_counts', 'sum', 'count')
+
+    def __init__(self, lock, buckets):
+        self._lock = lock
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+    def samples(self, name, labelnames, values):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._buckets + (float('inf'),), self._counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f'{name}_bucket{_format_labels(labelnames, values, le)} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labelnames, values)} {_format_value(self.sum)}')
+        lines.append(f'{name}_count{_format_labels(labelnames, values)} {self.count}')
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (durations in seconds, by default)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(float(bound) for bound in buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self._lock, self.buckets)
+
+    def observe(self, value):
+        self._unlabelled.observe(value)
+
+    def time(self):
+        return _Timer(self._unlabelled)
+
+
+class Registry:
+    """Every metric of the process, plus gauges read from stats callbacks"""
+
+    def __init__(self):
+        self._metrics = []
+        self._stats = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_stats(self, prefix, func, documentation):
+        """Export the numeric values of func()'s dict as <prefix>_<key> gauges"""
+        with self._lock:
+            self._stats = [entry for entry in self._stats if entry[0] != prefix]
+            self._stats.append((prefix, func, documentation))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+            stats = list(self._stats)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for prefix, func, documentation in stats:
+            try:
+                values = func() or {}
+            except Exception as e:
+                log_event('metrics_stats_error', source=prefix, error=str(e))
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f'{prefix}_{key}'
+                lines.append(f'# HELP {name} {documentation} ({key})')
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by route', ('method', 'route', 'status')
+)
+DB_CONNECT_SECONDS = REGISTRY.histogram(
+    'db_connect_seconds', 'Time to open a new database connection'
+)
+DB_POOL_WAIT_SECONDS = REGISTRY.histogram(
+    'db_pool_wait_seconds', 'Time spent waiting for a pooled connection'
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    'db_query_seconds', 'Statement execution time, by SQL verb', ('operation',)
+)
+PROMPT_BUILD_SECONDS = REGISTRY.histogram(
+    'prompt_build_seconds', 'Time to render a generation prompt'
+)
+OPENAI_REQUEST_SECONDS = REGISTRY.histogram(
+    'openai_request_seconds', 'Chat completion latency, including SDK retries', ('mode', 'outcome')
+)
+RESPONSE_PARSE_SECONDS = REGISTRY.histogram(
+    'response_parse_seconds', 'Time to parse a completion and apply platform limits'
+)
+OPENAI_TOKENS = REGISTRY.counter(
+    'openai_tokens', 'Tokens reported by the OpenAI API', ('model', 'kind')
+)
+GENERATIONS = REGISTRY.counter(
+    'generations', 'Generated posts, by platform and where they came from', ('platform', 'source')
+)
+OPENAI_RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    'openai_rate_limit_wait_seconds', 'Time a request queued for rate limit capacity', ('mode',)
+)
+OPENAI_RATE_LIMITED = REGISTRY.counter(
+    'openai_rate_limited', 'Rate limit events: 429 responses and requests that would wait too long', ('reason',)
+)
+OPENAI_ERRORS = REGISTRY.counter(
+    'openai_errors', 'Failed OpenAI requests that fell back to templates', ('error',)
+)
+
+_logger = logging.getLogger('social_media_generator')
+
+
+def configure_logging():
+    """Send structured log lines to stderr as one JSON object per line"""
+    if not _logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+
+
+def log_event(event, level=logging.INFO, **fields):
+    """Write one structured log line, e.g. log_event('request', route=..., status=...)"""
+    if not _logger.isEnabledFor(level):
+        return
+    record = {'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), 'event': event}
+    record.update(fields)
+    _logger.log(level, json.dumps(record, default=str))
+
+
+def record_usage(response):
+    """Count the prompt and completion tokens of a chat completion"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    model = getattr(response, 'model', None) or Config.OPENAI_MODEL
+    OPENAI_TOKENS.labels(model, 'prompt').inc(usage.prompt_tokens or 0)
+    OPENAI_TOKENS.labels(model, 'completion').inc(usage.completion_tokens or 0)
@@ -0,0 +1,420 @@
+"""
+Versioned schema migrations
+Each migration runs once, in order, and is recorded in schema_migrations.
+Add new schema changes by appending to MIGRATIONS (and the SQLite
+variant to SQLITE_MIGRATIONS); never edit one that has already shipped.
+"""
+# MySQL DDL is not transactional, so a migration interrupted half-way is
+# re-run from the start. These errors mean a statement already took effect.
+ALREADY_APPLIED_ERRORS = {
+    1050,  # ER_TABLE_EXISTS_ERROR
+    1060,  # ER_DUP_FIELDNAME
+    1061,  # ER_DUP_KEYNAME
+}
+
+ER_NO_SUCH_TABLE = 1146
+
+MIGRATIONS = [
+    (1, 'Create events and generated_posts tables', [
+        """
+        CREATE TABLE IF NOT EXISTS events (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            date DATE NOT NULL,
+            location VARCHAR(255),
+            type VARCHAR(100),
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS generated_posts (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            event_id INT NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            tone VARCHAR(50) NOT NULL,
+            content TEXT NOT NULL,
+            hashtags TEXT,
+            status VARCHAR(20) DEFAULT 'draft',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+        )
+        """,
+    ]),
+    # InnoDB appends the primary key to every secondary index, so these
+    # also serve the (sort column, id) keyset ordering of the list endpoints.
+    (2, 'Index event and post listing queries', [
+        "CREATE INDEX idx_events_date ON events (date)",
+        "CREATE INDEX idx_posts_created ON generated_posts (created_at)",
+        "CREATE INDEX idx_posts_event_created ON generated_posts (event_id, created_at)",
+        "CREATE INDEX idx_posts_status_created ON generated_posts (status, created_at)",
+    ]),
+    (3, 'Create generation_jobs queue table', [
+        """
+        CREATE TABLE IF NOT EXISTS generation_jobs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            event_id INT NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            tone VARCHAR(50) NOT NULL,
+            use_cache TINYINT(1) NOT NULL DEFAULT 1,
+            priority INT NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            attempts INT NOT NULL DEFAULT 0,
+            max_attempts INT NOT NULL DEFAULT 3,
+            available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            claimed_by VARCHAR(64),
+            started_at DATETIME,
+            post_id INT,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_jobs_claim (status, priority, available_at),
+            INDEX idx_jobs_claimed_by (claimed_by)
+        )
+        """,
+    ]),
+    # One row per table, bumped by every write; list endpoints derive their
+    # ETag and Last-Modified headers from it (modified_at is a Unix time)
+    (4, 'Create table_versions for HTTP caching', [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            modified_at DOUBLE NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        INSERT IGNORE INTO table_versions (table_name, modified_at)
+        VALUES ('events', UNIX_TIMESTAMP()), ('generated_posts', UNIX_TIMESTAMP())
+        """,
+    ]),
+    # SHA-256 of the event fields and generation parameters a post was
+    # built from, so an unchanged request can reuse the existing draft
+    (5, 'Add generated_posts.fingerprint', [
+        "ALTER TABLE generated_posts ADD COLUMN fingerprint CHAR(64) NULL",
+        "CREATE INDEX idx_posts_fingerprint ON generated_posts (fingerprint)",
+    ]),
+    # OpenAI rate limit token buckets shared by every worker process
+    # (OPENAI_RATE_LIMIT_BACKEND=database)
+    (6, 'Create rate_limit_buckets', [
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            name VARCHAR(128) PRIMARY KEY,
+            tokens DOUBLE NOT NULL,
+            updated_at DOUBLE NOT NULL
+        )
+        """,
+    ]),
+    # InnoDB keeps FULLTEXT indexes up to date on every write; adding one
+    # to a large table rebuilds it, so run this off-peak
+    (7, 'Add full-text search indexes', [
+        "ALTER TABLE events ADD FULLTEXT INDEX ft_events_text (title, description)",
+        "ALTER TABLE generated_posts ADD FULLTEXT INDEX ft_posts_text (content, hashtags)",
+    ]),
+    # Filled by hashtag_index.py as posts are written; existing posts are
+    # counted by running `python hashtag_index.py` once
+    (8, 'Create hashtag index tables', [
+        """
+        CREATE TABLE IF NOT EXISTS hashtag_counts (
+            platform VARCHAR(50) NOT NULL,
+            event_type VARCHAR(100) NOT NULL,
+            tag VARCHAR(100) NOT NULL,
+            label VARCHAR(100) NOT NULL,
+            uses INT NOT NULL DEFAULT 0,
+            positive INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (platform, event_type, tag)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS hashtag_pairs (
+            platform VARCHAR(50) NOT NULL,
+            tag VARCHAR(100) NOT NULL,
+            related VARCHAR(100) NOT NULL,
+            uses INT NOT NULL DEFAULT 0,
+            positive INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (platform, tag, related)
+        )
+        """,
+    ]),
+    # hashtag_index.py now stores each pair once, as tag < related in
+    # code point order (utf8mb4 bytes compare in that order)
+    (9, 'Store each hashtag pair once', [
+        "DELETE FROM hashtag_pairs WHERE CAST(tag AS BINARY) > CAST(related AS BINARY)",
+    ]),
+]
+
+# The same migrations in SQLite's dialect. SQLite DDL is transactional,
+# so each migration is applied atomically and is never half-done.
+SQLITE_MIGRATIONS = {
+    1: [
+        """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title VARCHAR(255) NOT NULL,
+            date DATE NOT NULL,
+            location VARCHAR(255),
+            type VARCHAR(100),
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS generated_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            tone VARCHAR(50) NOT NULL,
+            content TEXT NOT NULL,
+            hashtags TEXT,
+            status VARCHAR(20) DEFAULT 'draft',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+        )
+        """,
+        # Stand-ins for MySQL's ON UPDATE CURRENT_TIMESTAMP
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_events_updated_at
+        AFTER UPDATE ON events FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+        BEGIN
+            UPDATE events SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_posts_updated_at
+        AFTER UPDATE ON generated_posts FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+        BEGIN
+            UPDATE generated_posts SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        """,
+    ],
+    # SQLite does not append the primary key to secondary indexes, so the
+    # keyset tiebreaker is spelled out
+    2: [
+        "CREATE INDEX IF NOT EXISTS idx_events_date ON events (date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_created ON generated_posts (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_event_created ON generated_posts (event_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_status_created ON generated_posts (status, created_at, id)",
+    ],
+    3: [
+        """
+        CREATE TABLE IF NOT EXISTS generation_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            tone VARCHAR(50) NOT NULL,
+            use_cache INTEGER NOT NULL DEFAULT 1,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            available_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            claimed_by VARCHAR(64),
+            started_at DATETIME,
+            post_id INTEGER,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON generation_jobs (status, priority, available_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_claimed_by ON generation_jobs (claimed_by)",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_updated_at
+        AFTER UPDATE ON generation_jobs FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+        BEGIN
+            UPDATE generation_jobs SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        """,
+    ],
+    4: [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name VARCHAR(64) PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            modified_at REAL NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        INSERT OR IGNORE INTO table_versions (table_name, modified_at)
+        VALUES ('events', strftime('%s', 'now')), ('generated_posts', strftime('%s', 'now'))
+        """,
+    ],
+    5: [
+        "ALTER TABLE generated_posts ADD COLUMN fingerprint CHAR(64)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_fingerprint ON generated_posts (fingerprint)",
+    ],
+    6: [
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            name VARCHAR(128) PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+    ],
+    # FTS5 indexes over the tables' own rows (external content), kept in
+    # sync by triggers; 'rebuild' indexes the rows that already exist
+    7: [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+            title, description, content='events', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_events_fts_insert AFTER INSERT ON events
+        BEGIN
+            INSERT INTO events_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_events_fts_delete AFTER DELETE ON events
+        BEGIN
+            INSERT INTO events_fts (events_fts, rowid, title, description) VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_events_fts_update AFTER UPDATE OF title, description ON events
+        BEGIN
+            INSERT INTO events_fts (events_fts, rowid, title, description) VALUES ('delete', OLD.id, OLD.title, OLD.description);
+            INSERT INTO events_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+        END
+        """,
+        "INSERT INTO events_fts (events_fts) VALUES ('rebuild')",
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS generated_posts_fts USING fts5(
+            content, hashtags, content='generated_posts', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_generated_posts_fts_insert AFTER INSERT ON generated_posts
+        BEGIN
+            INSERT INTO generated_posts_fts (rowid, content, hashtags) VALUES (NEW.id, NEW.content, NEW.hashtags);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_generated_posts_fts_delete AFTER DELETE ON generated_posts
+        BEGIN
+            INSERT INTO generated_posts_fts (generated_posts_fts, rowid, content, hashtags) VALUES ('delete', OLD.id, OLD.content, OLD.hashtags);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_generated_posts_fts_update AFTER UPDATE OF content, hashtags ON generated_posts
+        BEGIN
+            INSERT INTO generated_posts_fts (generated_posts_fts, rowid, content, hashtags) VALUES ('delete', OLD.id, OLD.content, OLD.hashtags);
+            INSERT INTO generated_posts_fts (rowid, content, hashtags) VALUES (NEW.id, NEW.content, NEW.hashtags);
+        END
+        """,
+        "INSERT INTO generated_posts_fts (generated_posts_fts) VALUES ('rebuild')",
+    ],
+    8: [
+        """
+        CREATE TABLE IF NOT EXISTS hashtag_counts (
+            platform VARCHAR(50) NOT NULL,
+            event_type VARCHAR(100) NOT NULL,
+            tag VARCHAR(100) NOT NULL,
+            label VARCHAR(100) NOT NULL,
+            uses INT NOT NULL DEFAULT 0,
+            positive INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (platform, event_type, tag)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS hashtag_pairs (
+            platform VARCHAR(50) NOT NULL,
+            tag VARCHAR(100) NOT NULL,
+            related VARCHAR(100) NOT NULL,
+            uses INT NOT NULL DEFAULT 0,
+            positive INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (platform, tag, related)
+        )
+        """,
+    ],
+    9: [
+        "DELETE FROM hashtag_pairs WHERE tag > related",
+    ],
+}
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_versions(conn):
+    """Versions already recorded in schema_migrations"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    versions = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    return versions
+
+
+def schema_version(conn):
+    """Highest applied version, or 0 for a database without schema_migrations
+
+    Only reads, so checking an up-to-date database runs no DDL.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+        row = cursor.fetchone()
+    except Exception as e:
+        if getattr(e, 'errno', None) != ER_NO_SUCH_TABLE and 'no such table' not in str(e):
+            raise
+        return 0
+    finally:
+        cursor.close()
+    return row[0] or 0
+
+
+def run_migrations(conn, target_version=None, backend='mysql'):
+    """Apply pending migrations up to target_version (default: latest)
+
+    Returns the list of versions applied by this call.
+    """
+    # Migrations are applied in order, so the highest version marks
+    # every earlier one as applied too
+    if schema_version(conn) >= (target_version or LATEST_VERSION):
+        return []
+
+    done = applied_versions(conn)
+    applied = []
+    cursor = conn.cursor()
+
+    for version, description, statements in MIGRATIONS:
+        if target_version is not None and version > target_version:
+            break
+        if version in done:
+            continue
+
+        if backend == 'sqlite':
+            statements = SQLITE_MIGRATIONS[version]
+            cursor.execute("BEGIN")
+
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                if getattr(e, 'errno', None) not in ALREADY_APPLIED_ERRORS:
+                    raise
+
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+            (version, description)
+        )
+        conn.commit()
+        applied.append(version)
+        print(f"Applied migration {version}: {description}")
+
+    cursor.close()
+    return applied
@@ -0,0 +1,88 @@
+"""
+Keyset pagination helpers for the list endpoints
+Cursors are opaque URL-safe tokens holding the sort key of the last row
+on the previous page, so each page is an index range scan instead of an
+OFFSET that re-reads every skipped row.
+"""
+import base64
+import json
+from datetime import date, datetime
+from config import Config
+
+
+def parse_limit(args):
+    """Read ?limit=, clamped to 1..PAGE_MAX_LIMIT"""
+    limit = args.get('limit', Config.PAGE_DEFAULT_LIMIT, type=int)
+    return max(1, min(limit, Config.PAGE_MAX_LIMIT))
+
+
+def parse_fields(args, allowed, always):
+    """Read ?fields=a,b into a column list
+
+    Columns in `always` (the primary key and sort key) are always
+    returned because the next cursor is built from them.
+    """
+    requested = args.get('fields')
+    if not requested:
+        return list(allowed)
+
+    fields = [field.strip() for field in requested.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+    return list(always) + [field for field in fields if field not in always]
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page"""
+    serialized = []
+    for value in values:
+        if isinstance(value, datetime):
+            serialized.append(value.isoformat(' '))
+        elif isinstance(value, date):
+            serialized.append(value.isoformat())
+        else:
+            serialized.append(value)
+    raw = json.dumps(serialized, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor, validating its shape"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    # Only what encode_cursor writes; anything else was tampered with
+    if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def keyset_condition(columns, values):
+    """WHERE fragment selecting rows after `values` in descending order
+
+    For columns (a, b) this is `a < %s OR (a = %s AND b < %s)`, written
+    out instead of a row comparison so MySQL can use a range scan on the
+    (a, b) index.
+    """
+    clauses = []
+    params = []
+    for i, column in enumerate(columns):
+        parts = [f"{prev} = %s" for prev in columns[:i]] + [f"{column} < %s"]
+        clauses.append('(' + ' AND '.join(parts) + ')')
+        params.extend(values[:i] + [values[i]])
+    return '(' + ' OR '.join(clauses) + ')', params
+
+
+def paginate(rows, limit, sort_key):
+    """Trim the limit+1 probe row and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort_key(rows[-1]))
@@ -0,0 +1,391 @@
+"""
+Precompiled prompt and fallback templates
+Platform/tone guidelines are baked into one template per (platform, tone)
+pair at startup, and every template is compiled into a function whose
+body is a single f-string, so rendering does no parsing, dict building or
+repeated concatenation. Extra platforms, tones and templates can be
+dropped into PROMPT_TEMPLATE_DIR as JSON files and are hot-reloaded.
+"""
+import hashlib
+import json
+import os
+import re
+import string
+import threading
+import time
+from functools import lru_cache
+from config import Config
+
+PLATFORM_GUIDELINES = {
+    'linkedin': 'Professional tone, business-focused, 1300 characters max, include relevant industry hashtags',
+    'instagram': 'Visual and engaging, use emojis, 2200 characters max, include trending hashtags (5-10)',
+    'facebook': 'Conversational and community-focused, 5000 characters max, include relevant hashtags',
+    'twitter': 'Concise and engaging, 280 characters max, use 1-3 relevant hashtags'
+}
+
+TONE_GUIDELINES = {
+    'formal': 'Use formal language, professional terminology',
+    'professional': 'Use professional but approachable language',
+    'promotional': 'Use persuasive language, highlight benefits and value',
+    'friendly': 'Use casual, warm, and approachable language'
+}
+
+# {tone}, {platform} and the guidelines are filled in at compile time;
+# the event fields are filled in per render.
+PROMPT_TEMPLATE = """Generate a {tone} social media post for {platform}.
+
+Event Details:
+- Title: {{title}}
+- Date: {{date}}
+- Location: {{location}}
+- Type: {{type}}
+- Description: {{description}}
+
+Platform Guidelines: {platform_guidelines}
+Tone Guidelines: {tone_guidelines}
+
+Please generate:
+1. A compelling caption/post content
+2. Relevant hashtags (separated by spaces, starting with #)
+
+Format your response as:
+CONTENT:
+[your post content here]
+
+HASHTAGS:
+[hashtags here, each starting with #]
+"""
+
+# Used with HASHTAGS_IN_PROMPT=False: hashtags come from the learned
+# hashtag index, so the model isn't asked (or paid) to write them
+PROMPT_TEMPLATE_WITHOUT_HASHTAGS = """Generate a {tone} social media post for {platform}.
+
+Event Details:
+- Title: {{title}}
+- Date: {{date}}
+- Location: {{location}}
+- Type: {{type}}
+- Description: {{description}}
+
+Platform Guidelines: {platform_guidelines}
+Tone Guidelines: {tone_guidelines}
+
+Write only the post content, without hashtags (they are added separately).
+
+Format your response as:
+CONTENT:
+[your post content here]
+"""
+
+# One request for several platforms; {platform_guidelines} becomes one
+# "- platform: guidelines" line per platform and {example} shows the
+# expected JSON shape.
+MULTI_PROMPT_TEMPLATE = """Generate a {tone} social media post for each of these platforms: {platforms}.
+
+Event Details:
+- Title: {{title}}
+- Date: {{date}}
+- Location: {{location}}
+- Type: {{type}}
+- Description: {{description}}
+
+Platform Guidelines:
+{platform_guidelines}
+Tone Guidelines: {tone_guidelines}
+
+Write a separate post for every platform, following its guidelines.
+Respond with only a JSON object that has one key per platform, each holding
+{entry}, like this:
+{example}
+"""
+
+# Each fallback template has a variant with and without the location
+# line, so rendering never needs conditional string building.
+FALLBACK_TEMPLATES = {
+    'twitter': (
+        "🎉 {title}\n\n📅 {date}\n📍 {location}\n\n{description:.200}",
+        "🎉 {title}\n\n📅 {date}\n\n{description:.200}"
+    ),
+    'linkedin': (
+        "We're excited to announce: {title}\n\n📅 Date: {date}\n📍 Location: {location}\n"
+        "\n{description}\n\nJoin us for this {type} event!",
+        "We're excited to announce: {title}\n\n📅 Date: {date}\n"
+        "\n{description}\n\nJoin us for this {type} event!"
+    ),
+    'instagram': (
+        "✨ {title} ✨\n\n📅 {date}\n📍 {location}\n\n{description}\n\nDon't miss out! 🎉",
+        "✨ {title} ✨\n\n📅 {date}\n\n{description}\n\nDon't miss out! 🎉"
+    ),
+    'facebook': (
+        "Join us for {title}!\n\n📅 Date: {date}\n📍 Location: {location}\n\n{description}\n\nWe hope to see you there!",
+        "Join us for {title}!\n\n📅 Date: {date}\n\n{description}\n\nWe hope to see you there!"
+    ),
+}
+
+DEFAULT_FALLBACK_PLATFORM = 'facebook'
+
+BASE_HASHTAGS = ['#Event', '#Community', '#Networking']
+
+DEFAULT_HASHTAGS = {
+    'instagram': ' '.join(BASE_HASHTAGS + ['#EventPlanning', '#SocialEvent', '#JoinUs']),
+    'linkedin': ' '.join(BASE_HASHTAGS + ['#ProfessionalDevelopment', '#BusinessEvent']),
+    'twitter': ' '.join(BASE_HASHTAGS[:2]),  # Shorter for Twitter
+}
+
+DEFAULT_HASHTAG_STRING = ' '.join(BASE_HASHTAGS)
+
+FIELD_NAMES = ('title', 'date', 'location', 'type', 'description')
+
+SAMPLE_EVENT = ('T', 'D', 'L', 'Y', 'X')
+
+# Format specs end up in generated source, so only plain spec characters
+# are allowed (no quotes, braces or backslashes)
+SAFE_FORMAT_SPEC = re.compile(r"^[\w .,<>=^+\-#%]*$")
+
+_formatter = string.Formatter()
+
+
+def _escape(text):
+    """Make arbitrary text safe to embed in a format string"""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def compile_template(template):
+    """Compile a str.format-style template over FIELD_NAMES into a function
+
+    The returned function takes the event fields positionally. Literal
+    text is bound as default-argument constants rather than spliced into
+    the generated source, and only whitelisted field names and plain
+    format specs are accepted, so user templates cannot inject code.
+    """
+    constants = {}
+    parts = []
+    for literal, field, spec, conversion in _formatter.parse(template):
+        if literal:
+            name = f'_l{len(constants)}'
+            constants[name] = literal
+            parts.append('{' + name + '}')
+        if field is None:
+            continue
+        if field not in FIELD_NAMES:
+            raise KeyError(field)
+        if conversion not in (None, 's', 'r', 'a') or (spec and not SAFE_FORMAT_SPEC.match(spec)):
+            raise ValueError(f"Unsupported format for field {field!r}")
+        parts.append('{' + field + (f'!{conversion}' if conversion else '') + (f':{spec}' if spec else '') + '}')
+
+    params = ', '.join(FIELD_NAMES + tuple(f'{name}={name}' for name in constants))
+    source = f'def render({params}):\n    return f"""{"".join(parts)}"""\n'
+    namespace = dict(constants)
+    exec(compile(source, '<template>', 'exec'), namespace)
+    return namespace['render']
+
+
+class CompiledTemplates:
+    """Immutable snapshot of every compiled template"""
+
+    def __init__(self, platform_guidelines, tone_guidelines, prompt_template,
+                 fallback_templates, default_hashtags, hashtags_in_prompt=True):
+        self.platform_guidelines = platform_guidelines
+        self.tone_guidelines = tone_guidelines
+        self.prompt_template = prompt_template
+        self.fallback_templates = fallback_templates
+        self.default_hashtags = default_hashtags
+        self.hashtags_in_prompt = hashtags_in_prompt
+        # Changes whenever any template or guideline does, so drafts
+        # generated from older templates are not reused
+        self.version = hashlib.sha256(json.dumps(
+            [platform_guidelines, tone_guidelines, prompt_template, fallback_templates,
+             default_hashtags, hashtags_in_prompt],
+            sort_keys=True, ensure_ascii=False
+        ).encode('utf-8')).hexdigest()[:16]
+
+        self.prompts = {
+            (platform, tone): self.compile_prompt(platform, tone)
+            for platform in platform_guidelines
+            for tone in tone_guidelines
+        }
+        self.fallbacks = {
+            platform: tuple(compile_template(template) for template in templates)
+            for platform, templates in fallback_templates.items()
+        }
+        # Pairs outside the configured platforms/tones come straight from
+        # request values, so they are memoised in a bounded cache only
+        self.compile_extra_prompt = lru_cache(maxsize=128)(self.compile_prompt)
+        self.compile_multi_prompt = lru_cache(maxsize=128)(self._compile_multi_prompt)
+
+    def compile_prompt(self, platform, tone):
+        return compile_template(self.prompt_template.format(
+            platform=_escape(platform),
+            tone=_escape(tone),
+            platform_guidelines=_escape(self.platform_guidelines.get(platform, '')),
+            tone_guidelines=_escape(self.tone_guidelines.get(tone, ''))
+        ))
+
+    def _compile_multi_prompt(self, platforms, tone):
+        guidelines = '\n'.join(
+            f"- {platform}: {self.platform_guidelines.get(platform, '')}" for platform in platforms
+        )
+        if self.hashtags_in_prompt:
+            description = 'the post content and its hashtags (each starting with #)'
+            entry = json.dumps({'content': '...', 'hashtags': ['#...']})
+        else:
+            description = 'only the post content, without hashtags (they are added separately)'
+            entry = json.dumps({'content': '...'})
+        example = '{\n' + ',\n'.join(f'  {json.dumps(platform)}: {entry}' for platform in platforms) + '\n}'
+        return compile_template(MULTI_PROMPT_TEMPLATE.format(
+            platforms=_escape(', '.join(platforms)),
+            tone=_escape(tone),
+            platform_guidelines=_escape(guidelines),
+            tone_guidelines=_escape(self.tone_guidelines.get(tone, '')),
+            entry=_escape(description),
+            example=_escape(example)
+        ))
+
+
+class TemplateEngine:
+    """Renders prompts, fallback posts and default hashtags"""
+
+    def __init__(self, template_dir=None, reload_interval=None):
+        self.template_dir = Config.PROMPT_TEMPLATE_DIR if template_dir is None else template_dir
+        self.reload_interval = Config.PROMPT_TEMPLATE_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0
+        try:
+            self._compiled = self._compile(self._load_overrides())
+        except (OSError, ValueError, KeyError, IndexError, SyntaxError) as e:
+            print(f"Ignoring invalid prompt templates in {self.template_dir}: {e}")
+            self._compiled = self._compile({})
+
+    def render_prompt(self, event_data, platform, tone):
+        compiled = self._current()
+        render = compiled.prompts.get((platform, tone))
+        if render is None:
+            render = compiled.compile_extra_prompt(platform, tone)
+        return render(
+            event_data.get('title', 'N/A'),
+            event_data.get('date', 'N/A'),
+            event_data.get('location', 'N/A'),
+            event_data.get('type', 'N/A'),
+            event_data.get('description', 'N/A')
+        )
+
+    def render_multi_prompt(self, event_data, platforms, tone):
+        """Prompt asking for one post per platform in a single JSON reply"""
+        render = self._current().compile_multi_prompt(tuple(platforms), tone)
+        return render(
+            event_data.get('title', 'N/A'),
+            event_data.get('date', 'N/A'),
+            event_data.get('location', 'N/A'),
+            event_data.get('type', 'N/A'),
+            event_data.get('description', 'N/A')
+        )
+
+    def render_fallback(self, event_data, platform):
+        compiled = self._current()
+        location = event_data.get('location', '')
+        with_location, without_location = compiled.fallbacks.get(
+            platform, compiled.fallbacks[DEFAULT_FALLBACK_PLATFORM]
+        )
+        render = with_location if location else without_location
+        return render(
+            event_data.get('title', 'Event'),
+            event_data.get('date', ''),
+            location,
+            event_data.get('type', ''),
+            event_data.get('description', '')
+        )
+
+    def default_hashtags(self, platform):
+        return self._current().default_hashtags.get(platform, DEFAULT_HASHTAG_STRING)
+
+    def version(self):
+        """Digest of the templates in use, for generation fingerprints"""
+        return self._current().version
+
+    def _current(self):
+        if self.template_dir and self.reload_interval >= 0 and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._compiled
+
+    def _maybe_reload(self):
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.reload_interval
+            if self._file_signature() == self._signature:
+                return
+            try:
+                # Swap in a whole new snapshot; renders in flight keep the old one
+                self._compiled = self._compile(self._load_overrides())
+                print(f"Reloaded prompt templates from {self.template_dir}")
+            except (OSError, ValueError, KeyError, IndexError, SyntaxError) as e:
+                print(f"Ignoring invalid prompt templates in {self.template_dir}: {e}")
+
+    def _template_files(self):
+        if not self.template_dir or not os.path.isdir(self.template_dir):
+            return []
+        return sorted(
+            entry.path for entry in os.scandir(self.template_dir)
+            if entry.is_file() and entry.name.endswith('.json')
+        )
+
+    def _file_signature(self):
+        signature = []
+        for path in self._template_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load_overrides(self):
+        """Merge every *.json file in the template directory, in name order
+
+        Recognised keys: platform_guidelines, tone_guidelines, prompt,
+        fallback_templates ({platform: template or [with_location,
+        without_location]}) and default_hashtags ({platform: "#A #B"}).
+        A custom prompt uses {platform}, {tone}, {platform_guidelines} and
+        {tone_guidelines} once-braced and event fields twice-braced, like
+        PROMPT_TEMPLATE; fallback templates use once-braced event fields.
+        """
+        self._signature = self._file_signature()
+        overrides = {}
+        for path in self._template_files():
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            for key, value in data.items():
+                if isinstance(value, dict):
+                    overrides.setdefault(key, {}).update(value)
+                else:
+                    overrides[key] = value
+        return overrides
+
+    def _compile(self, overrides):
+        fallback_templates = dict(FALLBACK_TEMPLATES)
+        for platform, template in overrides.get('fallback_templates', {}).items():
+            if isinstance(template, str):
+                template = (template, template)
+            fallback_templates[platform] = tuple(template)
+
+        compiled = CompiledTemplates(
+            platform_guidelines={**PLATFORM_GUIDELINES, **overrides.get('platform_guidelines', {})},
+            tone_guidelines={**TONE_GUIDELINES, **overrides.get('tone_guidelines', {})},
+            prompt_template=overrides.get(
+                'prompt', PROMPT_TEMPLATE if Config.HASHTAGS_IN_PROMPT else PROMPT_TEMPLATE_WITHOUT_HASHTAGS
+            ),
+            fallback_templates=fallback_templates,
+            default_hashtags={**DEFAULT_HASHTAGS, **overrides.get('default_hashtags', {})},
+            hashtags_in_prompt=Config.HASHTAGS_IN_PROMPT
+        )
+
+        # Fail at load time, not on the first request, if a template
+        # has a format spec that does not apply to text
+        for renders in compiled.fallbacks.values():
+            for render in renders:
+                render(*SAMPLE_EVENT)
+        for render in compiled.prompts.values():
+            render(*SAMPLE_EVENT)
+
+        return compiled
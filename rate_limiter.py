@@ -0,0 +1,277 @@
+"""
+Client-side rate limiting for OpenAI requests
+Token buckets for requests per minute and tokens per minute. Each call
+reserves its share of both buckets up front and then sleeps until the
+reservation is due. Callers are served in arrival order, and the API sees
+a steady rate instead of bursts that come back as 429s. The buckets live
+in process memory, or in the database so every worker process draws from
+one shared budget.
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from metrics import OPENAI_RATE_LIMIT_WAIT_SECONDS, OPENAI_RATE_LIMITED, log_event
+
+# Bucket capacity in seconds of refill, i.e. the burst allowed after an
+# idle period. OpenAI enforces per-minute limits over windows as short as
+# a second, so a whole minute's budget sent at once would be rejected.
+BURST_SECONDS = 1
+
+# Used when a 429 response has no Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+BACKEND_SQL = {
+    'mysql': {
+        'lock': None,
+        'insert_ignore': "INSERT IGNORE",
+        'for_update': " FOR UPDATE",
+    },
+    'sqlite': {
+        # Take the write lock before reading, like SELECT ... FOR UPDATE
+        'lock': "BEGIN IMMEDIATE",
+        'insert_ignore': "INSERT OR IGNORE",
+        'for_update': "",
+    },
+}
+
+
+class RateLimitExceeded(Exception):
+    """Capacity would not be available within the maximum wait"""
+
+
+def estimate_tokens(chat_request):
+    """Tokens OpenAI counts against the TPM limit for a chat request
+
+    Like the API's own estimate: about four characters per prompt token,
+    plus max_tokens for the completion.
+    """
+    characters = sum(len(message['content']) for message in chat_request['messages'])
+    return characters // 4 + 4 * len(chat_request['messages']) + chat_request.get('max_tokens', 0)
+
+
+class MemoryBucketBackend:
+    """Buckets shared by the threads of this process"""
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self):
+        self._buckets = {}  # name -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def buckets(self, capacities):
+        """Lock the named buckets and yield {name: (tokens, updated_at)}
+
+        Changes made to the dict are saved when the block exits.
+        """
+        with self._lock:
+            now = self.clock()
+            state = {name: self._buckets.get(name, (capacity, now)) for name, capacity in capacities.items()}
+            yield state
+            self._buckets.update(state)
+
+
+class DatabaseBucketBackend:
+    """Buckets stored in the rate_limit_buckets table, shared by every process
+
+    Each reservation is one short transaction holding the bucket rows'
+    locks. Timestamps are wall-clock seconds, so the clocks of the
+    machines sharing a database have to be in sync.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, db):
+        self.db = db
+        self.sql = BACKEND_SQL[db.backend]
+        self._lock = threading.Lock()
+        self._ready = set()
+
+    @contextmanager
+    def buckets(self, capacities):
+        # One reservation at a time per process, so the limiter never
+        # holds more than one pooled connection
+        with self._lock, self.db.connection() as conn:
+            self._create_missing(conn, capacities)
+            cursor = conn.cursor()
+            try:
+                if self.sql['lock']:
+                    cursor.execute(self.sql['lock'])
+                placeholders = ', '.join(['%s'] * len(capacities))
+                cursor.execute(
+                    f"SELECT name, tokens, updated_at FROM rate_limit_buckets "
+                    f"WHERE name IN ({placeholders}){self.sql['for_update']}",
+                    list(capacities)
+                )
+                state = {row[0]: (float(row[1]), float(row[2])) for row in cursor.fetchall()}
+                original = dict(state)
+                yield state
+
+                changed = [(tokens, updated_at, name) for name, (tokens, updated_at) in state.items()
+                           if original.get(name) != (tokens, updated_at)]
+                if changed:
+                    cursor.executemany("UPDATE rate_limit_buckets SET tokens = %s, updated_at = %s WHERE name = %s",
+                                       changed)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _create_missing(self, conn, capacities):
+        # Committed on its own: inserting in the reservation transaction
+        # would take shared locks that deadlock against FOR UPDATE
+        missing = [name for name in capacities if name not in self._ready]
+        if not missing:
+            return
+        cursor = conn.cursor()
+        now = self.clock()
+        cursor.executemany(
+            f"{self.sql['insert_ignore']} INTO rate_limit_buckets (name, tokens, updated_at) VALUES (%s, %s, %s)",
+            [(name, capacities[name], now) for name in missing]
+        )
+        conn.commit()
+        cursor.close()
+        self._ready.update(missing)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one model"""
+
+    def __init__(self, backend, requests_per_minute, tokens_per_minute, max_wait, model):
+        self.backend = backend
+        self.max_wait = max_wait
+        # name -> refill rate per second; a limit of 0 is not enforced
+        self.rates = {
+            f'{model}:{kind}': limit / 60.0
+            for kind, limit in (('requests', requests_per_minute), ('tokens', tokens_per_minute))
+            if limit > 0
+        }
+        self.capacities = {name: max(rate * BURST_SECONDS, 1.0) for name, rate in self.rates.items()}
+        self._requests_bucket = f'{model}:requests'
+        self._stats_lock = threading.Lock()
+        self.waiting = 0
+        self.reserved = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def reserve(self, tokens):
+        """Take one request and `tokens` tokens; returns the seconds to wait first
+
+        Raises RateLimitExceeded (without taking anything) when the wait
+        would be longer than max_wait.
+        """
+        with self.backend.buckets(self.capacities) as state:
+            now = self.backend.clock()
+            levels = {}
+            wait = 0.0
+            for name, rate in self.rates.items():
+                capacity = self.capacities[name]
+                cost = 1 if name == self._requests_bucket else min(tokens, capacity)
+                # Buckets go negative: the debt is what earlier callers
+                # still have queued, so later callers wait behind them
+                levels[name] = self._refill(state, name, now) - cost
+                wait = max(wait, -levels[name] / rate)
+            if wait > self.max_wait:
+                with self._stats_lock:
+                    self.rejected += 1
+                OPENAI_RATE_LIMITED.labels('max_wait').inc()
+                raise RateLimitExceeded(f'OpenAI rate limit: capacity in {wait:.1f}s, '
+                                        f'longer than the {self.max_wait:g}s maximum wait')
+            state.update((name, (level, now)) for name, level in levels.items())
+        with self._stats_lock:
+            self.reserved += 1
+            if wait > 0:
+                self.delayed += 1
+                self.wait_seconds += wait
+        return wait
+
+    def acquire(self, tokens, mode='sync'):
+        """Block until a request of `tokens` tokens may be sent"""
+        wait = self.reserve(tokens)
+        OPENAI_RATE_LIMIT_WAIT_SECONDS.labels(mode).observe(wait)
+        if wait > 0:
+            with self._queued():
+                time.sleep(wait)
+
+    async def aacquire(self, tokens, mode='async'):
+        """Async variant of acquire; waits without holding a thread"""
+        if isinstance(self.backend, MemoryBucketBackend):
+            wait = self.reserve(tokens)
+        else:
+            # The database round trip would stall the event loop
+            wait = await asyncio.get_running_loop().run_in_executor(None, self.reserve, tokens)
+        OPENAI_RATE_LIMIT_WAIT_SECONDS.labels(mode).observe(wait)
+        if wait > 0:
+            with self._queued():
+                await asyncio.sleep(wait)
+
+    def throttle(self, retry_after=None):
+        """Hold back every caller after a 429 from the API
+
+        Empties the requests bucket so that no new request is sent for
+        `retry_after` seconds; callers already waiting keep their place.
+        """
+        retry_after = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        with self._stats_lock:
+            self.throttled += 1
+        OPENAI_RATE_LIMITED.labels('429').inc()
+        log_event('openai_rate_limited', retry_after=retry_after)
+
+        rate = self.rates.get(self._requests_bucket)
+        if rate is None:
+            return
+        with self.backend.buckets(self.capacities) as state:
+            now = self.backend.clock()
+            level = self._refill(state, self._requests_bucket, now)
+            state[self._requests_bucket] = (min(level, -retry_after * rate), now)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'requests_per_minute': round(self.rates.get(self._requests_bucket, 0) * 60),
+                'waiting': self.waiting,
+                'reserved': self.reserved,
+                'delayed': self.delayed,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+                'wait_seconds': round(self.wait_seconds, 3)
+            }
+
+    def _refill(self, state, name, now):
+        tokens, updated_at = state.get(name, (self.capacities[name], now))
+        return min(self.capacities[name], tokens + max(0.0, now - updated_at) * self.rates[name])
+
+    @contextmanager
+    def _queued(self):
+        with self._stats_lock:
+            self.waiting += 1
+        try:
+            yield
+        finally:
+            with self._stats_lock:
+                self.waiting -= 1
+
+
+def create_rate_limiter(db=None):
+    """Build the limiter selected by Config.OPENAI_RATE_LIMIT_BACKEND, or None"""
+    backend = Config.OPENAI_RATE_LIMIT_BACKEND.lower()
+
+    if backend in ('', 'none', 'off') or (Config.OPENAI_RPM_LIMIT <= 0 and Config.OPENAI_TPM_LIMIT <= 0):
+        return None
+    if backend == 'memory':
+        store = MemoryBucketBackend()
+    elif backend == 'database':
+        if db is None:
+            raise ValueError("OPENAI_RATE_LIMIT_BACKEND=database needs a database")
+        store = DatabaseBucketBackend(db)
+    else:
+        raise ValueError(f"Unknown OPENAI_RATE_LIMIT_BACKEND: {Config.OPENAI_RATE_LIMIT_BACKEND}")
+
+    return RateLimiter(store, Config.OPENAI_RPM_LIMIT, Config.OPENAI_TPM_LIMIT,
+                       Config.OPENAI_RATE_LIMIT_MAX_WAIT, Config.OPENAI_MODEL)
@@ -0,0 +1,467 @@
+"""
+Data access for events and generated posts
+Route handlers go through these repositories instead of writing SQL
+inline. Queries use %s placeholders and syntax both storage backends
+accept, so the same code runs on MySQL and on the embedded SQLite
+database; every statement is timed by database.TimedCursor.
+"""
+import time
+from hashtag_index import indexed_posts, new_drafts, record_hashtags, type_key
+from pagination import keyset_condition, paginate
+
+EVENT_FIELDS = ('id', 'title', 'date', 'location', 'type', 'description', 'created_at', 'updated_at')
+
+POST_COLUMNS = {
+    'id': 'gp.id',
+    'event_id': 'gp.event_id',
+    'event_title': 'e.title AS event_title',
+    'platform': 'gp.platform',
+    'tone': 'gp.tone',
+    'content': 'gp.content',
+    'hashtags': 'gp.hashtags',
+    'status': 'gp.status',
+    'created_at': 'gp.created_at',
+    'updated_at': 'gp.updated_at'
+}
+
+INSERT_EVENT = """
+    INSERT INTO events (title, date, location, type, description)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+INSERT_POST = """
+    INSERT INTO generated_posts (event_id, platform, tone, content, hashtags, fingerprint, status)
+    VALUES (%s, %s, %s, %s, %s, %s, 'draft')
+"""
+
+
+def touch_tables(cursor, *tables):
+    """Bump the table_versions rows of `tables` in the caller's transaction
+
+    Every write to events or generated_posts goes through here, so a
+    listing is unchanged exactly when the versions it depends on are.
+    """
+    placeholders = ', '.join(['%s'] * len(tables))
+    cursor.execute(
+        f"UPDATE table_versions SET version = version + 1, modified_at = %s WHERE table_name IN ({placeholders})",
+        (time.time(), *tables)
+    )
+
+
+class VersionRepository:
+    """Reads the per-table change markers kept by touch_tables()"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, tables):
+        """{table: (version, modified_at)} with a primary-key lookup"""
+        placeholders = ', '.join(['%s'] * len(tables))
+        cursor = self.db.get_connection().cursor()
+        cursor.execute(
+            f"SELECT table_name, version, modified_at FROM table_versions WHERE table_name IN ({placeholders})",
+            tuple(tables)
+        )
+        versions = {table: (0, 0.0) for table in tables}
+        versions.update((row[0], (int(row[1]), float(row[2]))) for row in cursor.fetchall())
+        cursor.close()
+        return versions
+
+
+class EventRepository:
+    """Reads and writes rows of the events table"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def list(self, limit, fields=EVENT_FIELDS, date_from=None, date_to=None, after=None):
+        """One page of events, newest first; returns (events, next_cursor)
+
+        `after` is the decoded cursor of the previous page.
+        """
+        query, params = self._list_query(fields, date_from, date_to, after)
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute(query + " LIMIT %s", params + [limit + 1])
+        rows = cursor.fetchall()
+        cursor.close()
+        return paginate(rows, limit, lambda event: (event['date'], event['id']))
+
+    def iter_list(self, conn, batch_size, fields=EVENT_FIELDS, date_from=None, date_to=None, after=None):
+        """Yield every event list() pages through, batch_size rows at a time
+
+        Same filters and order as list(), without a page size; `conn` is
+        used as in iter_all().
+        """
+        query, params = self._list_query(fields, date_from, date_to, after)
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            yield from _fetch_batches(cursor, batch_size)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _list_query(fields, date_from, date_to, after):
+        conditions = []
+        params = []
+        if date_from:
+            conditions.append("date >= %s")
+            params.append(date_from)
+        if date_to:
+            conditions.append("date <= %s")
+            params.append(date_to)
+        if after:
+            condition, cursor_params = keyset_condition(['date', 'id'], after)
+            conditions.append(condition)
+            params.extend(cursor_params)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f"""
+            SELECT {', '.join(fields)} FROM events
+            {where}
+            ORDER BY date DESC, id DESC
+        """, params
+
+    def get(self, event_id):
+        """Event row, or None"""
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute("SELECT * FROM events WHERE id = %s", (event_id,))
+        event = cursor.fetchone()
+        cursor.close()
+        return event
+
+    def get_many(self, event_ids):
+        """Event rows for the given ids, with a single query"""
+        if not event_ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(event_ids))
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute(f"SELECT * FROM events WHERE id IN ({placeholders})", list(event_ids))
+        events = cursor.fetchall()
+        cursor.close()
+        return events
+
+    def create(self, data):
+        """Insert an event and return its id"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(INSERT_EVENT, (
+            data['title'],
+            data['date'],
+            data.get('location', ''),
+            data.get('type', ''),
+            data.get('description', '')
+        ))
+        event_id = cursor.lastrowid
+        touch_tables(cursor, 'events')
+        conn.commit()
+        cursor.close()
+        return event_id
+
+    def update(self, event_id, data):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT type FROM events WHERE id = %s", (event_id,))
+        row = cursor.fetchone()
+        # The hashtag index counts posts under their event's type
+        moved = indexed_posts(cursor, "gp.event_id = %s", (event_id,)) \
+            if row and type_key(row[0]) != type_key(data.get('type', '')) else []
+        cursor.execute("""
+            UPDATE events
+            SET title = %s, date = %s, location = %s, type = %s, description = %s
+            WHERE id = %s
+        """, (
+            data.get('title'),
+            data.get('date'),
+            data.get('location', ''),
+            data.get('type', ''),
+            data.get('description', ''),
+            event_id
+        ))
+        if cursor.rowcount:
+            record_hashtags(cursor, self.db.backend, removed=moved, added=[
+                (platform, data.get('type', ''), status, hashtags) for platform, _, status, hashtags in moved
+            ])
+            # Post listings show the event title
+            touch_tables(cursor, 'events', 'generated_posts')
+        conn.commit()
+        cursor.close()
+
+    def delete(self, event_id):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        posts = indexed_posts(cursor, "gp.event_id = %s", (event_id,))
+        cursor.execute("DELETE FROM events WHERE id = %s", (event_id,))
+        if cursor.rowcount:
+            record_hashtags(cursor, self.db.backend, removed=posts)
+            # The event's posts are deleted by ON DELETE CASCADE
+            touch_tables(cursor, 'events', 'generated_posts')
+        conn.commit()
+        cursor.close()
+
+    def insert_batch(self, conn, rows):
+        """Insert (title, date, location, type, description) tuples in one transaction"""
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(INSERT_EVENT, rows)
+            touch_tables(cursor, 'events')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return len(rows)
+
+    def iter_all(self, conn, batch_size):
+        """Yield every event in id order, batch_size rows at a time
+
+        The caller owns `conn` for as long as the generator runs. MySQL
+        cursors are unbuffered, so rows stream from the server as they
+        are fetched instead of being loaded all at once.
+        """
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(f"SELECT {', '.join(EVENT_FIELDS)} FROM events ORDER BY id")
+            yield from _fetch_batches(cursor, batch_size)
+        finally:
+            cursor.close()
+
+
+class PostRepository:
+    """Reads and writes rows of the generated_posts table"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def list(self, limit, fields=tuple(POST_COLUMNS), event_id=None, status=None, platform=None,
+             created_from=None, created_before=None, after=None):
+        """One page of posts, newest first; returns (posts, next_cursor)
+
+        created_from is inclusive and created_before exclusive.
+        """
+        query, params = self._list_query(fields, event_id, status, platform, created_from, created_before, after)
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute(query + " LIMIT %s", params + [limit + 1])
+        rows = cursor.fetchall()
+        cursor.close()
+        return paginate(rows, limit, lambda post: (post['created_at'], post['id']))
+
+    def iter_list(self, conn, batch_size, fields=tuple(POST_COLUMNS), event_id=None, status=None, platform=None,
+                  created_from=None, created_before=None, after=None):
+        """Yield every post list() pages through, batch_size rows at a time
+
+        Same filters and order as list(), without a page size; `conn` is
+        used as in EventRepository.iter_all().
+        """
+        query, params = self._list_query(fields, event_id, status, platform, created_from, created_before, after)
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            yield from _fetch_batches(cursor, batch_size)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _list_query(fields, event_id, status, platform, created_from, created_before, after):
+        conditions = []
+        params = []
+        for column, value in (('event_id', event_id), ('status', status), ('platform', platform)):
+            if value:
+                conditions.append(f"gp.{column} = %s")
+                params.append(value)
+        if created_from:
+            conditions.append("gp.created_at >= %s")
+            params.append(created_from)
+        if created_before:
+            conditions.append("gp.created_at < %s")
+            params.append(created_before)
+        if after:
+            condition, cursor_params = keyset_condition(['gp.created_at', 'gp.id'], after)
+            conditions.append(condition)
+            params.extend(cursor_params)
+
+        join = "JOIN events e ON gp.event_id = e.id" if 'event_title' in fields else ''
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f"""
+            SELECT {', '.join(POST_COLUMNS[field] for field in fields)}
+            FROM generated_posts gp
+            {join}
+            {where}
+            ORDER BY gp.created_at DESC, gp.id DESC
+        """, params
+
+    def find_drafts(self, event_id, fingerprints):
+        """{fingerprint: newest draft} among the event's drafts with those fingerprints
+
+        Drafts are {'id', 'content', 'hashtags'}; fingerprints without a
+        stored draft are missing from the result.
+        """
+        if not fingerprints:
+            return {}
+        placeholders = ', '.join(['%s'] * len(fingerprints))
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute(f"""
+            SELECT id, fingerprint, content, hashtags FROM generated_posts
+            WHERE fingerprint IN ({placeholders}) AND event_id = %s AND status = 'draft'
+            ORDER BY id
+        """, [*fingerprints, event_id])
+        drafts = {row.pop('fingerprint'): row for row in cursor.fetchall()}
+        cursor.close()
+        return drafts
+
+    def find_draft(self, event_id, fingerprint):
+        """Newest draft of the event with this fingerprint, or None"""
+        return self.find_drafts(event_id, [fingerprint]).get(fingerprint)
+
+    def create(self, event_id, platform, tone, result, fingerprint=None):
+        """Save a generated post as a draft and return its id"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(INSERT_POST, (event_id, platform, tone, result['content'], result['hashtags'], fingerprint))
+        post_id = cursor.lastrowid
+        record_hashtags(cursor, self.db.backend, added=new_drafts(cursor, [(event_id, platform, result['hashtags'])]))
+        touch_tables(cursor, 'generated_posts')
+        conn.commit()
+        cursor.close()
+        return post_id
+
+    def create_for_platforms(self, event_id, tone, results, fingerprints=None):
+        """Save one draft per platform in a single transaction; returns {platform: post_id}
+
+        fingerprints is an optional {platform: fingerprint}.
+        """
+        fingerprints = fingerprints or {}
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        post_ids = {}
+        try:
+            for platform, result in results.items():
+                cursor.execute(INSERT_POST, (event_id, platform, tone, result['content'], result['hashtags'],
+                                             fingerprints.get(platform)))
+                post_ids[platform] = cursor.lastrowid
+            record_hashtags(cursor, self.db.backend, added=new_drafts(cursor, [
+                (event_id, platform, result['hashtags']) for platform, result in results.items()
+            ]))
+            touch_tables(cursor, 'generated_posts')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return post_ids
+
+    def create_many(self, rows):
+        """Bulk-insert (event_id, platform, tone, content, hashtags, fingerprint) drafts in one transaction
+
+        mysql.connector rewrites the executemany() into one multi-row
+        INSERT; sqlite3 loops over the rows in C with one prepared statement.
+        """
+        if not rows:
+            return 0
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(INSERT_POST, rows)
+            record_hashtags(cursor, self.db.backend, added=new_drafts(cursor, [
+                (event_id, platform, hashtags) for event_id, platform, _, _, hashtags, _ in rows
+            ]))
+            touch_tables(cursor, 'generated_posts')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return len(rows)
+
+    def iter_all(self, conn, batch_size, event_id=None):
+        """Yield every post (optionally of one event) in id order, batch_size rows at a time"""
+        columns = ', '.join(column for field, column in POST_COLUMNS.items() if field != 'event_title')
+        where = "WHERE gp.event_id = %s" if event_id else ''
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(f"SELECT {columns} FROM generated_posts gp {where} ORDER BY gp.id",
+                           (event_id,) if event_id else None)
+            yield from _fetch_batches(cursor, batch_size)
+        finally:
+            cursor.close()
+
+    def iter_drafts(self, conn, batch_size):
+        """Yield every draft grouped by event, newest first, batch_size rows at a time
+
+        Used by compaction; rows carry what identifies a duplicate.
+        """
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT id, event_id, platform, tone, fingerprint, content, hashtags
+                FROM generated_posts WHERE status = 'draft'
+                ORDER BY event_id, id DESC
+            """)
+            yield from _fetch_batches(cursor, batch_size)
+        finally:
+            cursor.close()
+
+    def merge_drafts(self, conn, duplicates):
+        """Delete duplicate drafts in one transaction; returns the number deleted
+
+        duplicates is a {duplicate_id: kept_id} dict. Jobs that produced a
+        deleted draft are pointed at the kept one.
+        """
+        placeholders = ', '.join(['%s'] * len(duplicates))
+        cursor = conn.cursor()
+        try:
+            # One statement (a single scan of the jobs table) per batch
+            cursor.execute(f"""
+                UPDATE generation_jobs
+                SET post_id = CASE post_id {' '.join(['WHEN %s THEN %s'] * len(duplicates))} END
+                WHERE post_id IN ({placeholders})
+            """, [value for pair in duplicates.items() for value in pair] + list(duplicates))
+            posts = indexed_posts(cursor, f"gp.id IN ({placeholders})", list(duplicates))
+            cursor.execute(f"DELETE FROM generated_posts WHERE id IN ({placeholders})", list(duplicates))
+            deleted = cursor.rowcount
+            if deleted:
+                record_hashtags(cursor, self.db.backend, removed=posts)
+                touch_tables(cursor, 'generated_posts')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return deleted
+
+    def update_status(self, post_id, status):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        posts = indexed_posts(cursor, "gp.id = %s", (post_id,))
+        cursor.execute("UPDATE generated_posts SET status = %s WHERE id = %s", (status, post_id))
+        if cursor.rowcount:
+            # Approved and posted posts count as positive hashtag signal
+            record_hashtags(cursor, self.db.backend, removed=posts, added=[
+                (platform, event_type, status, hashtags) for platform, event_type, _, hashtags in posts
+            ])
+            touch_tables(cursor, 'generated_posts')
+        conn.commit()
+        cursor.close()
+
+    def delete(self, post_id):
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        posts = indexed_posts(cursor, "gp.id = %s", (post_id,))
+        cursor.execute("DELETE FROM generated_posts WHERE id = %s", (post_id,))
+        if cursor.rowcount:
+            record_hashtags(cursor, self.db.backend, removed=posts)
+            touch_tables(cursor, 'generated_posts')
+        conn.commit()
+        cursor.close()
+
+
+def _fetch_batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
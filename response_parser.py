@@ -0,0 +1,386 @@
+"""
+Incremental parser for CONTENT:/HASHTAGS: model responses
+Fed with text as it streams from the model, it reports content and
+hashtag text as soon as it is known to belong to a section. The finished
+post is then fitted to the platform: hashtags are normalized, deduped and
+capped, and the content is truncated at a sentence, word or grapheme
+boundary so it fits the platform's length limit.
+"""
+import json
+import re
+import unicodedata
+from functools import lru_cache
+
+MARKERS = {'CONTENT:': 'content', 'HASHTAGS:': 'hashtags'}
+
+MARKER_RE = re.compile('|'.join(re.escape(marker) for marker in MARKERS), re.IGNORECASE)
+
+# Tags stop at the first character that is not a letter, digit or
+# underscore, the same way the platforms link them
+HASHTAG_RE = re.compile(r'#(\w+)')
+
+# Published length limits, counted as the platform counts them, for the
+# content plus the hashtag line
+PLATFORM_LIMITS = {
+    'twitter': 280,
+    'linkedin': 1300,
+    'instagram': 2200,
+    'facebook': 5000,
+}
+
+MAX_HASHTAGS = {
+    'twitter': 3,
+    'linkedin': 5,
+    'instagram': 10,
+    'facebook': 5,
+}
+
+DEFAULT_MAX_HASHTAGS = 10
+
+HASHTAG_SEPARATOR = '\n\n'
+
+ELLIPSIS = '…'
+
+# Stripped before the ellipsis so a cut never ends in "word,…"
+TRAILING_PUNCTUATION = ' \t\r\n,;:-–—'
+
+# Sentence ends a truncated post may stop at without an ellipsis
+SENTENCE_END_RE = re.compile(r'[.!?…](?=\s)|\n')
+
+# Never give up more than this share of the budget to end on a sentence
+# or word boundary
+MIN_KEEP_RATIO = 0.5
+
+# Twitter counts code points up to U+10FF and some general punctuation
+# as 1 and everything else as 2; emoji sequences count as 2 and links as 23
+TWITTER_URL_RE = re.compile(r'https?://\S+')
+TWITTER_URL_WEIGHT = 23
+
+ZWJ = '\u200d'
+
+
+class StreamingResponseParser:
+    """Parse a completion chunk by chunk
+
+    feed() returns (section, text) deltas for display while the response
+    is still arriving; finish() returns the final content and hashtag list.
+    Every character is scanned once, however the text is chunked.
+    """
+
+    def __init__(self):
+        self._partial = ''       # current line, not yet terminated
+        self._emitted = 0        # chars of _partial already reported
+        self._section = None
+        self._content_lines = []
+        self._hashtags = []
+        self._raw = []
+
+    def feed(self, text):
+        deltas = []
+        self._raw.append(text)
+        buffer = self._partial + text
+
+        start = 0
+        end = buffer.find('\n')
+        while end != -1:
+            self._finish_line(buffer[start:end], deltas)
+            self._emitted = 0
+            start = end + 1
+            end = buffer.find('\n', start)
+        self._partial = buffer[start:]
+
+        # Report the unterminated line early unless it could still turn
+        # into a section marker
+        if self._section == 'content' and not self._may_be_marker(self._partial):
+            pending = self._partial[self._emitted:]
+            if pending:
+                deltas.append(('content', pending))
+                self._emitted = len(self._partial)
+
+        return deltas
+
+    def finish(self):
+        """Flush the last line and return (content, hashtags, raw_text)"""
+        if self._partial:
+            self._finish_line(self._partial)
+            self._partial = ''
+            self._emitted = 0
+        content = '\n'.join(self._content_lines).strip()
+        return content, self._hashtags, ''.join(self._raw)
+
+    def _finish_line(self, line, deltas=None):
+        # Every marker ends in a colon, so most lines skip the regex
+        match = MARKER_RE.search(line) if ':' in line else None
+        if match:
+            self._section = MARKERS[match.group().upper()]
+            return
+
+        stripped = line.strip()
+        if not stripped:
+            return
+
+        if self._section == 'content':
+            self._content_lines.append(stripped)
+            if deltas is not None:
+                deltas.append(('content', line[self._emitted:] + '\n'))
+        elif self._section == 'hashtags':
+            tags = ['#' + tag for tag in HASHTAG_RE.findall(stripped)]
+            self._hashtags.extend(tags)
+            if tags and deltas is not None:
+                deltas.append(('hashtags', ' '.join(tags) + ' '))
+
+    @staticmethod
+    def _may_be_marker(partial):
+        stripped = partial.strip()
+        if not stripped or MARKER_RE.search(stripped):
+            return True
+        upper = stripped.upper()
+        return any(marker.startswith(upper) for marker in MARKERS)
+
+
+def parse_response(text):
+    """Parse a complete response; returns (content, hashtags, raw_text)
+
+    Same result as feeding the whole text to StreamingResponseParser,
+    without building display deltas.
+    """
+    parser = StreamingResponseParser()
+    for line in text.split('\n'):
+        parser._finish_line(line)
+    content = '\n'.join(parser._content_lines).strip()
+    return content, parser._hashtags, text
+
+
+def parse_multi_response(text, platforms):
+    """Split a multi-platform response into {platform: (content, hashtags)}
+
+    Understands the JSON object the multi-platform prompt asks for (also
+    inside a code fence or surrounded by prose) and, failing that, plain
+    sections headed by the platform name. Platforms missing from the
+    response, or without usable content, are left out.
+    """
+    wanted = {platform.casefold(): platform for platform in platforms}
+    posts = {}
+
+    start, end = text.find('{'), text.rfind('}')
+    try:
+        data = json.loads(text[start:end + 1]) if start != -1 else None
+    except ValueError:
+        data = None
+
+    if isinstance(data, dict):
+        for key, entry in data.items():
+            platform = wanted.get(str(key).strip().casefold())
+            if platform is None or not isinstance(entry, dict):
+                continue
+            content = entry.get('content')
+            hashtags = entry.get('hashtags') or ''
+            if not isinstance(content, str) or not content.strip():
+                continue
+            if isinstance(hashtags, list):
+                hashtags = ' '.join(str(tag) for tag in hashtags)
+            elif not isinstance(hashtags, str):
+                continue
+            posts[platform] = (content.strip(), hashtags)
+        return posts
+
+    section = None
+    lines = {}
+    for line in text.split('\n'):
+        heading = line.strip().strip('#*=-_: ').casefold()
+        if heading in wanted:
+            section = wanted[heading]
+            lines[section] = []
+        elif section is not None:
+            lines[section].append(line)
+    for platform, section_lines in lines.items():
+        content, hashtags, raw = parse_response('\n'.join(section_lines))
+        if content:
+            posts[platform] = (content, hashtags)
+    return posts
+
+
+def normalize_hashtags(hashtags, platform):
+    """Clean, dedupe (case-insensitively) and cap a list or string of tags"""
+    if not isinstance(hashtags, str):
+        hashtags = ' '.join(hashtags)
+    limit = MAX_HASHTAGS.get(platform, DEFAULT_MAX_HASHTAGS)
+
+    tags = []
+    seen = set()
+    for tag in HASHTAG_RE.findall(hashtags):
+        key = tag.casefold()
+        # All-digit and underscore-only tags are not linked by the platforms
+        if key in seen or not tag.strip('_') or tag.isdigit():
+            continue
+        seen.add(key)
+        tags.append('#' + tag)
+        if len(tags) == limit:
+            break
+    return tags
+
+
+def _char_class(ranges):
+    return ''.join(
+        re.escape(chr(low)) if low == high else f'{re.escape(chr(low))}-{re.escape(chr(high))}'
+        for low, high in ranges
+    )
+
+
+@lru_cache(maxsize=None)
+def _cluster_re():
+    """Regex matching the grapheme clusters longer than one code point
+
+    Built on first use: scanning the Unicode tables for combining marks
+    takes a few tens of milliseconds, so only processes that see
+    non-ASCII text pay for it.
+    """
+    bmp, astral = [], []
+    for code in range(0x20000):
+        if unicodedata.category(chr(code)) in ('Mn', 'Me', 'Mc'):
+            ranges = bmp if code < 0x10000 else astral
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+    # Variation selectors, emoji skin tones and tag characters; the
+    # keycap mark is already a combining mark
+    bmp.append([0xfe00, 0xfe0f])
+    astral += [[0x1f3fb, 0x1f3ff], [0xe0020, 0xe007f], [0xe0100, 0xe01ef]]
+    regional = _char_class([(0x1f1e6, 0x1f1ff)])
+    # The BMP class compiles to a bitmap; the astral one is a range list,
+    # so it is only tried for astral characters
+    extend = rf'[{_char_class(bmp)}]|(?=[\U00010000-\U0010ffff])[{_char_class(astral)}]|{ZWJ}.?'
+    return re.compile(
+        rf'(?:\r\n|[{regional}]{{2}}|.)(?:{extend})+|\r\n|[{regional}]{{2}}',
+        re.DOTALL
+    )
+
+
+def graphemes(text):
+    """Split text into user-perceived characters
+
+    Covers combining marks, emoji modifiers, variation selectors, ZWJ
+    sequences, keycaps, tag sequences and flags, which is what model
+    output contains in practice.
+    """
+    if text.isascii() and '\r' not in text:
+        return list(text)
+    clusters = []
+    position = 0
+    for match in _cluster_re().finditer(text):
+        start, end = match.span()
+        clusters.extend(text[position:start])
+        clusters.append(match.group())
+        position = end
+    clusters.extend(text[position:])
+    return clusters
+
+
+def _twitter_weight(cluster):
+    if len(cluster) == 1:
+        if cluster <= '\u10ff' or '\u2000' <= cluster <= '\u200d' or '\u2010' <= cluster <= '\u201f' \
+                or '\u2032' <= cluster <= '\u2037':
+            return 1
+        return 2
+    if ZWJ in cluster or '\ufe0f' in cluster or cluster[0] >= '\U0001f000':
+        return 2
+    return sum(_twitter_weight(char) for char in cluster)
+
+
+def _weights(text, platform):
+    """Per-grapheme (cluster, weight) pairs as the platform counts them"""
+    if platform != 'twitter':
+        return [(cluster, 1) for cluster in graphemes(text)]
+
+    weights = []
+    position = 0
+    for match in TWITTER_URL_RE.finditer(text):
+        weights.extend((c, _twitter_weight(c)) for c in graphemes(text[position:match.start()]))
+        # A link is one unit: it is kept whole or dropped
+        weights.append((match.group(), TWITTER_URL_WEIGHT))
+        position = match.end()
+    weights.extend((c, _twitter_weight(c)) for c in graphemes(text[position:]))
+    return weights
+
+
+def text_length(text, platform):
+    """Length of text as the platform counts it"""
+    if platform != 'twitter':
+        return len(text) if text.isascii() and '\r' not in text else len(graphemes(text))
+    if 'http' not in text:
+        return len(text) if text.isascii() else sum(map(_twitter_weight, graphemes(text)))
+    return sum(weight for _, weight in _weights(text, platform))
+
+
+def truncate(text, budget, platform):
+    """Shorten text to at most budget units, ending cleanly
+
+    Prefers the last sentence end, then the last word boundary (adding an
+    ellipsis), and only cuts mid-word when neither keeps at least half of
+    the budget. Never splits a grapheme, emoji sequence or link.
+    """
+    if budget <= 0:
+        return ''
+    # No platform counts more than two units per code point (links aside),
+    # so short text skips grapheme segmentation altogether
+    if len(text) * (2 if platform == 'twitter' else 1) <= budget and 'http' not in text:
+        return text
+
+    ellipsis_weight = text_length(ELLIPSIS, platform)
+    used = 0
+    kept = []
+    cut = None
+    for cluster, weight in _weights(text, platform):
+        if cut is None and used + weight > budget - ellipsis_weight:
+            cut = len(kept)
+        used += weight
+        if used > budget:
+            break
+        kept.append(cluster)
+    else:
+        return text
+
+    if budget < ellipsis_weight:
+        return ''
+    del kept[cut:]
+    head = ''.join(kept)
+    minimum = len(head) * MIN_KEEP_RATIO
+
+    # Look one character past the cut so a sentence ending exactly at
+    # the boundary is still found
+    sentence_end = -1
+    for match in SENTENCE_END_RE.finditer(text, 0, len(head) + 1):
+        if match.end() <= len(head):
+            sentence_end = match.end()
+    if sentence_end >= minimum and sentence_end > 0:
+        shortened = head[:sentence_end].rstrip()
+        if shortened:
+            return shortened
+
+    word_end = max(head.rfind(' '), head.rfind('\n'), head.rfind('\t'))
+    if word_end >= minimum and word_end > 0:
+        head = head[:word_end]
+    return head.rstrip(TRAILING_PUNCTUATION) + ELLIPSIS
+
+
+def enforce_platform_limits(content, hashtags, platform):
+    """Fit a post to its platform; returns (content, hashtags_str)
+
+    Hashtags are normalized first and share the length budget with the
+    content, as they are published together. Tags are dropped from the
+    end rather than letting them take more than half of the budget.
+    """
+    tags = normalize_hashtags(hashtags, platform)
+    limit = PLATFORM_LIMITS.get(platform)
+    if limit is None:
+        return content, ' '.join(tags)
+
+    separator = text_length(HASHTAG_SEPARATOR, platform)
+    hashtags_str = ' '.join(tags)
+    while tags and text_length(hashtags_str, platform) + separator > limit * MIN_KEEP_RATIO:
+        tags.pop()
+        hashtags_str = ' '.join(tags)
+
+    budget = limit - (text_length(hashtags_str, platform) + separator if tags else 0)
+    return truncate(content, budget, platform), hashtags_str
@@ -0,0 +1,232 @@
+"""
+Full-text search over events and generated posts
+MySQL answers from FULLTEXT indexes (MATCH ... AGAINST in boolean mode),
+and the embedded SQLite backend from FTS5 tables kept in sync by
+triggers. Either way the index is updated by the database itself on
+every insert, update and delete (migration 7), including bulk imports
+and writes from other processes. Hits are ranked by relevance, paged with
+an offset cursor, and come with HTML snippets that <mark> the matched
+terms.
+
+Relevance is not comparable between the two kinds (they are ranked by
+separate queries over different columns), so each kind's scores are
+divided by its best hit's before the two lists are interleaved. The best
+event and the best post both score 1.0, and equal scores alternate
+between the kinds by rank. The raw value is returned as `relevance`.
+"""
+import html
+import re
+
+KINDS = ('events', 'posts')
+
+MAX_TERMS = 8
+SNIPPET_LENGTH = 200
+
+TERM_RE = re.compile(r'\w+')
+
+# InnoDB skips these words and words shorter than innodb_ft_min_token_size
+# (3) when indexing, so a required (+) term among them would match nothing
+INNODB_MIN_TOKEN_SIZE = 3
+INNODB_STOPWORDS = frozenset((
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how', 'i',
+    'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'when',
+    'where', 'who', 'will', 'with', 'und', 'www'
+))
+
+SEARCH_SQL = {
+    'mysql': {
+        'events': """
+            SELECT id, title, date, description,
+                   MATCH(title, description) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM events
+            WHERE MATCH(title, description) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY score DESC, id DESC
+            LIMIT %s
+        """,
+        'posts': """
+            SELECT gp.id, gp.event_id, e.title AS event_title, gp.platform, gp.tone, gp.status,
+                   gp.content, gp.hashtags, gp.created_at,
+                   MATCH(gp.content, gp.hashtags) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM generated_posts gp
+            JOIN events e ON gp.event_id = e.id
+            WHERE MATCH(gp.content, gp.hashtags) AGAINST (%s IN BOOLEAN MODE) {filters}
+            ORDER BY score DESC, gp.id DESC
+            LIMIT %s
+        """,
+        'match_params': 2,
+    },
+    'sqlite': {
+        # bm25() is lower for better matches; titles and hashtags weigh more
+        'events': """
+            SELECT e.id, e.title, e.date, e.description, -bm25(events_fts, 4.0, 1.0) AS score
+            FROM events_fts
+            JOIN events e ON e.id = events_fts.rowid
+            WHERE events_fts MATCH %s
+            ORDER BY score DESC, e.id DESC
+            LIMIT %s
+        """,
+        'posts': """
+            SELECT gp.id, gp.event_id, e.title AS event_title, gp.platform, gp.tone, gp.status,
+                   gp.content, gp.hashtags, gp.created_at, -bm25(generated_posts_fts, 1.0, 2.0) AS score
+            FROM generated_posts_fts
+            JOIN generated_posts gp ON gp.id = generated_posts_fts.rowid
+            JOIN events e ON gp.event_id = e.id
+            WHERE generated_posts_fts MATCH %s {filters}
+            ORDER BY score DESC, gp.id DESC
+            LIMIT %s
+        """,
+        'match_params': 1,
+    },
+}
+
+
+def parse_terms(query):
+    """Lower-cased search words of a query string, without duplicates"""
+    return list(dict.fromkeys(term.lower() for term in TERM_RE.findall(query or '')))[:MAX_TERMS]
+
+
+def match_query(terms, backend):
+    """Full-text query requiring every term, each as a word prefix
+
+    Returns None when no term can match (MySQL drops short words and
+    stopwords from its index).
+    """
+    if backend == 'mysql':
+        terms = [term for term in terms if len(term) >= INNODB_MIN_TOKEN_SIZE and term not in INNODB_STOPWORDS]
+        return ' '.join(f'+{term}*' for term in terms) or None
+    # Quoted, so words like NOT or NEAR are not read as FTS5 operators
+    return ' '.join(f'"{term}"*' for term in terms) or None
+
+
+def highlighter(terms):
+    """Regex matching words that start with any of the terms"""
+    alternatives = '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(rf'\b(?:{alternatives})\w*', re.IGNORECASE)
+
+
+def snippet(text, pattern, length=SNIPPET_LENGTH):
+    """HTML excerpt of text around the first match, with matches in <mark>
+
+    Texts shorter than `length` are returned whole; everything outside
+    the <mark> tags is escaped.
+    """
+    if not text:
+        return ''
+    start, end = 0, len(text)
+    if len(text) > length:
+        first = pattern.search(text)
+        start = max(0, (first.start() if first else 0) - length // 4)
+        if start:
+            # Begin at a word boundary
+            space = text.find(' ', start)
+            start = space + 1 if 0 <= space < start + 20 else start
+        end = min(len(text), start + length)
+        if end < len(text):
+            space = text.rfind(' ', start, end)
+            end = space if space > start else end
+
+    parts = []
+    position = start
+    for match in pattern.finditer(text, start, end):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group())}</mark>')
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    return ('…' if start else '') + ''.join(parts) + ('…' if end < len(text) else '')
+
+
+def normalize_scores(hits):
+    """Scale one kind's hits (best first) so the best scores 1.0
+
+    The best hit is on every page's query, so a hit keeps its score
+    from page to page. The raw score is kept as `relevance`, and the
+    position among the kind's hits as `rank`.
+    """
+    top = float(hits[0]['score']) if hits else 0.0
+    for rank, hit in enumerate(hits):
+        hit['rank'] = rank
+        hit['relevance'] = float(hit['score'])
+        hit['score'] = hit['relevance'] / top if top > 0 else 1.0
+    return hits
+
+
+class SearchRepository:
+    """Relevance-ranked full-text queries over events and posts"""
+
+    def __init__(self, db):
+        self.db = db
+        self.backend = db.backend
+        self.sql = SEARCH_SQL[db.backend]
+
+    def search(self, terms, kinds=KINDS, offset=0, limit=20, event_id=None, status=None):
+        """One page of hits, best first; returns (results, has_more)
+
+        The event_id and status filters apply to posts, so they leave
+        events out of the results.
+        """
+        query = match_query(terms, self.backend)
+        if query is None:
+            return [], False
+
+        # Each kind is ranked on its own; the top offset + limit of the
+        # merged list are among the top offset + limit of each kind
+        wanted = offset + limit + 1
+        hits = []
+        if 'events' in kinds and not (event_id or status):
+            hits.extend(normalize_scores(self._events(query, wanted)))
+        if 'posts' in kinds:
+            hits.extend(normalize_scores(self._posts(query, wanted, event_id, status)))
+        hits.sort(key=lambda hit: (-hit['score'], hit['rank'], hit['type']))
+
+        pattern = highlighter(terms)
+        page = [self._present(hit, pattern) for hit in hits[offset:offset + limit]]
+        return page, len(hits) > offset + limit
+
+    def _events(self, query, limit):
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute(self.sql['events'], [query] * self.sql['match_params'] + [limit])
+        rows = cursor.fetchall()
+        cursor.close()
+        for row in rows:
+            row['type'] = 'event'
+        return rows
+
+    def _posts(self, query, limit, event_id, status):
+        filters = []
+        params = [query] * self.sql['match_params']
+        if event_id:
+            filters.append("AND gp.event_id = %s")
+            params.append(event_id)
+        if status:
+            filters.append("AND gp.status = %s")
+            params.append(status)
+        cursor = self.db.get_connection().cursor(dictionary=True)
+        cursor.execute(self.sql['posts'].format(filters=' '.join(filters)), params + [limit])
+        rows = cursor.fetchall()
+        cursor.close()
+        for row in rows:
+            row['type'] = 'post'
+        return rows
+
+    @staticmethod
+    def _present(hit, pattern):
+        """API shape of a hit: plain fields plus `highlights` HTML snippets"""
+        result = {
+            'type': hit['type'], 'id': hit['id'],
+            'score': round(hit['score'], 4), 'relevance': hit['relevance']
+        }
+        if hit['type'] == 'event':
+            result.update(title=hit['title'], date=hit['date'], highlights={
+                'title': snippet(hit['title'], pattern),
+                'description': snippet(hit['description'], pattern)
+            })
+        else:
+            result.update(
+                event_id=hit['event_id'], event_title=hit['event_title'], platform=hit['platform'],
+                tone=hit['tone'], status=hit['status'], created_at=hit['created_at'],
+                highlights={
+                    'content': snippet(hit['content'], pattern),
+                    'hashtags': snippet(hit['hashtags'], pattern)
+                }
+            )
+        return result
@@ -0,0 +1,192 @@
+"""
+JSON encoding and compression of API responses
+FastJSONProvider replaces Flask's encoder. With orjson installed, rows are
+encoded straight to UTF-8 bytes and date/datetime columns are written as
+ISO 8601 by the encoder itself, so handlers return database rows as they
+come from the cursor. Without orjson the stdlib encoder produces the same
+output. compress_response() gzip- or brotli-encodes JSON, CSV and NDJSON
+bodies for clients that accept it (brotli needs the brotli package), and
+ndjson_chunks() writes row batches one line per row for streamed
+listings.
+"""
+import gzip
+import json
+import zlib
+from datetime import date
+from decimal import Decimal
+
+from flask import request
+from flask.json.provider import JSONProvider
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    'application/json', NDJSON_MIMETYPE, 'text/csv', 'text/plain', 'text/html',
+    'text/css', 'text/javascript', 'application/javascript'
+))
+
+# Preferred first when the client rates them equally
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def _default(value):
+    """Types neither encoder handles on its own"""
+    if isinstance(value, date):
+        # datetime is a subclass of date
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # As Flask's default provider wrote them: exact, as a string
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+if orjson:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Compact JSON of obj as UTF-8 bytes"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps(obj):
+        """Compact JSON of obj as UTF-8 bytes"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    loads = json.loads
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps()/loads() above
+
+    Keys keep their insertion order (rows keep their column order), and
+    dates are 'YYYY-MM-DD' and datetimes ISO 8601 instead of Flask's
+    HTTP-date strings.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for indent, sort_keys, ... get the stdlib encoder
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        """jsonify() without the round trip through str"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def ndjson_chunks(batches):
+    """Encode each batch of rows as one chunk of newline-delimited JSON"""
+    for rows in batches:
+        yield b''.join([dumps(row) + b'\n' for row in rows])
+
+
+def wants_ndjson():
+    """True when the current request asks for a streamed NDJSON listing"""
+    return request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def preferred_encoding():
+    """Best Content-Encoding the client accepts, or None"""
+    if not Config.RESPONSE_COMPRESSION:
+        return None
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    return encoding if encoding in ENCODINGS else None
+
+
+def compress(data, encoding):
+    """data (bytes) encoded with 'br' or 'gzip'"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+def _stream_compressor(encoding):
+    """(compress chunk and flush it, finish) functions for a streamed body"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=Config.RESPONSE_BROTLI_QUALITY)
+        return lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish
+    # wbits 31: zlib stream with a gzip header and trailer
+    compressor = zlib.compressobj(Config.RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk
+
+    Every chunk is flushed, so a client reading NDJSON gets each batch
+    as soon as it is produced instead of when the compressor's buffer
+    fills up.
+    """
+    step, finish = _stream_compressor(encoding)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield step(chunk)
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    """after_request hook: compress the body if the client accepts it
+
+    Skips non-2xx and partial responses, bodies already encoded, files
+    sent with direct passthrough, server-sent events and buffered bodies
+    under RESPONSE_COMPRESSION_MIN_BYTES. Streamed bodies (exports,
+    NDJSON listings) are compressed as they are written.
+    """
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or not 200 <= response.status_code < 300 or response.status_code in (204, 206)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+
+    # Caches must keep the encoded and plain bodies apart
+    response.vary.add('Accept-Encoding')
+    encoding = preferred_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < Config.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+        response.set_data(compress(data, encoding))
+
+    response.content_encoding = encoding
+    # The encoded body is no longer byte-for-byte what a strong ETag names
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
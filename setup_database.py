@@ -1,38 +1,44 @@
 """
 Database setup script
-This script helps initialize the database and tables
+Creates the database and applies pending schema migrations. Run it once
+per deployment (and after upgrading); the app itself never changes the
+schema on startup.
 """
 import os
+import sys
 from database import Database
 from config import Config
 
 if __name__ == '__main__':
     print("Setting up database...")
-    print(f"Connecting to: {Config.DB_HOST}/{Config.DB_NAME}")
-    print(f"User: {Config.DB_USER}")
-    
+    if Config.DB_BACKEND.lower() == 'sqlite':
+        print(f"SQLite database: {os.path.abspath(Config.SQLITE_PATH)}")
+    else:
+        print(f"Connecting to: {Config.DB_HOST}/{Config.DB_NAME}")
+        print(f"User: {Config.DB_USER}")
+
     # Check if .env file exists
     if not os.path.exists('.env'):
         print("\n⚠ Warning: .env file not found!")
         print("Please copy env_template.txt to .env and configure your database settings.")
         print("\nYou can still proceed, but make sure MySQL is running and accessible.")
-    
+
     db = Database()
-    
-    if db.connection and db.connection.is_connected():
+
+    if db.initialize_database():
         print("\n✓ Database connection successful!")
         print("✓ Tables created/verified successfully!")
         print("\nYou can now run the application with: python app.py")
-    else:
-        print("\n✗ Failed to connect to database.")
-        print("\nTroubleshooting steps:")
-        print("1. Make sure MySQL server is running")
-        print("2. Check your .env file configuration:")
-        print("   - DB_HOST (default: localhost)")
-        print("   - DB_USER (default: root)")
-        print("   - DB_PASSWORD (your MySQL password)")
-        print("   - DB_NAME (default: social_media_generator)")
-        print("3. Verify MySQL is accessible on the configured host and port")
-    
-    db.close()
+        print("or in production with: gunicorn -c gunicorn.conf.py wsgi:app")
+        sys.exit(0)
 
+    print("\n✗ Failed to set up the database.")
+    print("\nTroubleshooting steps:")
+    print("1. Make sure MySQL server is running")
+    print("2. Check your .env file configuration:")
+    print("   - DB_HOST (default: localhost)")
+    print("   - DB_USER (default: root)")
+    print("   - DB_PASSWORD (your MySQL password)")
+    print("   - DB_NAME (default: social_media_generator)")
+    print("3. Verify MySQL is accessible on the configured host and port")
+    sys.exit(1)
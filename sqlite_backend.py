@@ -0,0 +1,152 @@
+"""
+Embedded SQLite storage backend
+Wraps sqlite3 connections in the small part of the mysql.connector API the
+app uses (dictionary cursors, %s placeholders, lastrowid, ping), so the
+repositories, job queue and connection pool run unchanged on either
+backend. The database runs in WAL mode: readers never block the writer
+and commits only fsync at checkpoints.
+"""
+import os
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+
+# sqlite3 keeps this many compiled statements per connection, keyed by SQL
+# text. Repeated queries have identical text, so they skip SQLite's parser
+# and planner and only rebind parameters.
+STATEMENT_CACHE_SIZE = 512
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+def _convert_date(value):
+    try:
+        return date.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+def _convert_timestamp(value):
+    try:
+        return datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+# Columns declared DATE / TIMESTAMP / DATETIME come back as date and
+# datetime objects, like they do from MySQL
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('TIMESTAMP', _convert_timestamp)
+sqlite3.register_converter('DATETIME', _convert_timestamp)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def qmark(operation):
+    """Rewrite mysql.connector %s placeholders as sqlite3 ? placeholders"""
+    return operation.replace('%s', '?')
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """sqlite3 cursor accepting %s placeholders"""
+
+    __slots__ = ('_cursor',)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, operation, params=None):
+        # Like mysql.connector, only statements with parameters are
+        # rewritten, so a literal '%s' (e.g. in strftime) survives
+        if params is None:
+            self._cursor.execute(operation)
+        else:
+            self._cursor.execute(qmark(operation), params)
+        return None
+
+    def executemany(self, operation, seq_params):
+        self._cursor.executemany(qmark(operation), seq_params)
+        return None
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class SQLiteConnection:
+    """sqlite3 connection with the mysql.connector methods the app calls"""
+
+    __slots__ = ('_conn',)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary=False):
+        cursor = self._conn.cursor()
+        if dictionary:
+            cursor.row_factory = _dict_row
+        return SQLiteCursor(cursor)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        """Nothing to reconnect to; fails only if the connection was closed"""
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(path, timeout=5):
+    """Open a WAL-mode connection to the database file at `path`"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # check_same_thread is off because the pool hands a connection to one
+    # thread at a time, but not always the thread that opened it
+    conn = sqlite3.connect(
+        path,
+        timeout=timeout,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE
+    )
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return SQLiteConnection(conn)
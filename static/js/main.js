@@ -4,8 +4,10 @@
  */
 
 // Global variables
+const PAGE_SIZE = 20;
 let currentPostId = null;
 let currentEventId = null;
+let eventsCursor = null;
 
 // ==================== Theme Management ====================
 
@@ -66,11 +68,8 @@ function switchTab(tab, button) {
         button.classList.add('active');
     }
 
-    if (tab === 'generate') {
-        loadEventsForSelect();
-    } else if (tab === 'posts') {
-        loadEventsForFilter();
-        loadPosts();
+    if (tab === 'posts') {
+        showPosts();
     }
 }
 
@@ -93,41 +92,379 @@ function showAlert(message, type = 'success') {
     setTimeout(() => alert.remove(), 5000);
 }
 
+// ==================== Data Store ====================
+
+/**
+ * Client-side cache of GET responses
+ * Each response is tagged with the tables it reads ('events', 'posts').
+ * Concurrent requests for the same URL share one fetch, and responses are
+ * reused until a mutation invalidates one of their tags.
+ */
+const store = {
+    cache: new Map(),      // url -> { data, tags }
+    inflight: new Map(),   // url -> { promise, tags }
+    versions: new Map(),   // tag -> number of invalidations so far
+    listeners: new Map()   // tag -> [callback]
+};
+
+/**
+ * Fetch a JSON API resource through the store
+ * @param {string} url - GET URL
+ * @param {string[]} tags - Tables the response depends on
+ * @returns {Promise<Object>} Parsed response body
+ */
+function fetchJSON(url, tags) {
+    const cached = store.cache.get(url);
+    if (cached) {
+        return Promise.resolve(cached.data);
+    }
+    const pending = store.inflight.get(url);
+    if (pending) {
+        return pending.promise;
+    }
+
+    // A response that was in flight while its data changed is not cached
+    const versions = tags.map(tag => store.versions.get(tag) || 0);
+    const promise = fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            const fresh = tags.every((tag, i) => (store.versions.get(tag) || 0) === versions[i]);
+            if (data.success && fresh) {
+                store.cache.set(url, { data, tags });
+            }
+            return data;
+        })
+        .finally(() => {
+            if (store.inflight.get(url)?.promise === promise) {
+                store.inflight.delete(url);
+            }
+        });
+    store.inflight.set(url, { promise, tags });
+    return promise;
+}
+
+/**
+ * Send a POST/PUT/DELETE request with a JSON body
+ * @param {string} url - API URL
+ * @param {string} method - HTTP method
+ * @param {Object} body - Request body (optional)
+ * @returns {Promise<Object>} Parsed response body
+ */
+async function sendJSON(url, method, body) {
+    const options = { method };
+    if (body !== undefined) {
+        options.headers = { 'Content-Type': 'application/json' };
+        options.body = JSON.stringify(body);
+    }
+    const response = await fetch(url, options);
+    return response.json();
+}
+
+/**
+ * Drop cached responses that depend on any of the tags
+ * Views that already applied the change themselves call this directly;
+ * everything else goes through invalidate().
+ * @param {...string} tags - Changed tables
+ */
+function forget(...tags) {
+    tags.forEach(tag => store.versions.set(tag, (store.versions.get(tag) || 0) + 1));
+    for (const map of [store.cache, store.inflight]) {
+        map.forEach((entry, url) => {
+            if (entry.tags.some(tag => tags.includes(tag))) {
+                map.delete(url);
+            }
+        });
+    }
+}
+
+/**
+ * Drop cached responses for the tags and tell the views showing them
+ * @param {...string} tags - Changed tables
+ */
+function invalidate(...tags) {
+    forget(...tags);
+    const called = new Set();
+    tags.forEach(tag => (store.listeners.get(tag) || []).forEach(callback => {
+        if (!called.has(callback)) {
+            called.add(callback);
+            callback();
+        }
+    }));
+}
+
+/**
+ * Run callback whenever a tag is invalidated
+ * @param {string} tag - Table name
+ * @param {Function} callback - Refresh function of a view
+ */
+function subscribe(tag, callback) {
+    if (!store.listeners.has(tag)) {
+        store.listeners.set(tag, []);
+    }
+    store.listeners.get(tag).push(callback);
+}
+
+// ==================== Virtual List ====================
+
+/**
+ * Windowed list: only the rows near the viewport are in the DOM
+ * Rows are measured once rendered; rows not seen yet use an estimated
+ * height. The page itself scrolls, and the container is sized to the
+ * whole list so the scrollbar stays accurate.
+ */
+class VirtualList {
+    /**
+     * @param {HTMLElement} container - Element the rows are rendered into
+     * @param {Function} renderItem - Returns the HTML of one item
+     * @param {Function} keyOf - Returns the unique key of an item
+     * @param {Object} options - estimatedHeight, overscan (rows) and onNearEnd callback
+     */
+    constructor(container, renderItem, keyOf, options = {}) {
+        this.container = container;
+        this.renderItem = renderItem;
+        this.keyOf = keyOf;
+        this.estimatedHeight = options.estimatedHeight || 260;
+        this.overscan = options.overscan || 4;
+        this.onNearEnd = options.onNearEnd || null;
+        this.items = [];
+        this.heights = new Map();   // key -> measured row height
+        this.offsets = [0];         // offsets[i] is the top of row i, offsets[n] the total height
+        this.rows = new Map();      // key -> mounted row element
+        this.frame = null;
+
+        container.classList.add('virtual-list');
+        const schedule = () => this.schedule();
+        window.addEventListener('scroll', schedule, { passive: true });
+        window.addEventListener('resize', () => {
+            // Widths changed, so every measured height may be stale
+            this.heights.clear();
+            this.layout();
+        });
+    }
+
+    /**
+     * Replace all items
+     * @param {Object[]} items - New items
+     */
+    setItems(items) {
+        this.items = items;
+        this.rows.forEach(row => row.remove());
+        this.rows.clear();
+        this.layout();
+    }
+
+    /**
+     * Add items at the end
+     * @param {Object[]} items - Items to add
+     */
+    append(items) {
+        this.items.push(...items);
+        this.layout();
+    }
+
+    /**
+     * Find an item by key
+     * @param {*} key - Item key
+     * @returns {Object|undefined} The item
+     */
+    find(key) {
+        return this.items.find(item => this.keyOf(item) === key);
+    }
+
+    /**
+     * Re-render one item in place after it changed
+     * @param {*} key - Item key
+     */
+    refresh(key) {
+        const row = this.rows.get(key);
+        const item = this.find(key);
+        if (row && item) {
+            row.innerHTML = this.renderItem(item);
+            this.heights.delete(key);
+            this.layout();
+        }
+    }
+
+    /**
+     * Remove an item
+     * @param {*} key - Item key
+     * @returns {{item: Object, index: number}|null} What was removed, to undo with insert()
+     */
+    remove(key) {
+        const index = this.items.findIndex(item => this.keyOf(item) === key);
+        if (index === -1) {
+            return null;
+        }
+        const [item] = this.items.splice(index, 1);
+        this.rows.get(key)?.remove();
+        this.rows.delete(key);
+        this.layout();
+        return { item, index };
+    }
+
+    /**
+     * Insert an item at a position
+     * @param {number} index - Position
+     * @param {Object} item - Item
+     */
+    insert(index, item) {
+        this.items.splice(index, 0, item);
+        this.layout();
+    }
+
+    /**
+     * Recompute row offsets and the container height, then re-render
+     */
+    layout() {
+        const offsets = new Array(this.items.length + 1);
+        offsets[0] = 0;
+        this.items.forEach((item, i) => {
+            offsets[i + 1] = offsets[i] + (this.heights.get(this.keyOf(item)) ?? this.estimatedHeight);
+        });
+        this.offsets = offsets;
+        this.container.style.height = `${offsets[offsets.length - 1]}px`;
+        this.schedule();
+    }
+
+    /**
+     * Render on the next animation frame (at most once per frame)
+     */
+    schedule() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.render();
+            });
+        }
+    }
+
+    /**
+     * Index of the row at vertical position y (relative to the container)
+     * @param {number} y - Position in pixels
+     * @returns {number} Row index
+     */
+    indexAt(y) {
+        let low = 0;
+        let high = this.items.length - 1;
+        while (low < high) {
+            const middle = (low + high + 1) >> 1;
+            if (this.offsets[middle] <= y) {
+                low = middle;
+            } else {
+                high = middle - 1;
+            }
+        }
+        return Math.max(low, 0);
+    }
+
+    /**
+     * Mount the rows in view, unmount the rest and measure new rows
+     */
+    render() {
+        // Nothing to measure while the tab is hidden
+        if (!this.container.offsetParent || this.items.length === 0) {
+            return;
+        }
+        const top = -this.container.getBoundingClientRect().top;
+        const first = Math.max(0, this.indexAt(top) - this.overscan);
+        const last = Math.min(this.items.length, this.indexAt(top + window.innerHeight) + 1 + this.overscan);
+
+        const visible = new Set();
+        for (let i = first; i < last; i++) {
+            const key = this.keyOf(this.items[i]);
+            visible.add(key);
+            let row = this.rows.get(key);
+            if (!row) {
+                row = document.createElement('div');
+                row.className = 'virtual-row';
+                row.innerHTML = this.renderItem(this.items[i]);
+                this.container.appendChild(row);
+                this.rows.set(key, row);
+            }
+            row.style.transform = `translateY(${this.offsets[i]}px)`;
+        }
+        this.rows.forEach((row, key) => {
+            if (!visible.has(key)) {
+                row.remove();
+                this.rows.delete(key);
+            }
+        });
+
+        // Lay out again if a row turned out taller or shorter than assumed
+        let changed = false;
+        for (let i = first; i < last; i++) {
+            const key = this.keyOf(this.items[i]);
+            const height = this.rows.get(key).offsetHeight;
+            if (this.heights.get(key) !== height) {
+                this.heights.set(key, height);
+                changed = true;
+            }
+        }
+        if (changed) {
+            this.layout();
+        } else if (this.onNearEnd && last === this.items.length) {
+            this.onNearEnd();
+        }
+    }
+}
+
 // ==================== Event Management ====================
 
 /**
- * Load all events and display them
+ * Render a single event card
+ * @param {Object} event - Event row from /api/events
+ * @returns {string} Card HTML
  */
-async function loadEvents() {
+function renderEventCard(event) {
+    return `
+        <div class="event-card" data-event-id="${event.id}">
+            <div class="d-flex justify-content-between align-items-start">
+                <div>
+                    <h5>${event.title}</h5>
+                    <p class="mb-1"><i class="fas fa-calendar icon"></i>${event.date}</p>
+                    ${event.location ? `<p class="mb-1"><i class="fas fa-map-marker-alt icon"></i>${event.location}</p>` : ''}
+                    ${event.type ? `<p class="mb-1"><i class="fas fa-tag icon"></i>${event.type}</p>` : ''}
+                    ${event.description ? `<p class="mt-2">${event.description}</p>` : ''}
+                </div>
+                <div>
+                    <button class="btn btn-danger btn-sm" onclick="deleteEvent(${event.id})">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+/**
+ * Load a page of events and display them
+ * @param {boolean} append - Append the next page instead of starting over
+ */
+async function loadEvents(append = false) {
     try {
-        const response = await fetch('/api/events');
-        const data = await response.json();
+        const params = new URLSearchParams({ limit: PAGE_SIZE });
+        if (append && eventsCursor) {
+            params.set('cursor', eventsCursor);
+        }
+
+        const data = await fetchJSON(`/api/events?${params}`, ['events']);
         
         if (data.success) {
             const eventsList = document.getElementById('eventsList');
-            if (data.events.length === 0) {
+            eventsCursor = data.next_cursor;
+            document.getElementById('eventsLoadMore').style.display = eventsCursor ? 'block' : 'none';
+
+            if (!append && data.events.length === 0) {
                 eventsList.innerHTML = '<p class="text-white-50">No events yet. Create your first event!</p>';
                 return;
             }
             
-            eventsList.innerHTML = data.events.map(event => `
-                <div class="event-card">
-                    <div class="d-flex justify-content-between align-items-start">
-                        <div>
-                            <h5>${event.title}</h5>
-                            <p class="mb-1"><i class="fas fa-calendar icon"></i>${event.date}</p>
-                            ${event.location ? `<p class="mb-1"><i class="fas fa-map-marker-alt icon"></i>${event.location}</p>` : ''}
-                            ${event.type ? `<p class="mb-1"><i class="fas fa-tag icon"></i>${event.type}</p>` : ''}
-                            ${event.description ? `<p class="mt-2">${event.description}</p>` : ''}
-                        </div>
-                        <div>
-                            <button class="btn btn-danger btn-sm" onclick="deleteEvent(${event.id})">
-                                <i class="fas fa-trash"></i>
-                            </button>
-                        </div>
-                    </div>
-                </div>
-            `).join('');
+            const html = data.events.map(renderEventCard).join('');
+            if (append) {
+                eventsList.insertAdjacentHTML('beforeend', html);
+            } else {
+                eventsList.innerHTML = html;
+            }
         }
     } catch (error) {
         showAlert('Error loading events: ' + error.message, 'danger');
@@ -135,66 +472,91 @@ async function loadEvents() {
 }
 
 /**
- * Load events for select dropdown (Generate Posts tab)
+ * Load event titles once and fill both event dropdowns
+ * (Generate Posts select and View Posts filter)
  */
-async function loadEventsForSelect() {
+async function loadEventOptions() {
     try {
-        const response = await fetch('/api/events');
-        const data = await response.json();
-        
-        if (data.success) {
-            const select = document.getElementById('selectEvent');
-            select.innerHTML = '<option value="">Choose an event...</option>' + 
-                data.events.map(event => 
-                    `<option value="${event.id}">${event.title} - ${event.date}</option>`
-                ).join('');
-        }
+        const events = [];
+        let cursor = null;
+
+        // Only id, title and date are needed, so page through the
+        // lightweight projection instead of pulling full event rows
+        do {
+            const params = new URLSearchParams({ fields: 'id,title', limit: 500 });
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
+            const data = await fetchJSON(`/api/events?${params}`, ['events']);
+            if (!data.success) {
+                showAlert('Error: ' + data.error, 'danger');
+                return;
+            }
+            events.push(...data.events);
+            cursor = data.next_cursor;
+        } while (cursor);
+
+        const select = document.getElementById('selectEvent');
+        const selected = select.value;
+        select.innerHTML = '<option value="">Choose an event...</option>' + 
+            events.map(event => 
+                `<option value="${event.id}">${event.title} - ${event.date}</option>`
+            ).join('');
+        select.value = selected;
+
+        const filter = document.getElementById('filterEvent');
+        const filtered = filter.value;
+        filter.innerHTML = '<option value="">All Events</option>' + 
+            events.map(event => 
+                `<option value="${event.id}">${event.title}</option>`
+            ).join('');
+        filter.value = filtered;
     } catch (error) {
         showAlert('Error loading events: ' + error.message, 'danger');
     }
 }
 
 /**
- * Load events for filter dropdown (View Posts tab)
+ * Reload everything that shows events after they changed
  */
-async function loadEventsForFilter() {
-    try {
-        const response = await fetch('/api/events');
-        const data = await response.json();
-        
-        if (data.success) {
-            const select = document.getElementById('filterEvent');
-            select.innerHTML = '<option value="">All Events</option>' + 
-                data.events.map(event => 
-                    `<option value="${event.id}">${event.title}</option>`
-                ).join('');
-        }
-    } catch (error) {
-        showAlert('Error loading events: ' + error.message, 'danger');
-    }
+function refreshEvents() {
+    loadEvents();
+    loadEventOptions();
 }
 
 /**
- * Delete an event
+ * Delete an event, removing its card right away
  * @param {number} eventId - Event ID to delete
  */
 async function deleteEvent(eventId) {
     if (!confirm('Are you sure you want to delete this event?')) return;
 
-    try {
-        const response = await fetch(`/api/events/${eventId}`, {
-            method: 'DELETE'
-        });
+    const card = document.querySelector(`#eventsList [data-event-id="${eventId}"]`);
+    if (card) {
+        card.style.display = 'none';
+    }
 
-        const data = await response.json();
+    try {
+        const data = await sendJSON(`/api/events/${eventId}`, 'DELETE');
         
         if (data.success) {
+            card?.remove();
             showAlert('Event deleted successfully!');
-            loadEvents();
+            // The card is gone already; only the dropdowns need reloading.
+            // The event's posts were deleted too.
+            forget('events');
+            loadEventOptions();
+            invalidate('posts');
         } else {
+            if (card) {
+                card.style.display = '';
+            }
             showAlert('Error: ' + data.error, 'danger');
         }
     } catch (error) {
+        if (card) {
+            card.style.display = '';
+        }
         showAlert('Error deleting event: ' + error.message, 'danger');
     }
 }
@@ -202,9 +564,45 @@ async function deleteEvent(eventId) {
 // ==================== Post Generation ====================
 
 /**
- * Generate a social media post
+ * Parse Server-Sent Events out of a streamed response body
+ * @param {Response} response - fetch() response with a text/event-stream body
+ * @param {Function} onEvent - Called with (eventName, data) for each message
  */
-async function generatePost() {
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let data = '';
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) {
+                    eventName = line.slice(7);
+                } else if (line.startsWith('data: ')) {
+                    data += line.slice(6);
+                }
+            });
+            onEvent(eventName, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
+/**
+ * Generate a social media post, rendering it as it streams in
+ * @param {boolean} regenerate - Ask for a fresh completion instead of a cached one
+ *   (or the existing draft generated from the same event data)
+ */
+async function generatePost(regenerate = false) {
     const eventId = document.getElementById('selectEvent').value;
     const platform = document.getElementById('selectPlatform').value;
     const tone = document.getElementById('selectTone').value;
@@ -214,12 +612,18 @@ async function generatePost() {
         return;
     }
 
+    const previewContent = document.getElementById('previewContent');
+    const previewHashtags = document.getElementById('previewHashtags');
+
     document.getElementById('loading').style.display = 'block';
     document.getElementById('previewSection').style.display = 'none';
+    previewContent.textContent = '';
+    previewHashtags.textContent = '';
     currentEventId = eventId;
+    currentPostId = null;
 
     try {
-        const response = await fetch('/api/generate-post', {
+        const response = await fetch('/api/generate-post/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -227,22 +631,49 @@ async function generatePost() {
             body: JSON.stringify({
                 event_id: parseInt(eventId),
                 platform: platform,
-                tone: tone
+                tone: tone,
+                regenerate: regenerate,
+                force: regenerate
             })
         });
 
-        const data = await response.json();
-        document.getElementById('loading').style.display = 'none';
-        
-        if (data.success) {
-            currentPostId = data.post_id;
-            document.getElementById('previewContent').textContent = data.content;
-            document.getElementById('previewHashtags').textContent = data.hashtags;
-            document.getElementById('previewSection').style.display = 'block';
-            showAlert('Post generated successfully!');
-        } else {
+        // Validation errors come back as plain JSON before streaming starts
+        if (!response.headers.get('Content-Type').startsWith('text/event-stream')) {
+            const data = await response.json();
+            document.getElementById('loading').style.display = 'none';
             showAlert('Error: ' + data.error, 'danger');
+            return;
         }
+
+        await readEventStream(response, (eventName, data) => {
+            if (eventName === 'delta') {
+                document.getElementById('loading').style.display = 'none';
+                document.getElementById('previewSection').style.display = 'block';
+                if (data.section === 'content') {
+                    previewContent.textContent += data.text;
+                } else {
+                    previewHashtags.textContent += data.text;
+                }
+            } else if (eventName === 'reset') {
+                previewContent.textContent = '';
+                previewHashtags.textContent = '';
+            } else if (eventName === 'done') {
+                currentPostId = data.post_id;
+                if (!data.reused) {
+                    invalidate('posts');
+                }
+                previewContent.textContent = data.content;
+                previewHashtags.textContent = data.hashtags;
+                document.getElementById('loading').style.display = 'none';
+                document.getElementById('previewSection').style.display = 'block';
+                showAlert(data.reused
+                    ? 'This event has not changed since its last draft - showing that draft. Use Regenerate for a new one.'
+                    : 'Post generated successfully!');
+            } else if (eventName === 'error') {
+                document.getElementById('loading').style.display = 'none';
+                showAlert('Error: ' + data.error, 'danger');
+            }
+        });
     } catch (error) {
         document.getElementById('loading').style.display = 'none';
         showAlert('Error generating post: ' + error.message, 'danger');
@@ -255,12 +686,12 @@ async function generatePost() {
 function regeneratePost() {
     if (currentEventId) {
         document.getElementById('selectEvent').value = currentEventId;
-        generatePost();
+        generatePost(true);
     }
 }
 
 /**
- * Update post status
+ * Update the status of the post shown in the preview
  * @param {string} status - New status (approved/posted)
  */
 async function updatePostStatus(status) {
@@ -269,136 +700,222 @@ async function updatePostStatus(status) {
         return;
     }
 
-    try {
-        const response = await fetch(`/api/posts/${currentPostId}`, {
-            method: 'PUT',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({ status: status })
-        });
+    await changePostStatus(currentPostId, status);
+}
 
-        const data = await response.json();
-        
-        if (data.success) {
-            showAlert(`Post status updated to ${status}!`);
-            if (status === 'approved') {
-                loadPosts();
+// ==================== Post Management ====================
+
+/**
+ * Posts tab state: the loaded posts live in a virtualized list and are
+ * updated in place; the list is only refetched when stale
+ */
+const postsView = {
+    list: null,
+    cursor: null,
+    loading: false,
+    stale: true,
+    request: 0      // responses to anything but the latest load are dropped
+};
+
+/**
+ * Render a single post card
+ * @param {Object} post - Post row from /api/posts
+ * @returns {string} Card HTML
+ */
+function renderPostCard(post) {
+    return `
+        <div class="event-card">
+            <div class="d-flex justify-content-between align-items-start mb-2">
+                <div>
+                    <h5>${post.event_title}</h5>
+                    <span class="status-badge status-${post.status}">${post.status.toUpperCase()}</span>
+                    <span class="badge bg-info ms-2">${post.platform}</span>
+                    <span class="badge bg-secondary ms-2">${post.tone}</span>
+                </div>
+                <div>
+                    <button class="btn btn-danger btn-sm" onclick="deletePost(${post.id})">
+                        <i class="fas fa-trash"></i>
+                    </button>
+                </div>
+            </div>
+            <div class="preview-box mb-2">${post.content}</div>
+            <div class="hashtags-box">${post.hashtags || 'No hashtags'}</div>
+            <div class="mt-2">
+                ${post.status === 'draft' ? `
+                    <button class="btn btn-success btn-sm" onclick="changePostStatus(${post.id}, 'approved')">
+                        <i class="fas fa-check icon"></i>Approve
+                    </button>
+                ` : ''}
+                ${post.status === 'approved' ? `
+                    <button class="btn btn-primary btn-sm" onclick="changePostStatus(${post.id}, 'posted')">
+                        <i class="fas fa-paper-plane icon"></i>Mark as Posted
+                    </button>
+                ` : ''}
+            </div>
+        </div>
+    `;
+}
+
+/**
+ * Virtualized list of the Posts tab, created on first use
+ * @returns {VirtualList} The list
+ */
+function postsList() {
+    if (!postsView.list) {
+        postsView.list = new VirtualList(
+            document.getElementById('postsList'),
+            renderPostCard,
+            post => post.id,
+            {
+                // Scrolling to the end loads the next page
+                onNearEnd: () => {
+                    if (postsView.cursor && !postsView.loading) {
+                        loadPosts(true);
+                    }
+                }
             }
-        } else {
-            showAlert('Error: ' + data.error, 'danger');
-        }
-    } catch (error) {
-        showAlert('Error updating status: ' + error.message, 'danger');
+        );
     }
+    return postsView.list;
 }
 
-// ==================== Post Management ====================
+/**
+ * Show or hide the empty-list message
+ */
+function updatePostsPlaceholder() {
+    const empty = postsList().items.length === 0;
+    document.getElementById('postsEmpty').style.display = empty ? 'block' : 'none';
+}
 
 /**
- * Load all generated posts
+ * Show the Posts tab, refetching only if posts changed since the last load
  */
-async function loadPosts() {
+function showPosts() {
+    if (postsView.stale) {
+        loadPosts();
+    } else {
+        postsList().schedule();
+    }
+}
+
+/**
+ * Load a page of generated posts
+ * @param {boolean} append - Append the next page instead of starting over
+ */
+async function loadPosts(append = false) {
+    const request = ++postsView.request;
+    postsView.loading = true;
     try {
         const eventId = document.getElementById('filterEvent').value;
-        const url = eventId ? `/api/posts?event_id=${eventId}` : '/api/posts';
+        const params = new URLSearchParams({ limit: PAGE_SIZE });
+        if (eventId) {
+            params.set('event_id', eventId);
+        }
+        if (append && postsView.cursor) {
+            params.set('cursor', postsView.cursor);
+        }
         
-        const response = await fetch(url);
-        const data = await response.json();
+        const data = await fetchJSON(`/api/posts?${params}`, ['posts']);
+        if (request !== postsView.request) {
+            return;
+        }
         
         if (data.success) {
-            const postsList = document.getElementById('postsList');
-            if (data.posts.length === 0) {
-                postsList.innerHTML = '<p class="text-white-50">No posts generated yet.</p>';
-                return;
+            postsView.cursor = data.next_cursor;
+            postsView.stale = false;
+            document.getElementById('postsLoadMore').style.display = postsView.cursor ? 'block' : 'none';
+
+            // The cached page is shared, so the list gets its own copies
+            const posts = data.posts.map(post => ({ ...post }));
+            if (append) {
+                postsList().append(posts);
+            } else {
+                postsList().setItems(posts);
             }
-            
-            postsList.innerHTML = data.posts.map(post => `
-                <div class="event-card">
-                    <div class="d-flex justify-content-between align-items-start mb-2">
-                        <div>
-                            <h5>${post.event_title}</h5>
-                            <span class="status-badge status-${post.status}">${post.status.toUpperCase()}</span>
-                            <span class="badge bg-info ms-2">${post.platform}</span>
-                            <span class="badge bg-secondary ms-2">${post.tone}</span>
-                        </div>
-                        <div>
-                            <button class="btn btn-danger btn-sm" onclick="deletePost(${post.id})">
-                                <i class="fas fa-trash"></i>
-                            </button>
-                        </div>
-                    </div>
-                    <div class="preview-box mb-2">${post.content}</div>
-                    <div class="hashtags-box">${post.hashtags || 'No hashtags'}</div>
-                    <div class="mt-2">
-                        ${post.status === 'draft' ? `
-                            <button class="btn btn-success btn-sm" onclick="changePostStatus(${post.id}, 'approved')">
-                                <i class="fas fa-check icon"></i>Approve
-                            </button>
-                        ` : ''}
-                        ${post.status === 'approved' ? `
-                            <button class="btn btn-primary btn-sm" onclick="changePostStatus(${post.id}, 'posted')">
-                                <i class="fas fa-paper-plane icon"></i>Mark as Posted
-                            </button>
-                        ` : ''}
-                    </div>
-                </div>
-            `).join('');
+            updatePostsPlaceholder();
+        } else {
+            showAlert('Error: ' + data.error, 'danger');
         }
     } catch (error) {
         showAlert('Error loading posts: ' + error.message, 'danger');
+    } finally {
+        if (request === postsView.request) {
+            postsView.loading = false;
+        }
     }
 }
 
 /**
- * Change post status
+ * Change post status, updating its card before the server confirms
  * @param {number} postId - Post ID
  * @param {string} status - New status
  */
 async function changePostStatus(postId, status) {
-    try {
-        const response = await fetch(`/api/posts/${postId}`, {
-            method: 'PUT',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({ status: status })
-        });
+    const list = postsList();
+    const post = list.find(postId);
+    const previous = post?.status;
+    if (post) {
+        post.status = status;
+        list.refresh(postId);
+    }
+
+    const undo = () => {
+        if (post) {
+            post.status = previous;
+            list.refresh(postId);
+        }
+    };
 
-        const data = await response.json();
+    try {
+        const data = await sendJSON(`/api/posts/${postId}`, 'PUT', { status: status });
         
         if (data.success) {
             showAlert(`Post status updated to ${status}!`);
-            loadPosts();
+            if (post) {
+                forget('posts');
+            } else {
+                invalidate('posts');
+            }
         } else {
+            undo();
             showAlert('Error: ' + data.error, 'danger');
         }
     } catch (error) {
+        undo();
         showAlert('Error updating status: ' + error.message, 'danger');
     }
 }
 
 /**
- * Delete a post
+ * Delete a post, removing its card before the server confirms
  * @param {number} postId - Post ID to delete
  */
 async function deletePost(postId) {
     if (!confirm('Are you sure you want to delete this post?')) return;
 
-    try {
-        const response = await fetch(`/api/posts/${postId}`, {
-            method: 'DELETE'
-        });
+    const list = postsList();
+    const removed = list.remove(postId);
+    updatePostsPlaceholder();
+
+    const undo = () => {
+        if (removed) {
+            list.insert(removed.index, removed.item);
+            updatePostsPlaceholder();
+        }
+    };
 
-        const data = await response.json();
+    try {
+        const data = await sendJSON(`/api/posts/${postId}`, 'DELETE');
         
         if (data.success) {
             showAlert('Post deleted successfully!');
-            loadPosts();
+            forget('posts');
         } else {
+            undo();
             showAlert('Error: ' + data.error, 'danger');
         }
     } catch (error) {
+        undo();
         showAlert('Error deleting post: ' + error.message, 'danger');
     }
 }
@@ -424,20 +941,12 @@ function initializeEventListeners() {
             };
 
             try {
-                const response = await fetch('/api/events', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify(eventData)
-                });
-
-                const data = await response.json();
+                const data = await sendJSON('/api/events', 'POST', eventData);
                 
                 if (data.success) {
                     showAlert('Event created successfully!');
                     eventForm.reset();
-                    loadEvents();
+                    invalidate('events');
                 } else {
                     showAlert('Error: ' + data.error, 'danger');
                 }
@@ -465,7 +974,16 @@ function initializeEventListeners() {
 function initialize() {
     loadTheme();
     initializeEventListeners();
-    loadEvents();
+
+    subscribe('events', refreshEvents);
+    subscribe('posts', () => {
+        postsView.stale = true;
+        if (document.getElementById('posts-tab').classList.contains('active')) {
+            loadPosts();
+        }
+    });
+
+    refreshEvents();
 }
 
 // Run initialization when DOM is loaded
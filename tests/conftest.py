@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the app modules the way the scripts in benchmarks/ do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Read by config.py on import: every test runs on SQLite with the template
+# generator, no in-process job workers and no access log
+os.environ.update({
+    'DB_BACKEND': 'sqlite',
+    'OPENAI_API_KEY': '',
+    'GENERATION_CACHE_BACKEND': 'none',
+    'OPENAI_RATE_LIMIT_BACKEND': 'none',
+    'JOB_WORKERS': '0',
+    'LOG_REQUESTS': 'False',
+})
+
+from config import Config
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A Database on a freshly migrated SQLite file"""
+    monkeypatch.setattr(Config, 'SQLITE_PATH', str(tmp_path / 'test.sqlite3'))
+    database = Database('sqlite')
+    assert database.initialize_database()
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def app_module(db, monkeypatch):
+    """The app module with its services pointed at the `db` fixture"""
+    import app as app_module
+    from http_cache import ResponseCache
+
+    monkeypatch.setattr(app_module.db, 'pool', db.pool)
+    monkeypatch.setattr(app_module, 'response_cache', ResponseCache(Config.RESPONSE_CACHE_MAX_ENTRIES))
+    if app_module.hashtag_index:
+        monkeypatch.setattr(app_module.hashtag_index, '_snapshot', None)
+        monkeypatch.setattr(app_module.hashtag_index, '_next_refresh', 0)
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def app_context(app_module):
+    """An app context, so repository calls return their connection at teardown"""
+    with app_module.app.app_context():
+        yield
+
+
+EVENT = {
+    'title': 'AI Summit',
+    'date': '2026-05-14',
+    'location': 'Berlin',
+    'type': 'Conference',
+    'description': 'Two days of talks and workshops.'
+}
+
+
+@pytest.fixture
+def event_id(client):
+    response = client.post('/api/events', json=EVENT)
+    assert response.status_code == 201
+    return response.json['event_id']
@@ -0,0 +1,192 @@
+"""
+Bulk import and export on the SQLite backend
+CSV and JSON Lines rows are validated one at a time, invalid rows are
+reported by line without stopping the import, valid rows are committed
+batch_size at a time (a batch the database rejects is skipped on its
+own), and an export imports back to the same events.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+import bulk_io
+from bulk_io import detect_format, export_events, export_posts, import_events, read_records
+from config import Config
+from database import Database
+
+CSV = (
+    'title,date,location,type,description\n'
+    'AI Summit,2026-05-14,Berlin,Conference,"Talks, workshops"\n'
+    ',2026-05-15,Paris,Meetup,No title\n'
+    'Bad date,14/05/2026,Rome,,\n'
+    'Too many,2026-05-16,Oslo,Meetup,x,extra\n'
+    'Data Day,2026-05-17,,,\n'
+)
+
+JSONL = (
+    '{"title": "AI Summit", "date": "2026-05-14", "location": "Berlin"}\n'
+    '\n'
+    '{"title": "Broken", "date": \n'
+    '["not", "an", "object"]\n'
+    '{"title": "' + 'x' * 256 + '", "date": "2026-05-15"}\n'
+    '{"title": "Data Day", "date": "2026-05-17", "type": null}\n'
+)
+
+
+def titles(db):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT title FROM events ORDER BY id")
+        result = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return result
+
+
+def events_version(db):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM table_versions WHERE table_name = 'events'")
+        version = cursor.fetchone()[0]
+        cursor.close()
+    return version
+
+
+@pytest.mark.parametrize('filename, mimetype, expected', [
+    ('events.csv', None, 'csv'),
+    ('events.jsonl', None, 'jsonl'),
+    ('events.NDJSON', None, 'jsonl'),
+    (None, 'application/x-ndjson', 'jsonl'),
+    (None, 'text/csv', 'csv'),
+    (None, None, 'csv'),
+])
+def test_detect_format(filename, mimetype, expected):
+    assert detect_format(filename, mimetype) == expected
+
+
+def test_csv_rows_are_validated_and_errors_reported_by_line(db):
+    summary = import_events(db, io.StringIO(CSV), 'csv')
+    assert summary == {
+        'imported': 2,
+        'failed': 3,
+        'errors': [
+            {'line': 3, 'error': 'Missing required field: title'},
+            {'line': 4, 'error': "Invalid date '14/05/2026': expected YYYY-MM-DD"},
+            {'line': 5, 'error': 'Too many columns'},
+        ],
+        'errors_truncated': False
+    }
+    assert titles(db) == ['AI Summit', 'Data Day']
+
+
+def test_quoted_csv_fields_spanning_lines_keep_their_line_numbers():
+    text = 'title,date,description\n"Multi\nline",2026-05-14,"a, b"\nNext,bad,\n'
+    rows = list(read_records(io.StringIO(text), 'csv'))
+    assert rows[0] == (3, {'title': 'Multi\nline', 'date': '2026-05-14', 'description': 'a, b'}, None)
+    assert rows[1][0] == 4
+
+
+def test_jsonl_rows_are_validated_and_errors_reported_by_line(db):
+    summary = import_events(db, io.StringIO(JSONL), 'jsonl')
+    assert summary['imported'] == 2
+    assert summary['failed'] == 3
+    lines = [(error['line'], error['error'].split(':')[0]) for error in summary['errors']]
+    assert lines == [(3, 'Invalid JSON'), (4, 'Expected a JSON object'),
+                     (5, 'title is longer than 255 characters')]
+    assert titles(db) == ['AI Summit', 'Data Day']
+
+
+def test_error_list_is_capped(db):
+    text = 'title,date\n' + ''.join(f'Event {i},not-a-date\n' for i in range(10))
+    summary = import_events(db, io.StringIO(text), 'csv', max_errors=3)
+    assert summary['failed'] == 10
+    assert len(summary['errors']) == 3
+    assert summary['errors_truncated']
+
+
+def test_rows_are_committed_in_batches_and_a_rejected_batch_is_skipped(db):
+    # The database refuses one title, failing the whole batch it is in
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TRIGGER reject_title BEFORE INSERT ON events WHEN NEW.title = 'Rejected'
+            BEGIN SELECT RAISE(ABORT, 'title rejected'); END
+        """)
+        conn.commit()
+        cursor.close()
+    names = ['A', 'B', 'Rejected', 'C', 'D']
+    text = 'title,date\n' + ''.join(f'{name},2026-05-14\n' for name in names)
+
+    summary = import_events(db, io.StringIO(text), 'csv', batch_size=2)
+    assert summary['imported'] == 3
+    assert summary['failed'] == 2
+    assert summary['errors'] == [{'lines': [4, 5], 'error': 'title rejected'}]
+    assert titles(db) == ['A', 'B', 'D']
+    # One transaction (and one version bump) per batch that went in
+    assert events_version(db) == 2
+
+
+def test_export_round_trip(db, tmp_path, monkeypatch):
+    import_events(db, io.StringIO(CSV), 'csv')
+    for fmt in bulk_io.FORMATS:
+        exported = ''.join(export_events(db, fmt, batch_size=1))
+        if fmt == 'csv':
+            rows = list(csv.DictReader(io.StringIO(exported)))
+        else:
+            rows = [json.loads(line) for line in exported.splitlines()]
+        assert [row['title'] for row in rows] == ['AI Summit', 'Data Day']
+        assert rows[0]['date'] == '2026-05-14'
+        assert rows[0]['description'] == 'Talks, workshops'
+        assert list(rows[0]) == list(bulk_io.EVENT_FIELDS)
+
+        # What an export writes, an import reads back
+        monkeypatch.setattr(Config, 'SQLITE_PATH', str(tmp_path / f'copy-{fmt}.sqlite3'))
+        copy_db = Database('sqlite')
+        assert copy_db.initialize_database()
+        try:
+            summary = import_events(copy_db, io.StringIO(exported), fmt)
+            assert (summary['imported'], summary['failed']) == (2, 0)
+            assert titles(copy_db) == ['AI Summit', 'Data Day']
+        finally:
+            copy_db.close()
+
+
+def test_export_streams_in_batches(db):
+    text = 'title,date\n' + ''.join(f'Event {i},2026-05-14\n' for i in range(5))
+    import_events(db, io.StringIO(text), 'csv')
+    chunks = list(export_events(db, 'jsonl', batch_size=2))
+    assert [chunk.count('\n') for chunk in chunks] == [2, 2, 1]
+    chunks = list(export_events(db, 'csv', batch_size=2))
+    # Header and the first batch, then one chunk per batch
+    assert [chunk.count('\n') for chunk in chunks] == [3, 2, 1]
+
+
+def test_export_posts_of_one_event(client, db, event_id):
+    other = client.post('/api/events', json={'title': 'Other', 'date': '2026-06-01'}).json['event_id']
+    for target in (event_id, other):
+        client.post('/api/generate-post', json={'event_id': target, 'platform': 'linkedin', 'tone': 'casual'})
+    rows = [json.loads(line) for line in ''.join(export_posts(db, 'jsonl', event_id=event_id)).splitlines()]
+    assert [row['event_id'] for row in rows] == [event_id]
+    assert list(rows[0]) == list(bulk_io.POST_EXPORT_FIELDS)
+    assert date.fromisoformat(rows[0]['created_at'][:10])
+
+
+def test_import_and_export_endpoints(client):
+    response = client.post('/api/events/import', data=CSV.encode('utf-8-sig'), content_type='text/csv')
+    assert response.status_code == 200
+    assert (response.json['imported'], response.json['failed']) == (2, 3)
+
+    response = client.post('/api/events/import?format=jsonl', data=JSONL, content_type='text/plain')
+    assert (response.json['imported'], response.json['failed']) == (2, 3)
+    assert client.post('/api/events/import?format=xml', data='').status_code == 400
+    assert client.post('/api/events/import', data=b'title,date\n\xff\xfe,x\n',
+                       content_type='text/csv').status_code == 400
+
+    response = client.get('/api/events/export?format=csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert [row['title'] for row in csv.DictReader(io.StringIO(response.get_data(as_text=True)))] == [
+        'AI Summit', 'Data Day', 'AI Summit', 'Data Day'
+    ]
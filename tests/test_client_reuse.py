@@ -0,0 +1,107 @@
+"""
+OpenAI client reuse against the fake OpenAI server
+An AIGenerator builds one synchronous and one async client on first use
+and keeps them, so consecutive generations share a kept-alive connection
+instead of opening one each. close(), and the app's shutdown() for the
+app's generator, closes both clients and stops the event loop.
+"""
+import pytest
+
+from ai_generator import AIGenerator
+from config import Config
+from job_queue import JobWorkerPool
+from tools.fake_openai_server import REPLY, start_server
+
+FAKE_CONTENT = REPLY.split('CONTENT:', 1)[1].split('!', 1)[0].strip()
+
+EVENT = {'title': 'AI Summit', 'date': '2026-05-14', 'location': 'Berlin',
+         'type': 'Conference', 'description': 'Talks and workshops.'}
+
+
+@pytest.fixture
+def server():
+    """The fake server, recording the client address of every connection it accepts"""
+    server = start_server()
+    server.connections = []
+    process_request = server.process_request
+
+    def recording_process_request(request, client_address):
+        server.connections.append(client_address)
+        process_request(request, client_address)
+
+    server.process_request = recording_process_request
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def generator(monkeypatch, server):
+    host, port = server.server_address[:2]
+    for name, value in {
+        'OPENAI_API_KEY': 'test',
+        'OPENAI_BASE_URL': f'http://{host}:{port}/v1',
+        'OPENAI_MAX_RETRIES': 0,
+        'GENERATION_CACHE_BACKEND': 'none',
+        'OPENAI_RATE_LIMIT_BACKEND': 'none',
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+    generator = AIGenerator()
+    yield generator
+    generator.close()
+
+
+def test_sync_client_is_built_once_and_keeps_its_connection(generator, server):
+    assert generator._client is None
+    clients = set()
+    for platform in ('linkedin', 'twitter', 'facebook'):
+        result = generator.generate_post(EVENT, platform, 'professional', use_cache=False)
+        assert FAKE_CONTENT in result['content']
+        clients.add(id(generator.client))
+    assert len(clients) == 1
+    assert server.request_count == 3
+    assert len(server.connections) == 1
+
+
+def test_async_client_is_built_once_and_keeps_its_connection(generator, server):
+    async_clients = set()
+    for _ in range(2):
+        futures = generator.submit_batch([(EVENT, platform, 'casual') for platform in ('linkedin', 'twitter')], 1)
+        assert all(FAKE_CONTENT in future.result(10)['content'] for future in futures)
+        async_clients.add(id(generator.async_client))
+    assert len(async_clients) == 1
+    assert generator._client is None
+    assert server.request_count == 4
+    # One generation at a time, so one connection serves all of them
+    assert len(server.connections) == 1
+
+
+def test_close_closes_both_clients_and_stops_the_loop(generator):
+    generator.generate_post(EVENT, 'linkedin', 'professional')
+    generator.submit_batch([(EVENT, 'twitter', 'professional')], 1)[0].result(10)
+    client, async_client, thread = generator._client, generator._async_client, generator._loop_thread
+
+    generator.close()
+    assert client.is_closed()
+    assert async_client.is_closed()
+    assert not thread.is_alive()
+    assert (generator._client, generator._async_client, generator._loop) == (None, None, None)
+
+    # A closed generator builds new clients if it is used again
+    generator.generate_post(EVENT, 'linkedin', 'casual')
+    assert generator._client is not client
+    generator.close()
+
+
+def test_app_shutdown_closes_the_app_generator(app_module, generator, monkeypatch):
+    monkeypatch.setattr(app_module, '_ai_generator', generator)
+    monkeypatch.setattr(app_module, 'job_workers', JobWorkerPool(app_module.job_queue, app_module.get_ai_generator))
+    assert app_module.get_ai_generator() is generator
+
+    generator.generate_post(EVENT, 'linkedin', 'professional')
+    generator.submit_batch([(EVENT, 'twitter', 'professional')], 1)[0].result(10)
+    client, async_client = generator._client, generator._async_client
+
+    app_module.shutdown(timeout=1)
+    assert client.is_closed()
+    assert async_client.is_closed()
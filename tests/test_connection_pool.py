@@ -0,0 +1,180 @@
+"""
+ConnectionPool with a fake driver
+The pool never opens more than `size` connections, raises PoolExhausted
+when none frees up within the timeout, replaces connections that fail
+their checkout ping or outlived `recycle`, and gets request connections
+back when the Flask app context ends.
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from database import ConnectionPool, Database, PoolExhausted
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.in_transaction = False
+        self.dead = False
+        self.closed = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        if self.dead:
+            raise sqlite3.OperationalError('server has gone away')
+
+    def rollback(self):
+        if self.dead:
+            raise sqlite3.OperationalError('server has gone away')
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDriver:
+    """connect() for the pool; keeps every connection it opened"""
+
+    def __init__(self):
+        self.opened = []
+
+    def connect(self):
+        conn = FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+
+def make_pool(driver, size=2, timeout=0.2, recycle=3600, ping_interval=3600):
+    return ConnectionPool(size=size, timeout=timeout, recycle=recycle, ping_interval=ping_interval,
+                          connect=driver.connect)
+
+
+def raw(conn):
+    """The driver connection inside the pool's TimedConnection"""
+    return conn._conn
+
+
+def test_pool_opens_at_most_size_connections_and_reuses_them():
+    driver = FakeDriver()
+    pool = make_pool(driver)
+    first, second = pool.acquire(), pool.acquire()
+    assert len(driver.opened) == 2
+    assert pool.stats()['in_use'] == 2
+
+    pool.release(first)
+    assert raw(pool.acquire()) is raw(first)
+    assert len(driver.opened) == 2
+    pool.release(second)
+
+
+def test_acquire_raises_pool_exhausted_after_the_timeout():
+    pool = make_pool(FakeDriver(), size=1, timeout=0.2)
+    pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.2
+    stats = pool.stats()
+    assert (stats['created'], stats['in_use'], stats['timeouts']) == (1, 1, 1)
+
+
+def test_waiter_gets_a_connection_released_within_the_timeout():
+    driver = FakeDriver()
+    pool = make_pool(driver, size=1, timeout=5)
+    held = pool.acquire()
+    threading.Timer(0.1, pool.release, (held,)).start()
+    assert raw(pool.acquire()) is raw(held)
+    assert len(driver.opened) == 1
+
+
+def test_dead_connection_is_replaced_at_checkout():
+    driver = FakeDriver()
+    pool = make_pool(driver, ping_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    raw(conn).dead = True
+
+    replacement = pool.acquire()
+    assert raw(replacement) is not raw(conn)
+    assert raw(conn).closed
+    stats = pool.stats()
+    assert (stats['created'], stats['reconnects']) == (1, 1)
+
+
+def test_healthy_connection_is_pinged_and_kept():
+    driver = FakeDriver()
+    pool = make_pool(driver, ping_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert raw(pool.acquire()) is raw(conn)
+    assert pool.stats()['reconnects'] == 0
+
+
+def test_old_connection_is_recycled_at_checkout():
+    driver = FakeDriver()
+    pool = make_pool(driver, recycle=0.05)
+    conn = pool.acquire()
+    pool.release(conn)
+    time.sleep(0.1)
+    assert raw(pool.acquire()) is not raw(conn)
+    assert raw(conn).closed
+    assert pool.stats()['created'] == 1
+
+
+def test_release_rolls_back_and_discards_broken_connections():
+    driver = FakeDriver()
+    pool = make_pool(driver)
+    conn = pool.acquire()
+    raw(conn).in_transaction = True
+    pool.release(conn)
+    assert raw(conn).rollbacks == 1
+    assert pool.stats()['idle'] == 1
+
+    conn = pool.acquire()
+    raw(conn).in_transaction = True
+    raw(conn).dead = True
+    pool.release(conn)
+    assert raw(conn).closed
+    stats = pool.stats()
+    assert (stats['created'], stats['idle'], stats['in_use']) == (0, 0, 0)
+
+
+def test_failed_connect_frees_its_slot():
+    pool = ConnectionPool(size=1, timeout=0.1, recycle=3600, ping_interval=3600,
+                          connect=lambda: (_ for _ in ()).throw(sqlite3.OperationalError('refused')))
+    for _ in range(3):
+        with pytest.raises(sqlite3.OperationalError):
+            pool.acquire()
+    assert pool.stats()['created'] == 0
+
+
+def test_request_connection_is_released_at_app_context_teardown():
+    driver = FakeDriver()
+    db = Database('sqlite')
+    db.pool = make_pool(driver, size=1)
+    app = Flask(__name__)
+    db.init_app(app)
+
+    for _ in range(3):
+        with app.app_context():
+            conn = db.get_connection()
+            # One connection for the whole request
+            assert db.get_connection() is conn
+            assert db.pool_stats()['in_use'] == 1
+        assert db.pool_stats()['in_use'] == 0
+    assert len(driver.opened) == 1
+
+
+def test_get_connection_outside_a_request_raises_pool_exhausted():
+    db = Database('sqlite')
+    db.pool = make_pool(FakeDriver(), size=1, timeout=0.05)
+    conn = db.get_connection()
+    with pytest.raises(PoolExhausted):
+        db.get_connection()
+    db.release_connection(conn)
+    assert db.pool_stats()['in_use'] == 0
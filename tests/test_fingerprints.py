@@ -0,0 +1,229 @@
+"""
+Generation fingerprints, draft reuse and compaction
+A fingerprint covers the event fields, platform, tone, template version
+and, with an API key, the model and its sampling parameters. Generating
+again from the same inputs returns the stored draft unless "force" (or
+"regenerate") is set, and compact_posts deletes older duplicate drafts,
+pointing their jobs at the draft that is kept.
+"""
+import json
+
+import pytest
+
+from ai_generator import generation_fingerprint
+from compact_posts import compact_posts
+from config import Config
+from prompt_templates import TemplateEngine
+
+EVENT = {'title': 'AI Summit', 'date': '2026-05-14', 'location': 'Berlin',
+         'type': 'Conference', 'description': 'Talks and workshops.'}
+
+
+def fingerprint(**changes):
+    args = {'event_data': EVENT, 'platform': 'linkedin', 'tone': 'professional', 'template_version': 'v1'}
+    args.update(changes)
+    return generation_fingerprint(**args)
+
+
+def test_fingerprint_is_stable():
+    # Pinned: changing what the fingerprint covers must be deliberate, as
+    # it stops every stored draft from being reused
+    assert fingerprint() == 'a2c3631d4a5f99d0a7fa7573926f6cfdcb29e67283ab66b7223159debf640ee4'
+    assert fingerprint(event_data=dict(reversed(list(EVENT.items())))) == fingerprint()
+
+
+@pytest.mark.parametrize('changes', [
+    {'event_data': dict(EVENT, title='ML Summit')},
+    {'event_data': dict(EVENT, description='')},
+    {'platform': 'twitter'},
+    {'tone': 'casual'},
+    {'template_version': 'v2'},
+])
+def test_fingerprint_covers_every_input(changes):
+    assert fingerprint(**changes) != fingerprint()
+
+
+@pytest.mark.parametrize('name, value', [
+    ('OPENAI_MODEL', 'other-model'),
+    ('OPENAI_TEMPERATURE', 0.2),
+    ('OPENAI_MAX_TOKENS', 123),
+])
+def test_fingerprint_covers_the_model_and_sampling_parameters(monkeypatch, name, value):
+    monkeypatch.setattr(Config, 'OPENAI_API_KEY', 'test')
+    with_key = fingerprint()
+    monkeypatch.setattr(Config, name, value)
+    assert fingerprint() != with_key
+
+
+def test_fallback_generator_ignores_the_model(monkeypatch):
+    before = fingerprint()
+    monkeypatch.setattr(Config, 'OPENAI_MODEL', 'other-model')
+    assert fingerprint() == before
+    monkeypatch.setattr(Config, 'OPENAI_API_KEY', 'test')
+    assert fingerprint() != before
+
+
+def test_template_changes_change_the_version(tmp_path):
+    engine = TemplateEngine(template_dir=str(tmp_path), reload_interval=0)
+    version = engine.version()
+    assert version == TemplateEngine(template_dir=str(tmp_path), reload_interval=0).version()
+
+    (tmp_path / 'tones.json').write_text(json.dumps({'tone_guidelines': {'professional': 'Be brief.'}}))
+    assert engine.version() != version
+
+
+def generate(client, event_id, **extra):
+    response = client.post('/api/generate-post', json={'event_id': event_id, 'platform': 'linkedin',
+                                                       'tone': 'professional', **extra})
+    assert response.status_code in (200, 202)
+    return response.json
+
+
+def test_identical_request_reuses_the_draft(client, event_id):
+    first = generate(client, event_id)
+    assert first['reused'] is False
+    again = generate(client, event_id)
+    assert again['reused'] is True
+    assert (again['post_id'], again['content'], again['hashtags']) == (
+        first['post_id'], first['content'], first['hashtags'])
+
+    # Any other input is a different generation
+    assert generate(client, event_id, tone='casual')['reused'] is False
+    client.put(f'/api/events/{event_id}', json=dict(EVENT, title='Renamed'))
+    assert generate(client, event_id)['reused'] is False
+
+
+@pytest.mark.parametrize('flag', ['force', 'regenerate'])
+def test_force_bypasses_reuse(client, event_id, flag):
+    first = generate(client, event_id)
+    forced = generate(client, event_id, **{flag: True})
+    assert forced['reused'] is False
+    assert forced['post_id'] != first['post_id']
+    # The newest draft is the one reused from then on
+    assert generate(client, event_id)['post_id'] == forced['post_id']
+
+
+def test_approved_posts_are_not_reused(client, event_id):
+    first = generate(client, event_id)
+    assert client.put(f"/api/posts/{first['post_id']}", json={'status': 'approved'}).status_code == 200
+    assert generate(client, event_id)['post_id'] != first['post_id']
+
+
+def test_multi_platform_request_generates_only_missing_drafts(client, event_id):
+    linkedin = generate(client, event_id)
+    response = generate(client, event_id, platforms=['linkedin', 'twitter'])
+    posts = {post['platform']: post for post in response['posts']}
+    assert posts['linkedin']['reused'] is True
+    assert posts['linkedin']['post_id'] == linkedin['post_id']
+    assert posts['twitter']['reused'] is False
+
+
+def test_async_request_returns_an_existing_draft_instead_of_queueing(client, event_id):
+    draft = generate(client, event_id)
+    response = client.post('/api/generate-post', json={'event_id': event_id, 'platform': 'linkedin',
+                                                       'tone': 'professional', 'async': True})
+    assert response.status_code == 200
+    assert (response.json['post_id'], response.json['reused']) == (draft['post_id'], True)
+
+    response = client.post('/api/generate-post', json={'event_id': event_id, 'platforms': ['linkedin', 'twitter'],
+                                                       'tone': 'professional', 'async': True})
+    assert response.status_code == 202
+    assert response.json['platforms'] == ['twitter']
+    assert [post['post_id'] for post in response.json['posts']] == [draft['post_id']]
+
+    response = client.post('/api/generate-post', json={'event_id': event_id, 'platform': 'linkedin',
+                                                       'tone': 'professional', 'async': True, 'force': True})
+    assert response.status_code == 202
+    assert response.json['status'] == 'queued'
+
+
+def streamed_done(client, event_id, **extra):
+    response = client.post('/api/generate-post/stream', json={'event_id': event_id, 'platform': 'linkedin',
+                                                              'tone': 'professional', **extra})
+    messages = response.get_data(as_text=True).strip().split('\n\n')
+    event, data = messages[-1].split('\n')
+    assert event == 'event: done'
+    return json.loads(data[len('data: '):])
+
+
+def test_stream_sends_an_existing_draft_right_away(client, event_id):
+    draft = generate(client, event_id)
+    done = streamed_done(client, event_id)
+    assert (done['post_id'], done['reused']) == (draft['post_id'], True)
+    assert streamed_done(client, event_id, force=True)['reused'] is False
+
+
+def add_post(db, event_id, content, fingerprint=None, status='draft', platform='linkedin'):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO generated_posts (event_id, platform, tone, content, hashtags, fingerprint, status)"
+            " VALUES (%s, %s, 'professional', %s, '#AI', %s, %s)",
+            (event_id, platform, content, fingerprint, status)
+        )
+        post_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+    return post_id
+
+
+def add_job(db, event_id, post_id):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO generation_jobs (event_id, platform, tone, status, post_id)"
+            " VALUES (%s, 'linkedin', 'professional', 'done', %s)",
+            (event_id, post_id)
+        )
+        job_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+    return job_id
+
+
+def rows(db, query):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        result = cursor.fetchall()
+        cursor.close()
+    return result
+
+
+@pytest.fixture
+def drafts(db, client, event_id):
+    """Duplicate drafts of two events, with a job for each older duplicate"""
+    other = client.post('/api/events', json={'title': 'Other', 'date': '2026-06-01'}).json['event_id']
+    ids = {
+        'old': add_post(db, event_id, 'First take', 'fp'),
+        'new': add_post(db, event_id, 'Second take', 'fp'),
+        # Saved before fingerprints: compared on their text
+        'legacy_old': add_post(db, event_id, 'Same text'),
+        'legacy_new': add_post(db, event_id, 'Same text'),
+        'legacy_other': add_post(db, event_id, 'Same text', platform='twitter'),
+        'approved': add_post(db, event_id, 'First take', 'fp', status='approved'),
+        # Same fingerprint on another event is not a duplicate
+        'other_event': add_post(db, other, 'First take', 'fp'),
+    }
+    ids['job_old'] = add_job(db, event_id, ids['old'])
+    ids['job_legacy_old'] = add_job(db, event_id, ids['legacy_old'])
+    return ids
+
+
+def test_compact_posts_dry_run_only_counts(db, drafts):
+    assert compact_posts(db, dry_run=True) == {'duplicates': 2, 'deleted': 0}
+    assert rows(db, "SELECT COUNT(*) FROM generated_posts") == [(7,)]
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 100])
+def test_compact_posts_keeps_the_newest_draft_and_repoints_jobs(db, drafts, batch_size):
+    assert compact_posts(db, batch_size=batch_size) == {'duplicates': 2, 'deleted': 2}
+
+    remaining = {post_id for (post_id,) in rows(db, "SELECT id FROM generated_posts")}
+    assert remaining == {drafts[name] for name in ('new', 'legacy_new', 'legacy_other', 'approved', 'other_event')}
+    assert rows(db, "SELECT id, post_id FROM generation_jobs ORDER BY id") == [
+        (drafts['job_old'], drafts['new']),
+        (drafts['job_legacy_old'], drafts['legacy_new']),
+    ]
+    # Nothing left to compact
+    assert compact_posts(db) == {'duplicates': 0, 'deleted': 0}
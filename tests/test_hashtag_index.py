@@ -0,0 +1,174 @@
+"""
+Learned hashtag suggestions
+Every post write adds its hashtags to per-context counts and stores each
+pair of tags once, with tag < related; the in-memory snapshot expands a
+pair in both directions. Migration 9 drops the reversed rows written
+before pairs were stored once, and suggest() ranks related tags first,
+then the platform's tags for the event type, then for any type.
+"""
+import time
+
+import pytest
+
+import hashtag_index
+import sqlite_backend
+from hashtag_index import HashtagIndex, record_hashtags
+from migrations import run_migrations
+
+
+def write(db, added=(), removed=()):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        record_hashtags(cursor, db.backend, added=added, removed=removed)
+        conn.commit()
+        cursor.close()
+
+
+def rows(db, query):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        result = [tuple(row) for row in cursor.fetchall()]
+        cursor.close()
+    return result
+
+
+def pairs(db):
+    return rows(db, "SELECT platform, tag, related, uses, positive FROM hashtag_pairs ORDER BY platform, tag, related")
+
+
+def loaded(db, **options):
+    """A HashtagIndex with its snapshot loaded in this thread"""
+    index = HashtagIndex(db, **{'refresh_interval': -1, 'min_uses': 1, 'positive_weight': 3, **options})
+    index._snapshot = index._load()
+    return index
+
+
+def test_pairs_are_stored_once_in_tag_order(db):
+    write(db, added=[('linkedin', 'Conference', 'draft', '#Tech #AI #berlin')])
+    assert pairs(db) == [
+        ('linkedin', '#ai', '#berlin', 1, 0),
+        ('linkedin', '#ai', '#tech', 1, 0),
+        ('linkedin', '#berlin', '#tech', 1, 0),
+    ]
+    # The same tags in another order add to the same rows
+    write(db, added=[('linkedin', 'Meetup', 'approved', '#berlin #tech #ai')])
+    assert pairs(db) == [
+        ('linkedin', '#ai', '#berlin', 2, 1),
+        ('linkedin', '#ai', '#tech', 2, 1),
+        ('linkedin', '#berlin', '#tech', 2, 1),
+    ]
+
+
+def test_counts_cover_the_event_type_and_any_type(db):
+    write(db, added=[('linkedin', ' Conference ', 'posted', '#AI #ai')])
+    counts = rows(db, "SELECT platform, event_type, tag, label, uses, positive FROM hashtag_counts ORDER BY event_type")
+    assert counts == [
+        ('linkedin', '', '#ai', '#AI', 1, 1),
+        ('linkedin', 'conference', '#ai', '#AI', 1, 1),
+    ]
+
+
+def test_status_change_and_delete(db):
+    post = ('twitter', 'Meetup', 'draft', '#AI #ML')
+    write(db, added=[post])
+    approved = ('twitter', 'Meetup', 'approved', '#AI #ML')
+    write(db, added=[approved], removed=[post])
+    assert pairs(db) == [('twitter', '#ai', '#ml', 1, 1)]
+
+    # Unused tags and pairs are forgotten
+    write(db, removed=[approved])
+    assert pairs(db) == []
+    assert rows(db, "SELECT COUNT(*) FROM hashtag_counts") == [(0,)]
+
+
+def test_large_writes_are_split_into_batches(db, monkeypatch):
+    monkeypatch.setattr(hashtag_index, 'UPSERT_BATCH_ROWS', 2)
+    tags = ' '.join(f'#tag{i}' for i in range(5))
+    write(db, added=[('linkedin', 'Conference', 'draft', tags)] * 2)
+    assert rows(db, "SELECT COUNT(*), MIN(uses), MAX(uses) FROM hashtag_pairs") == [(10, 2, 2)]
+    assert rows(db, "SELECT COUNT(*), MIN(uses), MAX(uses) FROM hashtag_counts") == [(10, 2, 2)]
+
+
+def test_load_expands_pairs_in_both_directions(db):
+    write(db, added=[('linkedin', 'Conference', 'draft', '#AI #Berlin')])
+    ranked, related = loaded(db)._snapshot
+    assert related[('linkedin', '#ai')] == [('#berlin', '#Berlin', 1)]
+    assert related[('linkedin', '#berlin')] == [('#ai', '#AI', 1)]
+    assert sorted(ranked[('linkedin', 'conference')]) == [('#ai', '#AI'), ('#berlin', '#Berlin')]
+
+
+def test_min_uses_leaves_out_rare_tags_and_pairs(db):
+    write(db, added=[('linkedin', '', 'draft', '#AI #Berlin'), ('linkedin', '', 'draft', '#AI #Tech')])
+    ranked, related = loaded(db, min_uses=2)._snapshot
+    assert ranked[('linkedin', '')] == [('#ai', '#AI')]
+    assert related == {}
+
+
+def test_migration_9_drops_reversed_pairs(tmp_path):
+    conn = sqlite_backend.connect(str(tmp_path / 'upgrade.sqlite3'))
+    run_migrations(conn, target_version=8, backend='sqlite')
+    cursor = conn.cursor()
+    # Before version 9 every pair was written in both directions
+    cursor.executemany(
+        "INSERT INTO hashtag_pairs (platform, tag, related, uses, positive) VALUES (%s, %s, %s, %s, %s)",
+        [('linkedin', '#ai', '#berlin', 3, 1), ('linkedin', '#berlin', '#ai', 3, 1),
+         ('twitter', '#ml', '#ai', 2, 0), ('twitter', '#ai', '#ml', 2, 0)]
+    )
+    conn.commit()
+
+    assert run_migrations(conn, backend='sqlite') == [9]
+    cursor.execute("SELECT platform, tag, related, uses FROM hashtag_pairs ORDER BY platform")
+    assert [tuple(row) for row in cursor.fetchall()] == [('linkedin', '#ai', '#berlin', 3),
+                                                         ('twitter', '#ai', '#ml', 2)]
+    cursor.close()
+    conn.close()
+
+
+@pytest.fixture
+def index(db):
+    write(db, added=[
+        ('linkedin', 'Conference', 'draft', '#AI #Keynote'),
+        ('linkedin', 'Conference', 'draft', '#AI #Keynote'),
+        ('linkedin', 'Conference', 'draft', '#AI'),
+        ('linkedin', 'Conference', 'approved', '#Networking'),
+        ('linkedin', 'Meetup', 'draft', '#Community #Pizza'),
+    ] + [('linkedin', 'Meetup', 'draft', '#Community')] * 4 + [
+        ('twitter', 'Conference', 'draft', '#Live #AI'),
+        ('twitter', 'Conference', 'draft', '#AI'),
+    ])
+    return loaded(db)
+
+
+def test_suggest_ranks_the_event_type_first(index):
+    # #Networking: one use, approved, so it outweighs three drafts
+    assert index.suggest('linkedin', 'conference', limit=3) == ['#Networking', '#AI', '#Keynote']
+    assert index.suggest('linkedin', 'Meetup', limit=2) == ['#Community', '#Pizza']
+    # Then the platform's tags over every type
+    assert index.suggest('linkedin', 'Meetup', limit=4) == ['#Community', '#Pizza', '#Networking', '#AI']
+    assert index.suggest('linkedin', 'Webinar', limit=3) == ['#Community', '#Networking', '#AI']
+
+
+def test_suggest_is_per_platform(index):
+    assert index.suggest('twitter', 'Conference') == ['#AI', '#Live']
+    assert index.suggest('instagram', 'Conference') == []
+
+
+def test_suggest_puts_given_tags_then_related_ones_first(index):
+    # Tags used with the given ones outrank the event type's top tags
+    assert index.suggest('linkedin', 'Conference', tags=['#pizza'], limit=3) == ['#pizza', '#Community', '#Networking']
+    assert index.suggest('linkedin', 'Conference', tags=['#keynote'], limit=2) == ['#keynote', '#AI']
+    assert index.suggest('linkedin', 'Conference', tags=['#A', '#B', '#a'], limit=2) == ['#A', '#B']
+
+
+def test_suggest_learns_nothing_until_the_first_load(db):
+    write(db, added=[('linkedin', '', 'draft', '#AI')])
+    index = HashtagIndex(db, min_uses=1)
+    assert index.stats()['ready'] is False
+    # Starts the load, but answers from EMPTY_SNAPSHOT rather than wait for it
+    assert index.suggest('linkedin', '', tags=['#Given']) == ['#Given']
+
+    deadline = time.monotonic() + 5
+    while not index.stats()['ready'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.suggest('linkedin', '') == ['#AI']
@@ -0,0 +1,104 @@
+"""
+Conditional GETs of the list endpoints
+A listing's weak ETag and Last-Modified come from the table_versions of
+the tables it reads. A matching If-None-Match or If-Modified-Since is
+answered 304, any write to those tables changes the ETag, and bodies
+compressed for one client are never served to a client that did not
+ask for that encoding.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from werkzeug.http import http_date
+
+from config import Config
+
+
+@pytest.fixture
+def events(client):
+    for i in range(30):
+        client.post('/api/events', json={'title': f'Event {i}', 'date': '2026-05-14',
+                                         'description': 'Talks and workshops. ' * 5})
+
+
+def test_listing_carries_validators(client, events):
+    response = client.get('/api/events')
+    assert response.status_code == 200
+    etag, weak = response.get_etag()
+    assert etag and weak
+    assert response.last_modified is not None
+    assert response.cache_control.no_cache
+    assert 'Accept-Encoding' in response.vary
+
+
+def test_if_none_match_is_answered_304(client, app_module, events):
+    etag = client.get('/api/events').headers['ETag']
+    response = client.get('/api/events', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert app_module.response_cache.stats()['not_modified'] == 1
+
+    assert client.get('/api/events', headers={'If-None-Match': 'W/"something-else"'}).status_code == 200
+
+
+def test_etag_covers_the_query_string(client, events):
+    etag = client.get('/api/events?limit=5').headers['ETag']
+    assert client.get('/api/events?limit=6').headers['ETag'] != etag
+    assert client.get('/api/events?limit=6', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get('/api/events?limit=5', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_if_modified_since(client, events):
+    last_modified = client.get('/api/events').headers['Last-Modified']
+    assert client.get('/api/events', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    earlier = http_date(datetime.now(timezone.utc) - timedelta(days=1))
+    assert client.get('/api/events', headers={'If-Modified-Since': earlier}).status_code == 200
+
+
+def test_writes_invalidate_the_etag_and_the_cached_body(client, app_module, events):
+    first = client.get('/api/events?limit=100')
+    etag = first.headers['ETag']
+    # Served from the cache until something changes
+    assert client.get('/api/events?limit=100').data == first.data
+    assert app_module.response_cache.stats()['hits'] == 1
+
+    client.post('/api/events', json={'title': 'Brand new', 'date': '2026-06-01'})
+    response = client.get('/api/events?limit=100', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json['events'][0]['title'] == 'Brand new'
+
+
+def test_event_edits_invalidate_post_listings(client, event_id):
+    client.post('/api/generate-post', json={'event_id': event_id, 'platform': 'linkedin', 'tone': 'professional'})
+    etag = client.get('/api/posts').headers['ETag']
+
+    client.put(f'/api/events/{event_id}', json={'title': 'Renamed', 'date': '2026-05-14'})
+    response = client.get('/api/posts', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['posts'][0]['event_title'] == 'Renamed'
+
+
+def test_compressed_variant_is_only_served_to_clients_that_accept_it(client, events, monkeypatch):
+    monkeypatch.setattr(Config, 'RESPONSE_COMPRESSION_MIN_BYTES', 0)
+    compressed = client.get('/api/events', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.vary
+    body = gzip.decompress(compressed.data)
+
+    plain = client.get('/api/events')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data == body
+    assert json.loads(plain.data)['events']
+
+    identity = client.get('/api/events', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.data == body
+
+    # Same ETag for both representations, so it is weak
+    assert compressed.headers['ETag'] == plain.headers['ETag']
+    assert plain.get_etag()[1]
@@ -0,0 +1,262 @@
+"""
+The generation job queue on the SQLite backend
+Claims by priority, retries with backoff into the dead-letter queue,
+recovery of expired leases and the async /api/generate-post flow. A
+worker only settles a job while it still holds the claim: once its lease
+has expired and the job was handed to another worker, its late
+complete() or fail() changes nothing.
+"""
+import threading
+import time
+
+import pytest
+
+from config import Config
+from job_queue import JobWorkerPool
+
+RESULT = {'content': 'A generated post', 'hashtags': '#AI #Berlin'}
+
+
+@pytest.fixture
+def queue(app_module, app_context):
+    return app_module.job_queue
+
+
+def job_row(queue, job_id):
+    with queue.db.connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM generation_jobs WHERE id = %s", (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    return row
+
+
+def post_count(queue):
+    with queue.db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM generated_posts")
+        count = cursor.fetchone()[0]
+        cursor.close()
+    return count
+
+
+def claim(queue):
+    with queue.db.connection() as conn:
+        return queue.claim(conn)
+
+
+def expire_leases(queue):
+    """Age every running job past JOB_LEASE_SECONDS and reap it"""
+    with queue.db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE generation_jobs SET started_at = datetime('now', '-1 day') WHERE status = 'running'")
+        conn.commit()
+        cursor.close()
+        return queue.requeue_stale(conn)
+
+
+@pytest.fixture
+def reclaimed(queue, event_id):
+    """(stale job, current job): the same job claimed again after the first lease expired"""
+    queue.enqueue(event_id, 'linkedin', 'professional')
+    stale = claim(queue)
+    assert expire_leases(queue) == 1
+    current = claim(queue)
+    assert current['id'] == stale['id']
+    assert current['claimed_by'] != stale['claimed_by']
+    return stale, current
+
+
+def test_expired_worker_cannot_complete_a_reclaimed_job(queue, reclaimed):
+    stale, current = reclaimed
+    with queue.db.connection() as conn:
+        assert queue.complete(conn, stale, RESULT) is None
+    assert post_count(queue) == 0
+    row = job_row(queue, current['id'])
+    assert row['status'] == 'running'
+    assert row['claimed_by'] == current['claimed_by']
+
+    with queue.db.connection() as conn:
+        post_id = queue.complete(conn, current, RESULT)
+    assert post_count(queue) == 1
+    row = job_row(queue, current['id'])
+    assert (row['status'], row['post_id']) == ('done', post_id)
+
+
+def test_expired_worker_cannot_fail_a_reclaimed_job(queue, reclaimed):
+    stale, current = reclaimed
+    with queue.db.connection() as conn:
+        assert queue.fail(conn, stale, RuntimeError('late failure')) is False
+        assert queue.fail(conn, stale, RuntimeError('late failure'), permanent=True) is False
+    row = job_row(queue, current['id'])
+    assert row['status'] == 'running'
+    assert row['claimed_by'] == current['claimed_by']
+
+
+def test_expired_worker_cannot_settle_a_requeued_job(queue, event_id):
+    queue.enqueue(event_id, 'linkedin', 'professional')
+    stale = claim(queue)
+    expire_leases(queue)
+    with queue.db.connection() as conn:
+        assert queue.complete(conn, stale, RESULT) is None
+        assert queue.fail(conn, stale, RuntimeError('late failure')) is False
+    assert job_row(queue, stale['id'])['status'] == 'queued'
+    assert post_count(queue) == 0
+
+
+def test_claims_run_highest_priority_first(queue, event_id):
+    low = queue.enqueue(event_id, 'linkedin', 'professional', priority=0)
+    high = queue.enqueue(event_id, 'twitter', 'professional', priority=5)
+    middle = queue.enqueue(event_id, 'facebook', 'professional', priority=1)
+    also_high = queue.enqueue(event_id, 'instagram', 'professional', priority=5)
+
+    claimed = [claim(queue)['id'] for _ in range(4)]
+    assert claimed == [high, also_high, middle, low]
+    assert claim(queue) is None
+
+
+def test_concurrent_claims_never_share_a_job(queue, event_id):
+    job_ids = {queue.enqueue(event_id, 'linkedin', 'professional') for _ in range(30)}
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            job = claim(queue)
+            if job is None:
+                return
+            with lock:
+                claimed.append(job['id'])
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+
+
+def seconds_until_available(queue, job_id):
+    with queue.db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT (julianday(available_at) - julianday('now')) * 86400 FROM generation_jobs WHERE id = %s",
+            (job_id,)
+        )
+        seconds = cursor.fetchone()[0]
+        cursor.close()
+    return seconds
+
+
+def make_available(queue, job_id):
+    with queue.db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE generation_jobs SET available_at = datetime('now', '-1 second') WHERE id = %s",
+                       (job_id,))
+        conn.commit()
+        cursor.close()
+
+
+def test_failures_back_off_exponentially_then_dead_letter(queue, event_id, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_RETRY_BACKOFF', 60)
+    job_id = queue.enqueue(event_id, 'linkedin', 'professional', max_attempts=3)
+
+    for attempt, delay in ((1, 60), (2, 120)):
+        job = claim(queue)
+        assert (job['id'], job['attempts']) == (job_id, attempt)
+        with queue.db.connection() as conn:
+            assert queue.fail(conn, job, RuntimeError(f'failure {attempt}'))
+        row = job_row(queue, job_id)
+        assert (row['status'], row['claimed_by'], row['last_error']) == ('queued', None, f'failure {attempt}')
+        assert delay - 5 < seconds_until_available(queue, job_id) <= delay
+        # Not runnable until the backoff has passed
+        assert claim(queue) is None
+        make_available(queue, job_id)
+
+    job = claim(queue)
+    assert job['attempts'] == 3
+    with queue.db.connection() as conn:
+        assert queue.fail(conn, job, RuntimeError('failure 3'))
+    row = job_row(queue, job_id)
+    assert (row['status'], row['last_error']) == ('dead', 'failure 3')
+    assert claim(queue) is None
+
+
+def test_permanent_failures_dead_letter_at_once(queue, event_id):
+    job_id = queue.enqueue(event_id, 'linkedin', 'professional', max_attempts=3)
+    with queue.db.connection() as conn:
+        assert queue.fail(conn, claim(queue), RuntimeError('Event not found'), permanent=True)
+    assert job_row(queue, job_id)['status'] == 'dead'
+
+
+def test_requeue_stale_recovers_expired_leases_only(queue, event_id):
+    expired = queue.enqueue(event_id, 'linkedin', 'professional', max_attempts=2)
+    exhausted = queue.enqueue(event_id, 'twitter', 'professional', max_attempts=1)
+    claim(queue)
+    claim(queue)
+    assert expire_leases(queue) == 2
+
+    # Claimed ahead of the re-queued job
+    fresh = queue.enqueue(event_id, 'facebook', 'professional', priority=1)
+    assert claim(queue)['id'] == fresh
+    with queue.db.connection() as conn:
+        assert queue.requeue_stale(conn) == 0
+
+    assert job_row(queue, expired)['status'] == 'queued'
+    assert job_row(queue, expired)['last_error'] == 'Worker lease expired'
+    # Its lease was its last attempt
+    assert job_row(queue, exhausted)['status'] == 'dead'
+    assert job_row(queue, fresh)['status'] == 'running'
+
+
+def test_retry_requeues_a_dead_job_with_a_fresh_budget(queue, event_id):
+    job_id = queue.enqueue(event_id, 'linkedin', 'professional', max_attempts=1)
+    assert queue.retry(job_id) is False
+    with queue.db.connection() as conn:
+        queue.fail(conn, claim(queue), RuntimeError('failed'))
+    assert job_row(queue, job_id)['status'] == 'dead'
+
+    assert queue.retry(job_id) is True
+    row = job_row(queue, job_id)
+    assert (row['status'], row['attempts'], row['last_error'], row['claimed_by']) == ('queued', 0, None, None)
+    assert claim(queue)['id'] == job_id
+    assert queue.retry(job_id) is False
+
+
+def test_async_generation_is_queued_then_polled_until_done(app_module, client, event_id):
+    response = client.post('/api/generate-post', json={
+        'event_id': event_id, 'platform': 'linkedin', 'tone': 'professional', 'async': True, 'priority': 3
+    })
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    job = client.get(f'/api/jobs/{job_id}').json['job']
+    assert (job['status'], job['priority'], job['post_id']) == ('queued', 3, None)
+
+    workers = JobWorkerPool(app_module.job_queue, app_module.get_ai_generator, workers=1, poll_interval=0.05)
+    workers.start()
+    try:
+        deadline = time.monotonic() + 10
+        while job['status'] != 'done' and time.monotonic() < deadline:
+            time.sleep(0.05)
+            job = client.get(f'/api/jobs/{job_id}').json['job']
+    finally:
+        workers.stop(timeout=5)
+
+    assert job['status'] == 'done'
+    assert job['attempts'] == 1
+    assert job['content'] and job['hashtags']
+    posts = client.get(f'/api/posts?event_id={event_id}').json['posts']
+    assert [post['id'] for post in posts] == [job['post_id']]
+
+
+def test_async_generation_of_a_missing_event_is_dead_lettered(app_module, client):
+    response = client.post('/api/generate-post', json={
+        'event_id': 999, 'platform': 'linkedin', 'tone': 'professional', 'async': True
+    })
+    assert response.status_code == 202
+    with app_module.db.connection() as conn:
+        job = app_module.job_queue.claim(conn)
+    JobWorkerPool(app_module.job_queue, app_module.get_ai_generator, workers=0)._process(job)
+    job = client.get(f"/api/jobs/{response.json['job_id']}").json['job']
+    assert (job['status'], job['attempts'], job['last_error']) == ('dead', 1, 'Event not found')
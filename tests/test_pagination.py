@@ -0,0 +1,152 @@
+"""
+Keyset pagination of the list endpoints
+Cursors round-trip the sort key of a page's last row, and anything that
+is not a cursor the API issued is answered 400. Paging through rows
+that share a created_at (or date) returns each row exactly once, and
+?fields= projects only whitelisted columns plus the keys the cursor
+needs.
+"""
+import base64
+import json
+from datetime import date, datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, keyset_condition
+
+
+@pytest.mark.parametrize('values', [
+    [datetime(2026, 5, 14, 9, 30, 15), 42],
+    [date(2026, 5, 14), 7],
+    ['2026-05-14', 1],
+    [0, 0],
+])
+def test_cursor_round_trip(values):
+    cursor = encode_cursor(values)
+    # URL-safe, unpadded
+    assert cursor.replace('-', '').replace('_', '').isalnum()
+    decoded = decode_cursor(cursor, 2)
+    assert decoded[1] == values[1]
+    if isinstance(values[0], datetime):
+        assert datetime.fromisoformat(decoded[0]) == values[0]
+    elif isinstance(values[0], date):
+        assert date.fromisoformat(decoded[0]) == values[0]
+    else:
+        assert decoded[0] == values[0]
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+
+INVALID_CURSORS = [
+    'not a cursor',
+    '!!!!',
+    'é',
+    encode_cursor(['2026-05-14 09:30:00', 1])[:-3],
+    raw_cursor(['2026-05-14 09:30:00']),
+    raw_cursor(['2026-05-14 09:30:00', 1, 2]),
+    raw_cursor({'created_at': '2026-05-14', 'id': 1}),
+    raw_cursor(['2026-05-14 09:30:00', {'id': 1}]),
+    raw_cursor([['2026-05-14'], 1]),
+    raw_cursor([None, 1]),
+    raw_cursor([True, 1]),
+]
+
+
+@pytest.mark.parametrize('cursor', INVALID_CURSORS)
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+@pytest.mark.parametrize('path', ['/api/posts', '/api/events'])
+@pytest.mark.parametrize('cursor', INVALID_CURSORS)
+def test_invalid_cursors_are_answered_400(client, path, cursor):
+    response = client.get(path, query_string={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json == {'success': False, 'error': 'Invalid cursor'}
+
+
+def test_keyset_condition_expands_the_row_comparison():
+    condition, params = keyset_condition(['a', 'b'], [1, 2])
+    assert condition == '((a < %s) OR (a = %s AND b < %s))'
+    assert params == [1, 1, 2]
+
+
+def add_posts(app_module, event_id, created_at, count):
+    """Posts that all share one created_at"""
+    with app_module.db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO generated_posts (event_id, platform, tone, content, hashtags, created_at)"
+            " VALUES (%s, 'linkedin', 'professional', %s, '#AI', %s)",
+            [(event_id, f'Post {i}', created_at) for i in range(count)]
+        )
+        conn.commit()
+        cursor.close()
+
+
+def page_through(client, path, key, limit):
+    ids = []
+    cursor = None
+    for _ in range(100):
+        response = client.get(path, query_string={'limit': limit, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids.extend(row['id'] for row in response.json[key])
+        cursor = response.json['next_cursor']
+        if cursor is None:
+            return ids
+    raise AssertionError('pagination did not end')
+
+
+@pytest.mark.parametrize('limit', [1, 3, 4, 7, 50])
+def test_posts_with_equal_created_at_page_without_duplicates_or_gaps(app_module, client, event_id, limit):
+    add_posts(app_module, event_id, '2026-05-14 09:30:00', 7)
+    add_posts(app_module, event_id, '2026-05-14 09:29:59', 3)
+    add_posts(app_module, event_id, '2026-05-14 09:30:01', 2)
+
+    ids = page_through(client, '/api/posts', 'posts', limit)
+    listed = client.get('/api/posts', query_string={'limit': 100}).json['posts']
+    assert len(ids) == len(set(ids)) == 12
+    assert ids == [post['id'] for post in listed]
+    # Newest first, then highest id among equal timestamps
+    assert ids == [post['id'] for post in sorted(listed, key=lambda post: (post['created_at'], post['id']),
+                                                 reverse=True)]
+
+
+@pytest.mark.parametrize('limit', [1, 2, 5])
+def test_events_on_the_same_date_page_without_duplicates_or_gaps(client, limit):
+    created = [client.post('/api/events', json={'title': f'Event {i}', 'date': day}).json['event_id']
+               for i, day in enumerate(['2026-05-14'] * 5 + ['2026-05-15'] * 2)]
+
+    ids = page_through(client, '/api/events', 'events', limit)
+    assert sorted(ids) == sorted(created)
+    assert ids == created[5:][::-1] + created[:5][::-1]
+
+
+def test_posts_fields_projection(client, event_id, app_module):
+    add_posts(app_module, event_id, '2026-05-14 09:30:00', 2)
+    response = client.get('/api/posts', query_string={'fields': 'content,platform', 'limit': 1})
+    assert response.status_code == 200
+    post, = response.json['posts']
+    # id and created_at always come back: the next cursor is built from them
+    assert list(post) == ['id', 'created_at', 'content', 'platform']
+    assert response.json['next_cursor']
+
+
+def test_events_fields_projection(client, event_id):
+    event, = client.get('/api/events', query_string={'fields': 'title'}).json['events']
+    assert set(event) == {'id', 'date', 'title'}
+
+
+@pytest.mark.parametrize('path, fields', [
+    ('/api/posts', 'content,password'),
+    ('/api/posts', 'gp.id'),
+    ('/api/posts', 'id; DROP TABLE events'),
+    ('/api/events', 'title,fingerprint'),
+])
+def test_unknown_fields_are_answered_400(client, path, fields):
+    response = client.get(path, query_string={'fields': fields})
+    assert response.status_code == 400
+    assert response.json['error'].startswith('Unknown field(s)')
@@ -0,0 +1,142 @@
+"""
+Rate limiting against a rate-limited fake OpenAI server
+tools/fake_openai_server.py answers 429 with Retry-After once more
+requests arrive than its RPM limit allows. These tests check that the
+client-side limiter keeps a burst of generations under that limit, and
+that a 429 that does get through is waited out and retried instead of
+failing the generation or turning it into a template fallback.
+"""
+import threading
+import time
+
+import openai
+import pytest
+
+from ai_generator import AIGenerator
+from config import Config
+from tools.fake_openai_server import REPLY, start_server
+
+# Posts from the fake API contain this; template fallbacks don't
+FAKE_CONTENT = REPLY.split('CONTENT:', 1)[1].split('!', 1)[0].strip()
+
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def configure(monkeypatch, server):
+    """Point the generator at the fake server with the given limits"""
+    def configure(rpm_limit=0, max_retries=0, server_rpm=0, server_window=1.0):
+        server.rpm_limit = server_rpm
+        server.rate_window = server_window
+        host, port = server.server_address[:2]
+        for name, value in {
+            'OPENAI_API_KEY': 'test',
+            'OPENAI_BASE_URL': f'http://{host}:{port}/v1',
+            'OPENAI_MAX_RETRIES': max_retries,
+            'GENERATION_CACHE_BACKEND': 'none',
+            'OPENAI_RATE_LIMIT_BACKEND': 'memory' if rpm_limit else 'none',
+            'OPENAI_RPM_LIMIT': rpm_limit,
+            'OPENAI_TPM_LIMIT': 0,
+            'OPENAI_RATE_LIMIT_MAX_WAIT': 30,
+        }.items():
+            monkeypatch.setattr(Config, name, value)
+        generator = AIGenerator()
+        generators.append(generator)
+        return generator
+
+    generators = []
+    yield configure
+    for generator in generators:
+        generator.close()
+
+
+def event(index):
+    return {'title': f'Event {index}', 'date': '2026-05-14', 'location': 'Berlin',
+            'type': 'Conference', 'description': 'Talks and workshops.'}
+
+
+def burst(generator, count):
+    """Run `count` strict generations at once; returns (results, errors, seconds)"""
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def generate(index):
+        try:
+            result = generator.generate_post(event(index), 'linkedin', 'professional', strict=True)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        else:
+            with lock:
+                results.append(result)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=generate, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors, time.monotonic() - started
+
+
+def test_limiter_keeps_a_burst_under_the_server_limit(configure, server):
+    # The limiter sends 2 requests per second after a burst of 2, so at
+    # most 4 in any second; the server allows 5, and the SDK may not retry
+    generator = configure(rpm_limit=120, server_rpm=300, server_window=1.0)
+    results, errors, seconds = burst(generator, 8)
+
+    assert errors == []
+    assert server.rate_limited == 0
+    assert all(FAKE_CONTENT in result['content'] for result in results)
+    # 6 requests beyond the burst at 2 per second
+    assert seconds >= 2.5
+    stats = generator.rate_limit_stats()
+    assert stats['reserved'] == 8
+    assert stats['delayed'] == 6
+
+
+def test_without_the_limiter_the_same_burst_is_rate_limited(configure, server):
+    generator = configure(server_rpm=300, server_window=1.0)
+    _, errors, _ = burst(generator, 8)
+
+    assert server.rate_limited > 0
+    assert len(errors) == server.rate_limited
+
+
+def test_429_with_retry_after_is_waited_out_and_retried(configure, server):
+    # Twice as many requests as the server allows in a window: the excess
+    # is answered 429 and retried after Retry-After by the SDK
+    generator = configure(max_retries=5, server_rpm=120, server_window=1.0)
+    results, errors, seconds = burst(generator, 4)
+
+    assert errors == []
+    assert server.rate_limited > 0
+    assert len(results) == 4
+    assert all(FAKE_CONTENT in result['content'] for result in results)
+    # The retried requests waited for the window to move on
+    assert seconds >= 0.9
+    assert server.request_count == 4 + server.rate_limited
+
+
+def test_429_after_retries_holds_back_later_requests(configure, server):
+    # The limiter allows more than the server does, so the second request
+    # gets a 429; with no SDK retries left it reaches the limiter, which
+    # keeps the next caller waiting for Retry-After
+    generator = configure(rpm_limit=6000, server_rpm=60, server_window=1.0)
+    assert FAKE_CONTENT in generator.generate_post(event(0), 'linkedin', 'professional', strict=True)['content']
+    with pytest.raises(openai.RateLimitError):
+        generator.generate_post(event(1), 'linkedin', 'professional', strict=True)
+    assert generator.rate_limit_stats()['throttled'] == 1
+
+    started = time.monotonic()
+    result = generator.generate_post(event(2), 'linkedin', 'professional', strict=True)
+    assert FAKE_CONTENT in result['content']
+    assert time.monotonic() - started >= 0.5
+    assert server.rate_limited == 1
@@ -0,0 +1,222 @@
+"""
+Repositories on the SQLite backend
+run_migrations builds the schema on a temporary file, and the event and
+post repositories run their MySQL-style queries through sqlite_backend
+(%s placeholders rewritten to ?). Every write bumps table_versions for
+the tables it changed.
+"""
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+
+import sqlite_backend
+from pagination import decode_cursor
+from migrations import LATEST_VERSION, run_migrations, schema_version
+from repositories import EventRepository, PostRepository, VersionRepository
+
+EVENT = {'title': 'AI Summit', 'date': '2026-05-14', 'location': 'Berlin',
+         'type': 'Conference', 'description': 'Talks and workshops.'}
+
+RESULT = {'content': 'Join us in Berlin!', 'hashtags': '#AI #Berlin'}
+
+
+@pytest.fixture
+def context(db):
+    """An app context whose request connection goes back to the pool afterwards"""
+    app = Flask(__name__)
+    db.init_app(app)
+    with app.app_context():
+        yield
+    assert db.pool_stats()['in_use'] == 0
+
+
+@pytest.fixture
+def events(db, context):
+    return EventRepository(db)
+
+
+@pytest.fixture
+def posts(db, context):
+    return PostRepository(db)
+
+
+@pytest.fixture
+def versions(db, context):
+    return VersionRepository(db)
+
+
+def rows(db, query, params=()):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        result = cursor.fetchall()
+        cursor.close()
+    return result
+
+
+def test_migrations_build_the_schema_once(tmp_path):
+    conn = sqlite_backend.connect(str(tmp_path / 'fresh.sqlite3'))
+    applied = run_migrations(conn, backend='sqlite')
+    assert applied == list(range(1, LATEST_VERSION + 1))
+    assert schema_version(conn) == LATEST_VERSION
+    assert run_migrations(conn, backend='sqlite') == []
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT table_name, version FROM table_versions ORDER BY table_name")
+    assert cursor.fetchall() == [('events', 0), ('generated_posts', 0)]
+    cursor.close()
+    conn.close()
+
+
+def test_placeholders_are_rewritten_only_with_parameters(db):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT strftime('%s', '2026-01-01')")
+        assert cursor.fetchone() == ('1767225600',)
+        cursor.execute("SELECT %s || '-' || %s", ('a', 'b'))
+        assert cursor.fetchone() == ('a-b',)
+        cursor.close()
+
+
+def test_event_crud(db, events, versions):
+    event_id = events.create(EVENT)
+    event = events.get(event_id)
+    assert event['title'] == 'AI Summit'
+    # DATE and TIMESTAMP columns come back typed, as from MySQL
+    assert event['date'] == date(2026, 5, 14)
+    assert isinstance(event['created_at'], datetime)
+    assert versions.get(['events'])['events'][0] == 1
+
+    events.update(event_id, dict(EVENT, title='ML Summit', type='Workshop'))
+    assert events.get(event_id)['title'] == 'ML Summit'
+    assert events.get(event_id)['type'] == 'Workshop'
+
+    events.delete(event_id)
+    assert events.get(event_id) is None
+    assert events.get(12345) is None
+
+
+def test_get_many_returns_only_existing_events(events):
+    ids = [events.create(dict(EVENT, title=f'Event {i}')) for i in range(3)]
+    found = events.get_many([ids[0], ids[2], 999])
+    assert sorted(event['id'] for event in found) == [ids[0], ids[2]]
+    assert events.get_many([]) == []
+
+
+def test_insert_batch_writes_every_row_in_one_transaction(db, events, versions):
+    batch = [(f'Event {i}', '2026-05-14', 'Berlin', 'Conference', '') for i in range(5)]
+    with db.connection() as conn:
+        assert events.insert_batch(conn, batch) == 5
+    assert rows(db, "SELECT COUNT(*) FROM events") == [(5,)]
+    # One version bump for the whole batch
+    assert versions.get(['events'])['events'][0] == 1
+
+
+def test_insert_batch_rolls_back_on_error(db, events):
+    batch = [('Good', '2026-05-14', '', '', ''), (None, '2026-05-14', '', '', '')]
+    with db.connection() as conn:
+        with pytest.raises(Exception):
+            events.insert_batch(conn, batch)
+    assert rows(db, "SELECT COUNT(*) FROM events") == [(0,)]
+
+
+def test_deleting_an_event_deletes_its_posts(db, events, posts):
+    event_id = events.create(EVENT)
+    posts.create(event_id, 'linkedin', 'professional', RESULT)
+    events.delete(event_id)
+    assert rows(db, "SELECT COUNT(*) FROM generated_posts") == [(0,)]
+
+
+def test_create_for_platforms_saves_every_platform(db, events, posts, versions):
+    event_id = events.create(EVENT)
+    results = {'linkedin': RESULT, 'twitter': dict(RESULT, content='Short post')}
+    post_ids = posts.create_for_platforms(event_id, 'casual', results, {'linkedin': 'f1', 'twitter': 'f2'})
+
+    assert set(post_ids) == {'linkedin', 'twitter'}
+    stored = rows(db, "SELECT id, platform, tone, fingerprint, status FROM generated_posts ORDER BY id")
+    assert stored == [(post_ids['linkedin'], 'linkedin', 'casual', 'f1', 'draft'),
+                      (post_ids['twitter'], 'twitter', 'casual', 'f2', 'draft')]
+    assert versions.get(['generated_posts'])['generated_posts'][0] == 1
+
+
+def test_find_draft_returns_the_newest_draft_with_the_fingerprint(events, posts):
+    event_id = events.create(EVENT)
+    other_event = events.create(EVENT)
+    posts.create(event_id, 'linkedin', 'professional', RESULT, 'fp')
+    newest = posts.create(event_id, 'linkedin', 'professional', dict(RESULT, content='Newer'), 'fp')
+    posts.create(other_event, 'linkedin', 'professional', RESULT, 'other')
+
+    assert posts.find_draft(event_id, 'fp') == {'id': newest, 'content': 'Newer', 'hashtags': '#AI #Berlin'}
+    assert posts.find_draft(event_id, 'missing') is None
+    # Another event's draft is never reused
+    assert posts.find_draft(event_id, 'other') is None
+
+    # Only drafts are reused
+    posts.update_status(newest, 'approved')
+    assert posts.find_draft(event_id, 'fp')['id'] != newest
+
+
+def test_update_status(db, events, posts, versions):
+    post_id = posts.create(events.create(EVENT), 'linkedin', 'professional', RESULT)
+    before = versions.get(['generated_posts'])['generated_posts'][0]
+
+    posts.update_status(post_id, 'posted')
+    assert rows(db, "SELECT status FROM generated_posts WHERE id = %s", (post_id,)) == [('posted',)]
+    assert versions.get(['generated_posts'])['generated_posts'][0] == before + 1
+
+    # No row changed, no version bump
+    posts.update_status(999, 'posted')
+    assert versions.get(['generated_posts'])['generated_posts'][0] == before + 1
+
+
+def test_merge_drafts_deletes_duplicates_and_repoints_jobs(db, events, posts):
+    event_id = events.create(EVENT)
+    kept = posts.create(event_id, 'linkedin', 'professional', RESULT, 'fp')
+    duplicate = posts.create(event_id, 'linkedin', 'professional', RESULT, 'fp')
+    other = posts.create(event_id, 'twitter', 'professional', RESULT, 'fp2')
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO generation_jobs (event_id, platform, tone, status, post_id) VALUES (%s, %s, %s, 'done', %s)",
+            [(event_id, 'linkedin', 'professional', duplicate), (event_id, 'twitter', 'professional', other)]
+        )
+        conn.commit()
+        cursor.close()
+
+    with db.connection() as conn:
+        assert posts.merge_drafts(conn, {duplicate: kept}) == 1
+
+    assert rows(db, "SELECT id FROM generated_posts ORDER BY id") == [(kept,), (other,)]
+    assert rows(db, "SELECT post_id FROM generation_jobs ORDER BY id") == [(kept,), (other,)]
+
+
+def test_list_filters_and_pages(events, posts):
+    event_id = events.create(EVENT)
+    ids = [posts.create(event_id, platform, 'professional', RESULT)
+           for platform in ('linkedin', 'twitter', 'linkedin')]
+
+    page, cursor = posts.list(2, platform='linkedin')
+    assert [post['id'] for post in page] == [ids[2], ids[0]]
+    assert cursor is None
+    assert page[0]['event_title'] == 'AI Summit'
+
+    page, cursor = posts.list(1, fields=('id', 'platform', 'created_at'))
+    assert [(post['id'], post['platform']) for post in page] == [(ids[2], 'linkedin')]
+    page, _ = posts.list(5, fields=('id', 'created_at'), after=decode_cursor(cursor, 2))
+    assert [post['id'] for post in page] == [ids[1], ids[0]]
+
+
+def test_writes_bump_only_the_tables_they_change(events, posts, versions):
+    def current():
+        return {table: version for table, (version, _) in versions.get(['events', 'generated_posts']).items()}
+
+    assert current() == {'events': 0, 'generated_posts': 0}
+    event_id = events.create(EVENT)
+    assert current() == {'events': 1, 'generated_posts': 0}
+    posts.create(event_id, 'linkedin', 'professional', RESULT)
+    assert current() == {'events': 1, 'generated_posts': 1}
+    # Post listings show the event title, so an event update touches both
+    events.update(event_id, EVENT)
+    assert current() == {'events': 2, 'generated_posts': 2}
+    assert versions.get(['events'])['events'][1] > 0
@@ -0,0 +1,180 @@
+"""
+Property tests for response_parser
+Random responses are assembled from fragments that stress the parser
+(markers in every case and split across chunks, multi-codepoint emoji,
+combining marks, URLs) and checked against the parser's invariants: a
+streamed parse equals the whole-text parse wherever the chunks are cut,
+hashtags are unique, well-formed and capped, truncation never splits a
+grapheme, and finished posts fit their platform. Every case is seeded, so
+a failure reproduces from the test id.
+"""
+import random
+
+import pytest
+
+from ai_generator import AIGenerator
+from response_parser import (
+    DEFAULT_MAX_HASHTAGS, ELLIPSIS, HASHTAG_SEPARATOR, MAX_HASHTAGS, PLATFORM_LIMITS,
+    StreamingResponseParser, enforce_platform_limits, graphemes, normalize_hashtags,
+    parse_response, text_length, truncate
+)
+
+PLATFORMS = list(PLATFORM_LIMITS) + ['mastodon']
+
+SEEDS = range(200)
+
+FRAGMENTS = [
+    'CONTENT:', 'content:', 'Content: ', 'HASHTAGS:', 'hashtags:', 'HASH', 'TAGS:', '\n', '\n\n', '\r\n',
+    ' ', '. ', '! ', '? ', ', ', 'word', 'Event', 'summit', 'ß', 'é', 'é', '日本語', 'Привет',
+    '🎉', '👍🏽', '👨‍👩‍👧', '🇩🇪', '1️⃣', '❤️', '#tag', '#Tag', '#TAG', '#123',
+    '#_', '#a,#b', '#new-year', 'https://example.com/some/long/path', '…', '\t', '—',
+]
+
+RESPONSE = (
+    "Here is your post:\n\nContent:\n✨ AI Summit 2026 ✨\n\n📅 May 14\n📍 Berlin\n\n"
+    + "Two days of talks and workshops on applied machine learning. " * 8
+    + "\n\nHashtags: \n#AI #MachineLearning #ai #Berlin, #Tech! #Summit2026 #Event #Community\n"
+)
+
+
+def random_text(rng, pieces):
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(pieces))
+
+
+def random_chunks(rng, text):
+    chunks = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+def stream(chunks):
+    parser = StreamingResponseParser()
+    deltas = []
+    for chunk in chunks:
+        deltas.extend(parser.feed(chunk))
+    return deltas, parser.finish()
+
+
+def streamed_content(deltas):
+    return ''.join(text for section, text in deltas if section == 'content')
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_chunked_parse_matches_whole_parse(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 400))
+    _, result = stream(random_chunks(rng, text))
+    assert result == parse_response(text)
+
+
+@pytest.mark.parametrize('size', range(1, 20))
+def test_every_chunk_size_gives_the_same_parse(size):
+    chunks = [RESPONSE[i:i + size] for i in range(0, len(RESPONSE), size)]
+    deltas, result = stream(chunks)
+    assert result == parse_response(RESPONSE)
+    # Content deltas never include a marker, even one cut across chunks
+    assert 'hashtags:' not in streamed_content(deltas).lower()
+
+
+def test_single_character_chunks():
+    deltas, (content, hashtags, _) = stream(list(RESPONSE))
+    assert content.startswith('✨ AI Summit 2026 ✨')
+    assert 'content:' not in streamed_content(deltas).lower()
+    assert '#AI' in hashtags
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_graphemes_partition_the_text(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 200))
+    assert ''.join(graphemes(text)) == text
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('👨‍👩‍👧', ['👨‍👩‍👧']),
+    ('🇩🇪🇫🇷', ['🇩🇪', '🇫🇷']),
+    ('👍🏽!', ['👍🏽', '!']),
+    ('éx', ['é', 'x']),
+    ('1️⃣', ['1️⃣']),
+])
+def test_graphemes_keep_clusters_together(text, expected):
+    assert graphemes(text) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('platform', PLATFORMS)
+def test_hashtags_are_unique_well_formed_and_capped(seed, platform):
+    rng = random.Random(seed)
+    _, hashtags, _ = parse_response(random_text(rng, rng.randint(0, 400)))
+    tags = normalize_hashtags(hashtags, platform)
+    assert len(tags) <= MAX_HASHTAGS.get(platform, DEFAULT_MAX_HASHTAGS)
+    assert len({tag.casefold() for tag in tags}) == len(tags)
+    assert all(tag.startswith('#') and tag[1:].replace('_', 'a').isalnum() for tag in tags)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('platform', PLATFORMS)
+def test_truncation_fits_and_keeps_whole_graphemes(seed, platform):
+    rng = random.Random(seed)
+    text = random_text(rng, rng.randint(0, 200))
+    budget = rng.randint(0, 400)
+    cut = truncate(text, budget, platform)
+
+    assert text_length(cut, platform) <= budget
+    if text_length(text, platform) <= budget:
+        assert cut == text
+    else:
+        prefix = cut[:-len(ELLIPSIS)] if cut.endswith(ELLIPSIS) and not text.startswith(cut) else cut
+        assert text.startswith(prefix)
+        assert graphemes(prefix) == graphemes(text)[:len(graphemes(prefix))]
+
+
+@pytest.mark.parametrize('budget', range(0, 12))
+def test_truncation_never_splits_an_emoji_sequence(budget):
+    text = 'ab👨‍👩‍👧🇩🇪👍🏽 cd'
+    cut = truncate(text, budget, 'linkedin')
+    kept = cut[:-len(ELLIPSIS)] if cut.endswith(ELLIPSIS) else cut
+    assert text.startswith(kept)
+    assert graphemes(kept) == graphemes(text)[:len(graphemes(kept))]
+
+
+def test_twitter_counts_urls_as_23_characters():
+    url = 'https://example.com/' + 'a' * 100
+    assert text_length(url, 'twitter') == 23
+    assert text_length(url, 'linkedin') == len(url)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('platform', PLATFORMS)
+def test_finished_posts_fit_the_platform(seed, platform):
+    rng = random.Random(seed)
+    content, hashtags, _ = parse_response(random_text(rng, rng.randint(0, 600)))
+    content, hashtags = enforce_platform_limits(content, hashtags, platform)
+    limit = PLATFORM_LIMITS.get(platform)
+    if limit is not None:
+        total = text_length(content, platform)
+        if hashtags:
+            total += text_length(HASHTAG_SEPARATOR + hashtags, platform)
+        assert total <= limit
+
+
+@pytest.mark.parametrize('platform, limit', PLATFORM_LIMITS.items())
+def test_long_posts_are_cut_to_the_platform_limit(platform, limit):
+    content, hashtags = enforce_platform_limits('word ' * 2000, ['#a', '#b', '#c'], platform)
+    assert text_length(content + HASHTAG_SEPARATOR + hashtags, platform) <= limit
+    assert content.endswith(ELLIPSIS)
+    assert hashtags.startswith('#a')
+
+
+@pytest.mark.parametrize('text', [None, '', '   \n'])
+def test_empty_model_reply_gets_the_default_hashtags(text):
+    # message.content is None when the model returns no text
+    generator = AIGenerator()
+    event_data = {'title': 'AI Summit', 'type': 'Conference'}
+    content, hashtags = generator._parse_response(text, event_data, 'linkedin')
+    assert content == ''
+    assert hashtags == generator.templates.default_hashtags('linkedin')
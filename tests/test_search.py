@@ -0,0 +1,170 @@
+"""
+Full-text search
+Queries are split into lower-cased word terms, turned into a MySQL
+boolean or an FTS5 query that cannot smuggle in operators, and hits come
+back with <mark>ed, escaped snippets. /api/search runs against the FTS5
+tables of the SQLite backend, kept in sync by triggers.
+"""
+import pytest
+
+from search import MAX_TERMS, highlighter, match_query, normalize_scores, parse_terms, snippet
+
+
+@pytest.mark.parametrize('query, terms', [
+    ('AI Summit', ['ai', 'summit']),
+    ('  summit, SUMMIT; ai!', ['summit', 'ai']),
+    ('"NOT" OR title:x*', ['not', 'or', 'title', 'x']),
+    ('Café München', ['café', 'münchen']),
+    ('', []),
+    (None, []),
+    ('+-*()"', []),
+])
+def test_parse_terms(query, terms):
+    assert parse_terms(query) == terms
+
+
+def test_parse_terms_is_capped():
+    assert parse_terms(' '.join(f'word{i}' for i in range(20))) == [f'word{i}' for i in range(MAX_TERMS)]
+
+
+def test_sqlite_query_quotes_every_term():
+    assert match_query(['ai', 'not', 'near'], 'sqlite') == '"ai"* "not"* "near"*'
+    assert match_query([], 'sqlite') is None
+
+
+@pytest.mark.parametrize('terms', [['NOT'], ['summit', 'AND'], ['NEAR', 'berlin'], ['OR']])
+def test_sqlite_query_runs_operator_words_as_terms(db, terms):
+    # Unquoted, each of these is an FTS5 syntax error
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM events_fts WHERE events_fts MATCH %s", (match_query(terms, 'sqlite'),))
+        assert cursor.fetchone() == (0,)
+        cursor.close()
+
+
+def test_mysql_query_requires_indexed_terms():
+    assert match_query(['summit', 'berlin'], 'mysql') == '+summit* +berlin*'
+    # Too short or a stopword: InnoDB never indexed them
+    assert match_query(['ai', 'the', 'summit'], 'mysql') == '+summit*'
+    assert match_query(['ai', 'of'], 'mysql') is None
+
+
+def test_snippet_marks_word_prefixes_and_escapes_the_rest():
+    pattern = highlighter(['summ', 'ai'])
+    assert snippet('AI <b>Summit</b> & Summary; said', pattern) == (
+        '<mark>AI</mark> &lt;b&gt;<mark>Summit</mark>&lt;/b&gt; &amp; <mark>Summary</mark>; said'
+    )
+    assert snippet('', pattern) == ''
+    assert snippet(None, pattern) == ''
+
+
+def test_highlighter_escapes_regex_characters():
+    pattern = highlighter(['a.b'])
+    assert pattern.findall('a.b axb') == ['a.b']
+
+
+def test_long_snippet_is_cut_around_the_first_match_at_word_boundaries():
+    text = ' '.join(['filler'] * 100) + ' summit ' + ' '.join(['tail'] * 100)
+    result = snippet(text, highlighter(['summit']), length=80)
+    assert result.startswith('…filler') and result.endswith('tail…')
+    assert '<mark>summit</mark>' in result
+    body = result.strip('…').replace('<mark>', '').replace('</mark>', '')
+    assert len(body) <= 80
+    assert body in text
+
+
+def test_normalize_scores():
+    hits = normalize_scores([{'score': 8}, {'score': 2}, {'score': 2}])
+    assert [hit['score'] for hit in hits] == [1.0, 0.25, 0.25]
+    assert [hit['relevance'] for hit in hits] == [8.0, 2.0, 2.0]
+    assert [hit['rank'] for hit in hits] == [0, 1, 2]
+    assert normalize_scores([]) == []
+    assert normalize_scores([{'score': 0}])[0]['score'] == 1.0
+
+
+def add_post(app_module, event_id, content, hashtags='#AI', status='draft'):
+    with app_module.db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO generated_posts (event_id, platform, tone, content, hashtags, status)"
+            " VALUES (%s, 'linkedin', 'professional', %s, %s, %s)",
+            (event_id, content, hashtags, status)
+        )
+        post_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+    return post_id
+
+
+def search(client, **params):
+    response = client.get('/api/search', query_string=params)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_search_finds_events_and_posts(client, app_module, event_id):
+    post_id = add_post(app_module, event_id, 'See you at the <summit> in Berlin', '#Summit')
+    add_post(app_module, event_id, 'Unrelated post')
+
+    result = search(client, q='summ')
+    assert result['query'] == 'summ'
+    found = {(hit['type'], hit['id']): hit for hit in result['results']}
+    assert set(found) == {('event', event_id), ('post', post_id)}
+
+    event = found[('event', event_id)]
+    assert event['highlights']['title'] == 'AI <mark>Summit</mark>'
+    post = found[('post', post_id)]
+    assert post['highlights']['content'] == 'See you at the &lt;<mark>summit</mark>&gt; in Berlin'
+    assert post['highlights']['hashtags'] == '#<mark>Summit</mark>'
+    # The best hit of each kind scores 1.0
+    assert event['score'] == post['score'] == 1.0
+
+
+def test_search_requires_every_term(client, app_module, event_id):
+    add_post(app_module, event_id, 'Berlin workshop')
+    assert [hit['type'] for hit in search(client, q='berlin workshop')['results']] == ['post']
+    assert search(client, q='berlin nowhere')['results'] == []
+
+
+@pytest.mark.parametrize('query', ['NOT', 'summit NOT berlin', 'summit OR', 'NEAR(summit berlin)',
+                                   'title:summit', '"summit', 'summit*', '^summit'])
+def test_fts_operators_in_the_query_are_plain_words(client, event_id, query):
+    # Each of these is an FTS5 syntax error or operator if passed through
+    response = client.get('/api/search', query_string={'q': query})
+    assert response.status_code == 200
+    assert response.json['success']
+
+
+def test_index_follows_updates_and_deletes(client, event_id):
+    assert search(client, q='summit', type='events')['results']
+    client.put(f'/api/events/{event_id}', json={'title': 'Data Day', 'date': '2026-05-14'})
+    assert search(client, q='summit', type='events')['results'] == []
+    assert [hit['id'] for hit in search(client, q='data', type='events')['results']] == [event_id]
+
+    client.delete(f'/api/events/{event_id}')
+    assert search(client, q='data')['results'] == []
+
+
+def test_post_filters_and_paging(client, app_module, event_id):
+    ids = [add_post(app_module, event_id, f'Workshop number {i}') for i in range(5)]
+    add_post(app_module, event_id, 'Approved workshop', status='approved')
+
+    found = []
+    cursor = None
+    for _ in range(10):
+        result = search(client, q='workshop', status='draft', limit=2, **({'cursor': cursor} if cursor else {}))
+        found.extend(hit['id'] for hit in result['results'])
+        cursor = result['next_cursor']
+        if cursor is None:
+            break
+    assert sorted(found) == ids
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'q': '!!!'},
+    {'q': 'summit', 'type': 'hashtags'},
+    {'q': 'summit', 'cursor': 'not a cursor'},
+])
+def test_invalid_search_is_answered_400(client, params):
+    assert client.get('/api/search', query_string=params).status_code == 400
@@ -0,0 +1,206 @@
+"""
+JSON encoding and compression of API responses
+FastJSONProvider writes dates, datetimes and Decimals the way the handlers
+and Flask's default provider did before, gzip (or brotli) is negotiated
+through Accept-Encoding, small and server-sent bodies are left alone,
+streamed bodies are compressed chunk by chunk, and ?format=ndjson
+streams listings one row per line.
+"""
+import gzip
+import json
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import serialization
+from config import Config
+from serialization import ENCODINGS, FastJSONProvider, dumps, ndjson_chunks
+
+
+@pytest.fixture
+def legacy():
+    """Flask's default provider, which encoded responses before"""
+    return DefaultJSONProvider(Flask('legacy'))
+
+
+@pytest.mark.parametrize('value', [
+    datetime(2026, 5, 14, 9, 30),
+    datetime(2026, 5, 14, 9, 30, 15, 123456),
+    datetime(2026, 5, 14, 9, 30, tzinfo=timezone(timedelta(hours=2))),
+])
+def test_datetimes_are_written_like_the_old_isoformat_loop(value):
+    assert json.loads(dumps({'created_at': value})) == {'created_at': value.isoformat()}
+
+
+def test_dates_are_written_like_the_old_strftime_loop():
+    value = date(2026, 5, 4)
+    assert json.loads(dumps({'date': value})) == {'date': value.strftime('%Y-%m-%d')}
+
+
+@pytest.mark.parametrize('value', [Decimal('1.10'), Decimal('12345678901234567890.5'), Decimal('-0')])
+def test_decimals_match_the_default_provider(legacy, value):
+    assert json.loads(dumps({'score': value})) == json.loads(legacy.dumps({'score': value}))
+
+
+def test_rows_keep_their_column_order_and_text(legacy):
+    row = {'id': 2, 'title': 'Café — München ✨', 'tags': None, 'active': True, 'ratio': 0.5}
+    assert list(json.loads(dumps(row))) == list(row)
+    assert dumps(row).decode('utf-8') == json.dumps(row, ensure_ascii=False, separators=(',', ':'))
+    assert json.loads(dumps(row)) == json.loads(legacy.dumps(row))
+
+
+def test_sets_are_lists_and_unknown_types_fail():
+    assert json.loads(dumps({'tags': {'#AI'}})) == {'tags': ['#AI']}
+    with pytest.raises(TypeError):
+        dumps({'value': object()})
+
+
+def test_provider_dumps_loads_and_extra_arguments():
+    provider = FastJSONProvider(Flask('fast'))
+    value = {'b': date(2026, 5, 14), 'a': Decimal('2.5')}
+    assert provider.dumps(value) == '{"b":"2026-05-14","a":"2.5"}'
+    # Arguments the fast encoder doesn't take go to the stdlib one
+    assert provider.dumps(value, sort_keys=True) == '{"a": "2.5", "b": "2026-05-14"}'
+    assert provider.loads('{"a": 1}') == {'a': 1}
+    assert provider.loads('{"a": 1.5}', parse_float=Decimal) == {'a': Decimal('1.5')}
+
+
+def test_ndjson_chunks_write_one_line_per_row():
+    chunks = list(ndjson_chunks([[{'id': 2}, {'id': 1}], [], [{'id': 0, 'date': date(2026, 5, 14)}]]))
+    assert chunks == [b'{"id":2}\n{"id":1}\n', b'', b'{"id":0,"date":"2026-05-14"}\n']
+
+
+def test_api_rows_are_written_like_before(client, app_module, event_id):
+    event = client.get(f'/api/events/{event_id}').json['event']
+    with app_module.app.app_context():
+        stored = app_module.events_repo.get(event_id)
+    assert event['date'] == stored['date'].strftime('%Y-%m-%d')
+    assert event['created_at'] == stored['created_at'].isoformat()
+
+
+def decode(response):
+    encoding = response.headers.get('Content-Encoding')
+    if encoding == 'gzip':
+        return gzip.decompress(response.data)
+    if encoding == 'br':
+        return serialization.brotli.decompress(response.data)
+    assert encoding is None
+    return response.data
+
+
+@pytest.fixture
+def compress_all(monkeypatch):
+    monkeypatch.setattr(Config, 'RESPONSE_COMPRESSION_MIN_BYTES', 0)
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip', 'gzip'),
+    ('gzip, deflate', 'gzip'),
+    ('br;q=1.0, gzip;q=0.5', 'br' if 'br' in ENCODINGS else 'gzip'),
+    ('br', 'br' if 'br' in ENCODINGS else None),
+    ('*', ENCODINGS[0]),
+    ('deflate', None),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('', None),
+])
+def test_encoding_is_negotiated(client, event_id, compress_all, accept, expected):
+    response = client.get(f'/api/events/{event_id}', headers={'Accept-Encoding': accept})
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == expected
+    assert 'Accept-Encoding' in response.vary
+    assert json.loads(decode(response))['event']['id'] == event_id
+
+
+def test_compression_can_be_turned_off(client, event_id, compress_all, monkeypatch):
+    monkeypatch.setattr(Config, 'RESPONSE_COMPRESSION', False)
+    response = client.get(f'/api/events/{event_id}', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_small_and_error_responses_are_not_compressed(client, event_id):
+    response = client.get(f'/api/events/{event_id}', headers={'Accept-Encoding': 'gzip'})
+    assert len(response.data) < Config.RESPONSE_COMPRESSION_MIN_BYTES
+    assert 'Content-Encoding' not in response.headers
+
+    response = client.get('/api/events/999999', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 404
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_large_responses_are_compressed(client, event_id):
+    client.put(f'/api/events/{event_id}', json={'title': 'AI Summit', 'date': '2026-05-14',
+                                                'description': 'Talks and workshops. ' * 100})
+    response = client.get(f'/api/events/{event_id}', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.data) < len(decode(response))
+
+
+def add_events(client, count):
+    return [client.post('/api/events', json={'title': f'Event {i}', 'date': f'2026-05-{i + 1:02d}'}).json['event_id']
+            for i in range(count)]
+
+
+def test_streamed_listing_is_compressed_chunk_by_chunk(client, monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_BATCH_SIZE', 2)
+    ids = add_events(client, 5)
+    response = client.get('/api/events?format=ndjson', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+
+    # Every batch is flushed, so each chunk decodes on its own
+    decompressor = zlib.decompressobj(31)
+    parts = [decompressor.decompress(chunk) for chunk in response.response]
+    response.close()
+    assert [part.count(b'\n') for part in parts if part] == [2, 2, 1]
+    assert [json.loads(line)['id'] for line in b''.join(parts).splitlines()] == ids[::-1]
+
+
+def test_server_sent_events_are_not_compressed(client, event_id):
+    response = client.post('/api/generate-post/stream', headers={'Accept-Encoding': 'gzip'},
+                           json={'event_id': event_id, 'platform': 'linkedin', 'tone': 'casual'})
+    assert response.mimetype == 'text/event-stream'
+    assert 'Content-Encoding' not in response.headers
+    assert b'event: done' in response.data
+
+
+@pytest.mark.parametrize('headers, query', [
+    ({}, {'format': 'ndjson'}),
+    ({'Accept': 'application/x-ndjson'}, {}),
+])
+def test_events_ndjson_listing(client, headers, query):
+    ids = add_events(client, 3)
+    response = client.get('/api/events', headers=headers, query_string=query)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['id'] for row in rows] == ids[::-1]
+    assert rows[0]['date'] == '2026-05-03'
+
+
+def test_ndjson_listing_ignores_the_page_limit_but_honours_cursor_and_fields(client, monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_BATCH_SIZE', 2)
+    ids = add_events(client, 5)
+    page = client.get('/api/events', query_string={'limit': 2}).json
+    response = client.get('/api/events', query_string={'format': 'ndjson', 'limit': 2, 'fields': 'title',
+                                                       'cursor': page['next_cursor']})
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['id'] for row in rows] == ids[2::-1]
+    assert set(rows[0]) == {'id', 'date', 'title'}
+
+    assert client.get('/api/events', query_string={'format': 'ndjson', 'cursor': 'bad'}).status_code == 400
+
+
+def test_posts_ndjson_listing(client, event_id):
+    for platform in ('linkedin', 'twitter'):
+        client.post('/api/generate-post', json={'event_id': event_id, 'platform': platform, 'tone': 'casual'})
+    response = client.get('/api/posts', query_string={'format': 'ndjson', 'platform': 'twitter'})
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['platform'] for row in rows] == ['twitter']
+    assert rows[0]['event_title'] == 'AI Summit'
+    assert datetime.fromisoformat(rows[0]['created_at'])
@@ -0,0 +1,82 @@
+"""
+Streamed generations against the fake OpenAI server
+The stream asks for token usage, which arrives in a last chunk without
+choices, and the upstream response is closed as soon as the consumer
+stops reading (a client that disconnected mid-post).
+"""
+import pytest
+
+from ai_generator import AIGenerator
+from config import Config
+from metrics import OPENAI_TOKENS
+from tools.fake_openai_server import start_server
+
+
+@pytest.fixture
+def server():
+    server = start_server(chunk_delay=0.01)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def generator(monkeypatch, server):
+    host, port = server.server_address[:2]
+    for name, value in {
+        'OPENAI_API_KEY': 'test',
+        'OPENAI_BASE_URL': f'http://{host}:{port}/v1',
+        'OPENAI_MAX_RETRIES': 0,
+        'OPENAI_MODEL': 'stream-test-model',
+        'GENERATION_CACHE_BACKEND': 'none',
+        'OPENAI_RATE_LIMIT_BACKEND': 'none',
+    }.items():
+        monkeypatch.setattr(Config, name, value)
+    generator = AIGenerator()
+    yield generator
+    generator.close()
+
+
+@pytest.fixture
+def streams(monkeypatch, generator):
+    """Every upstream stream the generator opens"""
+    opened = []
+    create = generator.client.chat.completions.create
+
+    def recording_create(**kwargs):
+        stream = create(**kwargs)
+        opened.append((kwargs, stream))
+        return stream
+
+    monkeypatch.setattr(generator.client.chat.completions, 'create', recording_create)
+    return opened
+
+
+EVENT = {'title': 'AI Summit', 'date': '2026-05-14', 'location': 'Berlin',
+         'type': 'Conference', 'description': 'Talks and workshops.'}
+
+
+def tokens(kind):
+    return OPENAI_TOKENS.labels('stream-test-model', kind).value
+
+
+def test_stream_records_token_usage(generator, streams):
+    prompt_tokens, completion_tokens = tokens('prompt'), tokens('completion')
+    messages = list(generator.stream_post(EVENT, 'linkedin', 'professional'))
+
+    assert messages[-1][0] == 'done'
+    assert not any(message[0] == 'reset' for message in messages)
+    (kwargs, _), = streams
+    assert kwargs['stream_options'] == {'include_usage': True}
+    assert tokens('prompt') > prompt_tokens
+    assert tokens('completion') > completion_tokens
+
+
+def test_closing_the_stream_closes_the_upstream_response(generator, streams):
+    messages = generator.stream_post(EVENT, 'linkedin', 'professional')
+    assert next(messages)[0] == 'delta'
+    (_, stream), = streams
+    assert not stream.response.is_closed
+
+    messages.close()
+    assert stream.response.is_closed
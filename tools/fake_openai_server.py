@@ -0,0 +1,247 @@
+"""
+Fake OpenAI-compatible server for local testing
+Serves POST /v1/chat/completions with canned CONTENT/HASHTAGS replies
+(plain or streamed), or a JSON object with one post per platform for
+multi-platform prompts, with configurable latency and injected errors.
+With --rpm-limit it answers 429 (with Retry-After) like the real API once
+more requests arrive than the limit allows in a sliding window.
+
+Usage:
+    python tools/fake_openai_server.py --port 8089 --latency 0.5 --error-rate 0.1
+
+Then point the app at it:
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python app.py
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = """CONTENT:
+Join us for an unforgettable event! Connect with peers, learn from experts and leave inspired.
+
+HASHTAGS:
+#Event #Community #Networking
+"""
+
+MULTI_PLATFORM_RE = re.compile(r'post for each of these platforms: (.+)\.')
+
+
+def multi_platform_reply(prompt, reply):
+    """JSON reply for a multi-platform prompt, or None for a single-platform one"""
+    match = MULTI_PLATFORM_RE.search(prompt)
+    if not match:
+        return None
+    content = reply.split('CONTENT:', 1)[-1].split('HASHTAGS:', 1)[0].strip()
+    hashtags = reply.split('HASHTAGS:', 1)[-1].split()
+    return json.dumps({
+        platform.strip(): {'content': content, 'hashtags': hashtags}
+        for platform in match.group(1).split(',')
+    })
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+
+        with server.lock:
+            server.request_count += 1
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f'Unknown path {self.path}', 'type': 'invalid_request_error'}})
+            return
+
+        retry_after = server.rate_limit_retry_after()
+        if retry_after is not None:
+            self._send_json(
+                429,
+                {'error': {'message': 'Rate limit reached for requests', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+                headers={'Retry-After': f'{retry_after:.3f}'}
+            )
+            return
+
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(
+                server.error_status,
+                {'error': {'message': 'Injected failure', 'type': 'fake_error'}},
+                headers={'Retry-After': '0'}
+            )
+            return
+
+        prompt = body.get('messages', [{}])[-1].get('content', '')
+        reply = multi_platform_reply(prompt, server.reply) or server.reply
+        if body.get('stream'):
+            usage = (body.get('stream_options') or {}).get('include_usage')
+            self._send_stream(body.get('model', 'fake-model'), prompt if usage else None)
+            return
+        self._send_json(200, {
+            'id': f'chatcmpl-fake-{server.request_count}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake-model'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': reply},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': len(prompt) // 4,
+                'completion_tokens': len(reply) // 4,
+                'total_tokens': (len(prompt) + len(reply)) // 4
+            }
+        })
+
+    def _send_stream(self, model, prompt=None):
+        """Send the reply as chat.completion.chunk Server-Sent Events
+
+        With a prompt (stream_options.include_usage) a last chunk without
+        choices carries the token usage, as the real API sends it.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        reply = self.server.reply
+        pieces = [reply[i:i + 8] for i in range(0, len(reply), 8)]
+        for piece in pieces + [None]:
+            chunk = {
+                'id': f'chatcmpl-fake-{self.server.request_count}',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'delta': {'content': piece} if piece is not None else {},
+                    'finish_reason': None if piece is not None else 'stop'
+                }]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            if piece is not None and self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+        if prompt is not None:
+            self._write_chunk("data: " + json.dumps({
+                'id': f'chatcmpl-fake-{self.server.request_count}',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [],
+                'usage': {
+                    'prompt_tokens': len(prompt) // 4,
+                    'completion_tokens': len(reply) // 4,
+                    'total_tokens': (len(prompt) + len(reply)) // 4
+                }
+            }) + "\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    rpm_limit = 0
+    rate_window = 60.0
+
+    def rate_limit_retry_after(self):
+        """Seconds until the request would fit in the window, or None if it fits now"""
+        if not self.rpm_limit:
+            return None
+        allowed = max(1, int(self.rpm_limit * self.rate_window / 60))
+        now = time.monotonic()
+        with self.lock:
+            while self.accepted and self.accepted[0] <= now - self.rate_window:
+                self.accepted.popleft()
+            if len(self.accepted) >= allowed:
+                self.rate_limited += 1
+                return self.accepted[0] + self.rate_window - now
+            self.accepted.append(now)
+            return None
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up (e.g. a benchmark timing out) are not errors here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=429, reply=REPLY, chunk_delay=0.0, verbose=False,
+                 rpm_limit=0, rate_window=60.0):
+    """Start the fake server on a background thread and return it
+
+    The bound address is available as server.server_address; pass port=0
+    to pick a free port. Call server.shutdown() to stop it. rpm_limit is
+    enforced over a sliding rate_window (in seconds), scaled to its length;
+    server.rate_limited counts the 429s sent.
+    """
+    server = FakeOpenAIServer((host, port), FakeOpenAIHandler)
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.reply = reply
+    server.chunk_delay = chunk_delay
+    server.verbose = verbose
+    server.rpm_limit = rpm_limit
+    server.rate_window = rate_window
+    server.request_count = 0
+    server.rate_limited = 0
+    server.accepted = deque()
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, name='fake-openai', daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake OpenAI-compatible chat completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before answering')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail (0-1)')
+    parser.add_argument('--error-status', type=int, default=429, help='HTTP status used for injected failures')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='Seconds between streamed chunks')
+    parser.add_argument('--rpm-limit', type=int, default=0, help='Answer 429 above this many requests per minute')
+    parser.add_argument('--rate-window', type=float, default=60.0, help='Window the RPM limit is enforced over, in seconds')
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                          args.error_status, chunk_delay=args.chunk_delay, verbose=True,
+                          rpm_limit=args.rpm_limit, rate_window=args.rate_window)
+    host, port = server.server_address[:2]
+    print(f"Fake OpenAI server listening on http://{host}:{port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
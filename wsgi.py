@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers
+    gunicorn -c gunicorn.conf.py wsgi:app
+Run `python setup_database.py` once per deployment first; importing the
+app does not create or migrate the schema.
+"""
+from app import app
+
+application = app